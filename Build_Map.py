@@ -1,7 +1,12 @@
+import argparse
 import geopandas as gpd
+import numpy as np
 import pandas as pd
 import os
+import shapely
 import country_converter as coco
+from concurrent.futures import ProcessPoolExecutor
+from map_store import MAP_TILES_FILE, build_map_tiles
 
 # --- Configuration ---
 INPUT_FILE = "./Data/World_Administrative_Divisions.geojson"
@@ -946,7 +951,94 @@ POL_NAME_MAP = {
     'Zachodniopomorskie': 'West Pomerania',
 }
 
-def process_map():
+def _union_wkb(groups):
+    """Union each group of WKB geometries into one, as WKB. Runs in a worker process."""
+    return [shapely.to_wkb(shapely.union_all(shapely.from_wkb(wkbs))) for wkbs in groups]
+
+def dissolve(gdf, by, workers=None):
+    """`gdf.dissolve(by=by, as_index=False)`, with the geometry unions spread
+    over `workers` processes when it is above 1.
+
+    Groups are partitioned by their ISO3 (the first key) and shipped to the
+    workers as WKB. Results come back in submission order and are assembled
+    exactly as geopandas does, so the output matches the serial dissolve."""
+    if not workers or workers <= 1:
+        return gdf.dissolve(by=by, as_index=False)
+    geom_col = gdf.geometry.name
+    data = gdf.drop(columns=geom_col).groupby(by).agg('first')
+    positions = gdf.groupby(by).indices
+    wkb = shapely.to_wkb(gdf.geometry.values)
+    partitions = {}
+    for key in data.index:
+        partitions.setdefault(key[0] if isinstance(key, tuple) else key, []).append(key)
+    tasks = list(partitions.values())
+    with ProcessPoolExecutor(workers) as pool:
+        results = pool.map(_union_wkb, [[list(wkb[positions[key]]) for key in keys] for keys in tasks])
+        merged = {key: geom for keys, geoms in zip(tasks, results) for key, geom in zip(keys, geoms)}
+    geometry = shapely.from_wkb([merged[key] for key in data.index])
+    aggregated = gpd.GeoDataFrame({geom_col: geometry}, index=data.index, geometry=geom_col, crs=gdf.crs)
+    return aggregated.join(data).reset_index()
+
+# Per-country subdivision clean-up: (action, NAME map). Every country's names
+# are mapped first; "merge" countries then have the subdivisions that end up
+# sharing a name dissolved into one, "rename" countries keep every row.
+REGION_CONFIG = {
+    'PRT': ('merge', PRT_REGION_MAP),   # districts into 7 NUTS-2 regions
+    'IND': ('merge', IND_NAME_MAP),     # Daman/Dadra duplicate, translated names
+    'KOR': ('merge', KOR_REGION_MAP),   # 6 traditional regions
+    'BRA': ('merge', BRA_REGION_MAP),   # 5 macroregions
+    'RUS': ('merge', RUS_REGION_MAP),   # 8 federal districts
+    'NOR': ('merge', NOR_REGION_MAP),   # 5 traditional regions
+    'FIN': ('merge', FIN_REGION_MAP),   # 5 NUTS-2 regions
+    'ESP': ('merge', ESP_REGION_MAP),   # regions and North African territories
+    'GRC': ('merge', GRC_REGION_MAP),   # English-named regions
+    'HUN': ('merge', HUN_REGION_MAP),   # 7 regions
+    'CHE': ('merge', CHE_REGION_MAP),   # 7 regions
+    'JPN': ('merge', JPN_REGION_MAP),   # regions
+    'SWE': ('merge', SWE_REGION_MAP),   # Norrland, Svealand, Götaland
+    'CAN': ('merge', {}),               # province/territory duplicates
+    'THA': ('merge', THA_REGION_MAP),   # 6 geographical regions
+    'TUR': ('merge', TUR_REGION_MAP),   # 7 geographical regions
+    'VNM': ('merge', VNM_REGION_MAP),   # 8 official regions
+    'CZE': ('merge', CZE_REGION_MAP),   # 3 traditional lands
+    'CHN': ('rename', CHN_NAME_MAP),
+    'FRA': ('rename', FRA_NAME_MAP),
+    'CHL': ('rename', CHL_NAME_MAP),
+    'ISR': ('rename', ISR_NAME_MAP),
+    'AUT': ('rename', AUT_NAME_MAP),
+    'MEX': ('rename', MEX_NAME_MAP),
+    'PER': ('rename', PER_NAME_MAP),
+    'NZL': ('rename', NZL_NAME_MAP),
+    'BEL': ('rename', BEL_NAME_MAP),
+    'DNK': ('rename', DNK_NAME_MAP),
+    'NLD': ('rename', NLD_NAME_MAP),
+    'ITA': ('rename', ITA_NAME_MAP),
+    'DEU': ('rename', DEU_NAME_MAP),
+    'POL': ('rename', POL_NAME_MAP),
+}
+
+def apply_region_config(gdf, workers=None):
+    """Apply REGION_CONFIG to `gdf`: one lookup renames the subdivisions of
+    every configured country, then a single dissolve over (ISO3, NAME) merges
+    the "merge" countries' same-named subdivisions. Merged countries are
+    appended after the other rows in REGION_CONFIG order."""
+    print(f"RENAMING: Mapping subdivision names for {list(REGION_CONFIG)}...")
+    lookup = pd.Series({(iso, old): new for iso, (_, names) in REGION_CONFIG.items() for old, new in names.items()})
+    new_names = lookup.reindex(pd.MultiIndex.from_arrays([gdf['ISO3'], gdf['NAME']])).to_numpy()
+    gdf = gdf.copy()
+    gdf['NAME'] = pd.Series(new_names, index=gdf.index).fillna(gdf['NAME'])
+
+    merge_isos = [iso for iso, (action, _) in REGION_CONFIG.items() if action == 'merge']
+    print(f"MERGING: Dissolving same-named subdivisions for {merge_isos}...")
+    merge_mask = gdf['ISO3'].isin(merge_isos)
+    if not merge_mask.any():
+        return gdf
+    merged = dissolve(gdf[merge_mask], ['ISO3', 'NAME'], workers)
+    rank = merged['ISO3'].map({iso: i for i, iso in enumerate(merge_isos)}).to_numpy()
+    merged = merged.iloc[np.argsort(rank, kind='stable')]
+    return pd.concat([gdf[~merge_mask], merged], ignore_index=True)
+
+def process_map(workers=None):
     if not os.path.exists(INPUT_FILE):
         print(f"❌ Error: Input file not found at {INPUT_FILE}")
         return
@@ -991,243 +1083,15 @@ def process_map():
 
     if not gdf_dissolve_source.empty:
         print("DISSOLVING: Merging borders for the rest of the world...")
-        gdf_dissolved = gdf_dissolve_source.dissolve(by=country_col, as_index=False)
+        gdf_dissolved = dissolve(gdf_dissolve_source, country_col, workers)
     else:
         gdf_dissolved = gpd.GeoDataFrame()
 
     print("COMBINING: merging layers...")
     gdf_final = pd.concat([gdf_split, gdf_dissolved], ignore_index=True)
 
-    print("MERGING: Dissolving Portuguese districts into 7 NUTS-2 regions...")
-    if 'NAME' in gdf_final.columns:
-        prt_mask = gdf_final['ISO3'] == 'PRT'
-        gdf_prt = gdf_final[prt_mask].copy()
-        gdf_rest = gdf_final[~prt_mask].copy()
-        gdf_prt['NAME'] = gdf_prt['NAME'].map(PRT_REGION_MAP).fillna(gdf_prt['NAME'])
-        gdf_prt = gdf_prt.dissolve(by='NAME', as_index=False)
-        gdf_final = pd.concat([gdf_rest, gdf_prt], ignore_index=True)
-
-    print("MERGING: Merging Indian Daman/Dadra duplicate and translating names...")
-    if 'NAME' in gdf_final.columns:
-        ind_mask = gdf_final['ISO3'] == 'IND'
-        gdf_ind = gdf_final[ind_mask].copy()
-        gdf_rest = gdf_final[~ind_mask].copy()
-        gdf_ind['NAME'] = gdf_ind['NAME'].map(IND_NAME_MAP).fillna(gdf_ind['NAME'])
-        gdf_ind = gdf_ind.dissolve(by='NAME', as_index=False)
-        gdf_final = pd.concat([gdf_rest, gdf_ind], ignore_index=True)
-
-    print("MERGING: Dissolving South Korean subdivisions into 6 traditional regions...")
-    if 'NAME' in gdf_final.columns:
-        kor_mask = gdf_final['ISO3'] == 'KOR'
-        gdf_kor = gdf_final[kor_mask].copy()
-        gdf_rest = gdf_final[~kor_mask].copy()
-        gdf_kor['NAME'] = gdf_kor['NAME'].map(KOR_REGION_MAP).fillna(gdf_kor['NAME'])
-        gdf_kor = gdf_kor.dissolve(by='NAME', as_index=False)
-        gdf_final = pd.concat([gdf_rest, gdf_kor], ignore_index=True)
-
-    print("MERGING: Dissolving Brazilian states into 5 macroregions...")
-    if 'NAME' in gdf_final.columns:
-        bra_mask = gdf_final['ISO3'] == 'BRA'
-        gdf_bra = gdf_final[bra_mask].copy()
-        gdf_rest = gdf_final[~bra_mask].copy()
-        gdf_bra['NAME'] = gdf_bra['NAME'].map(BRA_REGION_MAP).fillna(gdf_bra['NAME'])
-        gdf_bra = gdf_bra.dissolve(by='NAME', as_index=False)
-        gdf_final = pd.concat([gdf_rest, gdf_bra], ignore_index=True)
-
-    print("MERGING: Dissolving Russian subdivisions into 8 federal districts...")
-    if 'NAME' in gdf_final.columns:
-        rus_mask = gdf_final['ISO3'] == 'RUS'
-        gdf_rus = gdf_final[rus_mask].copy()
-        gdf_rest = gdf_final[~rus_mask].copy()
-        gdf_rus['NAME'] = gdf_rus['NAME'].map(RUS_REGION_MAP).fillna(gdf_rus['NAME'])
-        gdf_rus = gdf_rus.dissolve(by='NAME', as_index=False)
-        gdf_final = pd.concat([gdf_rest, gdf_rus], ignore_index=True)
-
-    print("MERGING: Dissolving Norwegian counties into 5 traditional regions...")
-    if 'NAME' in gdf_final.columns:
-        nor_mask = gdf_final['ISO3'] == 'NOR'
-        gdf_nor = gdf_final[nor_mask].copy()
-        gdf_rest = gdf_final[~nor_mask].copy()
-        gdf_nor['NAME'] = gdf_nor['NAME'].map(NOR_REGION_MAP).fillna(gdf_nor['NAME'])
-        gdf_nor = gdf_nor.dissolve(by='NAME', as_index=False)
-        gdf_final = pd.concat([gdf_rest, gdf_nor], ignore_index=True)
-
-    print("MERGING: Dissolving Finnish regions into 5 NUTS-2 regions...")
-    if 'NAME' in gdf_final.columns:
-        fin_mask = gdf_final['ISO3'] == 'FIN'
-        gdf_fin = gdf_final[fin_mask].copy()
-        gdf_rest = gdf_final[~fin_mask].copy()
-        gdf_fin['NAME'] = gdf_fin['NAME'].map(FIN_REGION_MAP).fillna(gdf_fin['NAME'])
-        gdf_fin = gdf_fin.dissolve(by='NAME', as_index=False)
-        gdf_final = pd.concat([gdf_rest, gdf_fin], ignore_index=True)
-
-    print("MERGING: Dissolving Spanish regions and North African territories...")
-    if 'NAME' in gdf_final.columns:
-        esp_mask = gdf_final['ISO3'] == 'ESP'
-        gdf_esp = gdf_final[esp_mask].copy()
-        gdf_rest = gdf_final[~esp_mask].copy()
-        gdf_esp['NAME'] = gdf_esp['NAME'].map(ESP_REGION_MAP).fillna(gdf_esp['NAME'])
-        gdf_esp = gdf_esp.dissolve(by='NAME', as_index=False)
-        gdf_final = pd.concat([gdf_rest, gdf_esp], ignore_index=True)
-
-    print("MERGING: Dissolving Greek regions into English-named regions...")
     if 'NAME' in gdf_final.columns:
-        grc_mask = gdf_final['ISO3'] == 'GRC'
-        gdf_grc = gdf_final[grc_mask].copy()
-        gdf_rest = gdf_final[~grc_mask].copy()
-        gdf_grc['NAME'] = gdf_grc['NAME'].map(GRC_REGION_MAP).fillna(gdf_grc['NAME'])
-        gdf_grc = gdf_grc.dissolve(by='NAME', as_index=False)
-        gdf_final = pd.concat([gdf_rest, gdf_grc], ignore_index=True)
-
-    print("MERGING: Dissolving Hungarian counties into 7 regions...")
-    if 'NAME' in gdf_final.columns:
-        hun_mask = gdf_final['ISO3'] == 'HUN'
-        gdf_hun = gdf_final[hun_mask].copy()
-        gdf_rest = gdf_final[~hun_mask].copy()
-        gdf_hun['NAME'] = gdf_hun['NAME'].map(HUN_REGION_MAP).fillna(gdf_hun['NAME'])
-        gdf_hun = gdf_hun.dissolve(by='NAME', as_index=False)
-        gdf_final = pd.concat([gdf_rest, gdf_hun], ignore_index=True)
-
-    print("MERGING: Dissolving Swiss cantons into 7 regions...")
-    if 'NAME' in gdf_final.columns:
-        che_mask = gdf_final['ISO3'] == 'CHE'
-        gdf_che = gdf_final[che_mask].copy()
-        gdf_rest = gdf_final[~che_mask].copy()
-        gdf_che['NAME'] = gdf_che['NAME'].map(CHE_REGION_MAP).fillna(gdf_che['NAME'])
-        gdf_che = gdf_che.dissolve(by='NAME', as_index=False)
-        gdf_final = pd.concat([gdf_rest, gdf_che], ignore_index=True)
-
-    print("MERGING: Dissolving Japanese prefectures into regions...")
-    if 'NAME' in gdf_final.columns:
-        jpn_mask = gdf_final['ISO3'] == 'JPN'
-        gdf_jpn = gdf_final[jpn_mask].copy()
-        gdf_rest = gdf_final[~jpn_mask].copy()
-        gdf_jpn['NAME'] = gdf_jpn['NAME'].map(JPN_REGION_MAP).fillna(gdf_jpn['NAME'])
-        gdf_jpn = gdf_jpn.dissolve(by='NAME', as_index=False)
-        gdf_final = pd.concat([gdf_rest, gdf_jpn], ignore_index=True)
-
-    print("MERGING: Dissolving Swedish counties into Norrland, Svealand, Götaland...")
-    if 'NAME' in gdf_final.columns:
-        swe_mask = gdf_final['ISO3'] == 'SWE'
-        gdf_swe = gdf_final[swe_mask].copy()
-        gdf_rest = gdf_final[~swe_mask].copy()
-        gdf_swe['NAME'] = gdf_swe['NAME'].map(SWE_REGION_MAP).fillna(gdf_swe['NAME'])
-        gdf_swe = gdf_swe.dissolve(by='NAME', as_index=False)
-        gdf_final = pd.concat([gdf_rest, gdf_swe], ignore_index=True)
-
-    print("RENAMING: Cleaning up Chinese subdivision names...")
-    if 'NAME' in gdf_final.columns:
-        chn_mask = gdf_final['ISO3'] == 'CHN'
-        gdf_final.loc[chn_mask, 'NAME'] = gdf_final.loc[chn_mask, 'NAME'].replace(CHN_NAME_MAP)
-
-    print("RENAMING: Translating French region names to English...")
-    if 'NAME' in gdf_final.columns:
-        fra_mask = gdf_final['ISO3'] == 'FRA'
-        gdf_final.loc[fra_mask, 'NAME'] = gdf_final.loc[fra_mask, 'NAME'].replace(FRA_NAME_MAP)
-
-    print("MERGING: Dissolving Canadian province/territory duplicates...")
-    if 'NAME' in gdf_final.columns:
-        can_mask = gdf_final['ISO3'] == 'CAN'
-        gdf_can = gdf_final[can_mask].copy()
-        gdf_rest = gdf_final[~can_mask].copy()
-        gdf_can = gdf_can.dissolve(by='NAME', as_index=False)
-        gdf_final = pd.concat([gdf_rest, gdf_can], ignore_index=True)
-
-    print("MERGING: Dissolving Thai provinces into 6 geographical regions...")
-    if 'NAME' in gdf_final.columns:
-        tha_mask = gdf_final['ISO3'] == 'THA'
-        gdf_tha = gdf_final[tha_mask].copy()
-        gdf_rest = gdf_final[~tha_mask].copy()
-        gdf_tha['NAME'] = gdf_tha['NAME'].map(THA_REGION_MAP).fillna(gdf_tha['NAME'])
-        gdf_tha = gdf_tha.dissolve(by='NAME', as_index=False)
-        gdf_final = pd.concat([gdf_rest, gdf_tha], ignore_index=True)
-
-    print("MERGING: Dissolving Turkish provinces into 7 geographical regions...")
-    if 'NAME' in gdf_final.columns:
-        tur_mask = gdf_final['ISO3'] == 'TUR'
-        gdf_tur = gdf_final[tur_mask].copy()
-        gdf_rest = gdf_final[~tur_mask].copy()
-        gdf_tur['NAME'] = gdf_tur['NAME'].map(TUR_REGION_MAP).fillna(gdf_tur['NAME'])
-        gdf_tur = gdf_tur.dissolve(by='NAME', as_index=False)
-        gdf_final = pd.concat([gdf_rest, gdf_tur], ignore_index=True)
-
-    print("MERGING: Dissolving Vietnamese provinces into 8 official regions...")
-    if 'NAME' in gdf_final.columns:
-        vnm_mask = gdf_final['ISO3'] == 'VNM'
-        gdf_vnm = gdf_final[vnm_mask].copy()
-        gdf_rest = gdf_final[~vnm_mask].copy()
-        gdf_vnm['NAME'] = gdf_vnm['NAME'].map(VNM_REGION_MAP).fillna(gdf_vnm['NAME'])
-        gdf_vnm = gdf_vnm.dissolve(by='NAME', as_index=False)
-        gdf_final = pd.concat([gdf_rest, gdf_vnm], ignore_index=True)
-
-    print("MERGING: Dissolving Czech regions into 3 traditional lands...")
-    if 'NAME' in gdf_final.columns:
-        cze_mask = gdf_final['ISO3'] == 'CZE'
-        gdf_cze = gdf_final[cze_mask].copy()
-        gdf_rest = gdf_final[~cze_mask].copy()
-        gdf_cze['NAME'] = gdf_cze['NAME'].map(CZE_REGION_MAP).fillna(gdf_cze['NAME'])
-        gdf_cze = gdf_cze.dissolve(by='NAME', as_index=False)
-        gdf_final = pd.concat([gdf_rest, gdf_cze], ignore_index=True)
-
-    print("RENAMING: Cleaning up Chilean region names...")
-    if 'NAME' in gdf_final.columns:
-        chl_mask = gdf_final['ISO3'] == 'CHL'
-        gdf_final.loc[chl_mask, 'NAME'] = gdf_final.loc[chl_mask, 'NAME'].replace(CHL_NAME_MAP)
-
-    print("RENAMING: Translating Israeli district names to English...")
-    if 'NAME' in gdf_final.columns:
-        isr_mask = gdf_final['ISO3'] == 'ISR'
-        gdf_final.loc[isr_mask, 'NAME'] = gdf_final.loc[isr_mask, 'NAME'].replace(ISR_NAME_MAP)
-
-    print("RENAMING: Translating Austrian state names to English...")
-    if 'NAME' in gdf_final.columns:
-        aut_mask = gdf_final['ISO3'] == 'AUT'
-        gdf_final.loc[aut_mask, 'NAME'] = gdf_final.loc[aut_mask, 'NAME'].replace(AUT_NAME_MAP)
-
-    print("RENAMING: Cleaning up Mexican state names...")
-    if 'NAME' in gdf_final.columns:
-        mex_mask = gdf_final['ISO3'] == 'MEX'
-        gdf_final.loc[mex_mask, 'NAME'] = gdf_final.loc[mex_mask, 'NAME'].replace(MEX_NAME_MAP)
-
-    print("RENAMING: Cleaning up Peruvian region names...")
-    if 'NAME' in gdf_final.columns:
-        per_mask = gdf_final['ISO3'] == 'PER'
-        gdf_final.loc[per_mask, 'NAME'] = gdf_final.loc[per_mask, 'NAME'].replace(PER_NAME_MAP)
-
-    print("RENAMING: Cleaning up New Zealand region names...")
-    if 'NAME' in gdf_final.columns:
-        nzl_mask = gdf_final['ISO3'] == 'NZL'
-        gdf_final.loc[nzl_mask, 'NAME'] = gdf_final.loc[nzl_mask, 'NAME'].replace(NZL_NAME_MAP)
-
-    print("RENAMING: Translating Belgian region names to English...")
-    if 'NAME' in gdf_final.columns:
-        bel_mask = gdf_final['ISO3'] == 'BEL'
-        gdf_final.loc[bel_mask, 'NAME'] = gdf_final.loc[bel_mask, 'NAME'].replace(BEL_NAME_MAP)
-
-    print("RENAMING: Translating Danish region names to English...")
-    if 'NAME' in gdf_final.columns:
-        dnk_mask = gdf_final['ISO3'] == 'DNK'
-        gdf_final.loc[dnk_mask, 'NAME'] = gdf_final.loc[dnk_mask, 'NAME'].replace(DNK_NAME_MAP)
-
-    print("RENAMING: Translating Dutch province names to English...")
-    if 'NAME' in gdf_final.columns:
-        nld_mask = gdf_final['ISO3'] == 'NLD'
-        gdf_final.loc[nld_mask, 'NAME'] = gdf_final.loc[nld_mask, 'NAME'].replace(NLD_NAME_MAP)
-
-    print("RENAMING: Translating Italian region names to English...")
-    if 'NAME' in gdf_final.columns:
-        ita_mask = gdf_final['ISO3'] == 'ITA'
-        gdf_final.loc[ita_mask, 'NAME'] = gdf_final.loc[ita_mask, 'NAME'].replace(ITA_NAME_MAP)
-
-    print("RENAMING: Translating German state names to English...")
-    if 'NAME' in gdf_final.columns:
-        deu_mask = gdf_final['ISO3'] == 'DEU'
-        gdf_final.loc[deu_mask, 'NAME'] = gdf_final.loc[deu_mask, 'NAME'].replace(DEU_NAME_MAP)
-
-    print("RENAMING: Translating Polish voivodeship names to English...")
-    if 'NAME' in gdf_final.columns:
-        pol_mask = gdf_final['ISO3'] == 'POL'
-        gdf_final.loc[pol_mask, 'NAME'] = gdf_final.loc[pol_mask, 'NAME'].replace(POL_NAME_MAP)
+        gdf_final = apply_region_config(gdf_final, workers)
 
     print("RENAMING: Normalizing non-ASCII country name columns...")
     COUNTRY_NAME_MAP = {
@@ -1260,6 +1124,26 @@ def process_map():
         print(f"✅ Done! Simplified file saved to {SIMPLIFIED_OUTPUT_FILE}")
     else:
         print(f"❌ mapshaper error: {result.stderr or result.stdout}")
+        return
+
+    build_tiles()
+
+def build_tiles():
+    """Prebuild the Locations page's map features from the simplified map."""
+    print(f"TILING: Prebuilding Locations map features into {MAP_TILES_FILE}...")
+    if build_map_tiles(SIMPLIFIED_OUTPUT_FILE, MAP_TILES_FILE):
+        print("✅ Tiles saved.")
+    else:
+        print(f"❌ Error: Simplified map not found at {SIMPLIFIED_OUTPUT_FILE}")
 
 if __name__ == "__main__":
-    process_map()
+    parser = argparse.ArgumentParser(description="Build the custom world map used by the Locations page.")
+    parser.add_argument("--tiles-only", action="store_true",
+                        help="only rebuild the Locations page tiles from the existing simplified map")
+    parser.add_argument("--workers", type=int, default=None, metavar="N",
+                        help="dissolve countries in N worker processes (default: serially)")
+    args = parser.parse_args()
+    if args.tiles_only:
+        build_tiles()
+    else:
+        process_map(args.workers)
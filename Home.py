@@ -11,11 +11,39 @@ st.set_page_config(page_title="Welcome", layout='wide')
 from utils import load_css
 load_css()
 
-import importlib, sys as _sys
-if "aggregation" in _sys.modules:
-    importlib.reload(_sys.modules["aggregation"])
-from aggregation import run_aggregation
-run_aggregation()
+from data_service import get_stats, get_mutual_dates
+from render_cache import cached_html
+from scoring import geo_score, time_pattern, time_score
+from stats_watcher import start_stats_watcher
+from warmup import start_warmup, warmup_progress
+_watcher = start_stats_watcher()
+start_warmup()
+
+# Days shown in the Recent Activity Log at first and added per "Load more"
+ACTIVITY_DAYS = 14
+ROUNDS_PER_DAY = 5
+
+# --- Background rebuild and warm-up of the other pages ---
+with st.sidebar:
+    if _watcher.rebuilding:
+        st.info("Rebuilding stats from the raw files; showing the previous data until it's done.")
+    elif _watcher.last_error:
+        st.error(f"Last stats rebuild failed: {_watcher.last_error}")
+    elif _watcher.last_timings:
+        st.caption("Last stats rebuild: " + " · ".join(
+            f"{stage} {'skipped' if seconds is None else f'{seconds:.2f}s'}"
+            for stage, seconds in _watcher.last_timings.items()
+        ))
+    _done, _total, _elapsed, _status = warmup_progress()
+    st.progress(_done / _total if _total else 1.0,
+                text=f"Pages ready: {_done}/{_total} ({_elapsed:.1f}s)")
+    with st.expander("Warm-up timings"):
+        st.markdown("\n".join(
+            f"- **{label}**: {entry['state']}"
+            + (f", {entry['seconds']:.2f}s" if entry['seconds'] is not None else "")
+            + (f" ({entry['error']})" if entry['error'] else "")
+            for label, entry in _status.items()
+        ))
 
 # --- Custom Page Styles ---
 st.markdown(
@@ -288,17 +316,9 @@ st.markdown("---")
 
 # --- Pre-compute stats for Overview card ---
 try:
-    _d = pd.read_csv("./Data/Timeguessr_Stats.csv")
-    _d["Date"] = pd.to_datetime(_d["Date"]).dt.date
-    _d["Michael Total Score"] = pd.to_numeric(_d["Michael Total Score"], errors="coerce")
-    _d["Sarah Total Score"] = pd.to_numeric(_d["Sarah Total Score"], errors="coerce")
-    _daily = _d.groupby("Date", as_index=False).agg(
-        michael_played=("Michael Total Score", lambda x: x.notna().any()),
-        sarah_played=("Sarah Total Score", lambda x: x.notna().any())
-    )
-    _dt = pd.to_datetime("2025-10-10").date()
-    both_all = int((_daily["michael_played"] & _daily["sarah_played"]).sum())
-    both_since = int((_daily[_daily["Date"] >= _dt]["michael_played"] & _daily[_daily["Date"] >= _dt]["sarah_played"]).sum())
+    _mutual = get_mutual_dates()
+    both_all = len(_mutual)
+    both_since = int((_mutual >= pd.Timestamp("2025-10-10")).sum())
 except Exception:
     both_all = "—"
     both_since = "—"
@@ -389,29 +409,28 @@ with _legend_col:
                           xref="x", yref="paper",
                           fillcolor=_box_color[cat], line_width=0, layer="below")
 
-    # Piecewise formula from aggregation.py (dist in metres):
-    #   score = max(12, intercept - dist_m * slope)
-    # Each tuple is one formula segment with its category colour.
+    # Piecewise formula from scoring.geo_score (dist in metres).
+    # Each tuple is a distance span drawn in its category colour.
     # Segments of the same colour that are separated by a jump are drawn as
     # separate traces so they don't connect.  On the log x-axis the lines are
     # curved (formula is linear in metres, not log-metres).
     _geo_segs = [
-        #  cat      d_start_m   d_end_m   intercept  slope
-        ("OOO",     30,         50,        5000,      0         ),  # ~0.03 → 0.05 km
-        ("OO%",     50,         1000,      5000,      0.02      ),  # 0.05 → 1 km
-        ("OO%",     1000,       5000,      4980,      0.016     ),  # 1 → 5 km
-        ("OO%",     5000,       37500,     4900,      0.004     ),  # 5 → 37.5 km
-        ("OOX",     37500,      100000,    4900,      0.004     ),  # 37.5 → 100 km
-        ("O%X",     100000,     250000,    4500,      0.001     ),  # 100 → 250 km
-        ("OXX",     250000,     1000000,   4500,      0.001     ),  # 250 → 1000 km
-        ("%XX",     1000000,    2000000,   3500,      0.0005    ),  # 1000 → 2000 km
-        ("XXX",     2000000,    3000000,   2500,      0.0003333 ),  # 2000 → 3000 km
-        ("XXX",     3000000,    6000000,   1500,      0.0002    ),  # 3000 → 6000 km
-        ("XXX",     6000000,    12000000,  12,        0         ),  # 6000 → 12000 km
+        #  cat      d_start_m   d_end_m
+        ("OOO",     30,         50        ),  # ~0.03 → 0.05 km
+        ("OO%",     50,         1000      ),  # 0.05 → 1 km
+        ("OO%",     1000,       5000      ),  # 1 → 5 km
+        ("OO%",     5000,       37500     ),  # 5 → 37.5 km
+        ("OOX",     37500,      100000    ),  # 37.5 → 100 km
+        ("O%X",     100000,     250000    ),  # 100 → 250 km
+        ("OXX",     250000,     1000000   ),  # 250 → 1000 km
+        ("%XX",     1000000,    2000000   ),  # 1000 → 2000 km
+        ("XXX",     2000000,    3000000   ),  # 2000 → 3000 km
+        ("XXX",     3000000,    6000000   ),  # 3000 → 6000 km
+        ("XXX",     6000000,    12000000  ),  # 6000 → 12000 km
     ]
-    for _cat, _d0, _d1, _ic, _sl in _geo_segs:
+    for _cat, _d0, _d1 in _geo_segs:
         _dm = np.logspace(np.log10(_d0), np.log10(_d1), 80)
-        _sc = np.clip(_ic - _dm * _sl, 12, 5000)
+        _sc = geo_score(_dm)
         fig_geo.add_trace(go.Scatter(
             x=_dm / 1000,
             y=_sc,
@@ -470,14 +489,9 @@ with _legend_col:
                            xref="x", yref="paper",
                            fillcolor=_box_color[cat], line_width=0, layer="below")
 
-    # Exact per-year scores confirmed from data (all values are exact constants)
-    _yr_score = [5000, 4950, 4800, 4600, 4300, 3900, 3400, 3400,
-                 2500, 2500, 2500, 2000, 2000, 2000, 2000, 2000,
-                 1000, 1000, 1000, 1000, 1000, 0, 0, 0, 0, 0]
-    _yr_cat   = ["OOO", "OO%", "OO%", "OOX", "OOX", "O%X", "O%X", "O%X",
-                 "OXX", "OXX", "OXX", "OXX", "OXX", "OXX", "OXX", "OXX",
-                 "%XX", "%XX", "%XX", "%XX", "%XX",
-                 "XXX", "XXX", "XXX", "XXX", "XXX"]
+    # Exact per-year scores and patterns from the shared time table
+    _yr_score = time_score(np.arange(26)).astype(int).tolist()
+    _yr_cat   = time_pattern(_yr_score).tolist()
 
     # One disconnected segment per (cat, score) run.
     # Endpoints are the first and last year (both inclusive) so lines never
@@ -526,76 +540,60 @@ with _legend_col:
 
 
 # --- Data Processing ---
-try:
-    data = pd.read_csv("./Data/Timeguessr_Stats.csv")
-    data["Date"] = pd.to_datetime(data["Date"]).dt.date
+def activity_table_html(n_days):
+    """Recent Activity Log table for the last `n_days` dates, newest first,
+    built from a tail slice of the stats so its cost doesn't grow with
+    history. Rows of alternate dates are shaded."""
+    rows = get_stats().tail(n_days * ROUNDS_PER_DAY).iloc[::-1]
+    block = rows["Date"].ne(rows["Date"].shift()).cumsum()
+    rows = rows[block <= n_days]
+    block = block[block <= n_days]
+
+    bg_style = np.where(block % 2 == 0, "background-color: #f6f6f6;", "background-color: #ffffff;")
+    date_str = rows["Date"].dt.strftime("%b %d").fillna("")
+
+    # Location: city over "subdivision, country", or just the country
+    city = rows["City"].astype("string").str.strip().fillna("")
+    subdivision = rows["Subdivision"].astype("string").str.strip().fillna("")
+    country = rows["Country"].astype("string").str.strip().fillna("")
+    subdivision = subdivision.where(subdivision != city, "")
+    country_line = subdivision + np.where((subdivision != "") & (country != ""), ", ", "") + country
+    city_span = '<span class="loc-city">' + city + '</span><span class="loc-country">' + country_line + '</span>'
+    country_span = '<span class="loc-city">' + country + '</span>'
+    loc_html = np.select(
+        [(city != "") & (country_line != "") & (city != country), (city != "") & (country_line != ""), country != ""],
+        [city_span, country_span, country_span], default="-")
+
+    year_str = rows["Year"].map(lambda y: str(int(y)), na_action="ignore").fillna("-")
+
+    def fmt_score(col):
+        return np.trunc(rows[col]).map(lambda v: f"{int(v):,}", na_action="ignore").fillna("-")
+
+    table_rows = "".join(
+        '<tr style="' + bg_style + '"><td style="color: #666; font-size: 11px;">' + date_str
+        + '</td><td>' + loc_html + '</td><td style="text-align: center; font-weight: 500;">' + year_str
+        + '</td><td style="text-align: right;"><span class="score-val score-m">' + fmt_score("Michael Round Score")
+        + '</span></td><td style="text-align: right;"><span class="score-val score-s">' + fmt_score("Sarah Round Score")
+        + '</span></td></tr>'
+    )
 
-    data["Michael Total Score"] = pd.to_numeric(data["Michael Total Score"], errors="coerce")
-    data["Sarah Total Score"] = pd.to_numeric(data["Sarah Total Score"], errors="coerce")
+    # Assemble HTML Table (Compact)
+    # Adjusted widths: Narrowed Date (15->12%) and Year (10->8%), Widened Score cols (10->11%) and Location (35->36%)
+    return f"""<div class="activity-table-container"><table class="activity-table"><thead><tr><th style="width: 10%;">Date</th><th style="width: 42%;">Location</th><th style="width: 8%; text-align: center;">Year</th><th style="width: 20%; text-align: right;">Michael</th><th style="width: 20%; text-align: right;">Sarah</th></tr></thead><tbody>{table_rows}</tbody></table></div>"""
 
-    # Group by date
-    daily = data.groupby("Date", as_index=False).agg(
-        michael_played=("Michael Total Score", lambda x: x.notna().any()),
-        sarah_played=("Sarah Total Score", lambda x: x.notna().any())
-    )
 
+try:
     # --- Recent Activity Section ---
     st.markdown("<br>", unsafe_allow_html=True)
     st.markdown("## Recent Activity Log")
 
-    display_data = data.iloc[::-1]
-
-    # Generate Table Rows with Alternating Date Shading
-    table_rows = ""
-    last_date = None
-    is_shaded = True # Start with True so the first toggle makes it False (White)
-
-    for _, row in display_data.iterrows():
-        # Track date changes for shading
-        current_date = row['Date']
-        if current_date != last_date:
-            is_shaded = not is_shaded
-            last_date = current_date
-
-        bg_style = 'background-color: #f6f6f6;' if is_shaded else 'background-color: #ffffff;'
-
-        # Format Date
-        date_str = current_date.strftime('%b %d') if pd.notna(current_date) else ""
-
-        # Format Location (Combine City, Subdivision, and Country)
-        city = str(row['City']).strip() if pd.notna(row['City']) else ""
-        subdivision = str(row['Subdivision']).strip() if pd.notna(row['Subdivision']) else ""
-        country = str(row['Country']).strip() if pd.notna(row['Country']) else ""
-
-        country_line = ", ".join(filter(None, [subdivision if subdivision != city else "", country]))
-
-        if city and country_line:
-            if city == country:
-                loc_html = f'<span class="loc-city">{country}</span>'
-            else:
-                loc_html = f'<span class="loc-city">{city}</span><span class="loc-country">{country_line}</span>'
-        elif country:
-            loc_html = f'<span class="loc-city">{country}</span>'
-        else:
-            loc_html = "-"
-
-        # Format Year
-        year_str = str(int(row['Year'])) if pd.notna(row['Year']) else "-"
-
-        # Format Scores
-        def fmt_score(val):
-            return f"{int(val):,}" if pd.notna(val) else "-"
-
-        m_round = fmt_score(row['Michael Round Score'])
-        s_round = fmt_score(row['Sarah Round Score'])
-
-        table_rows += f"""<tr style="{bg_style}"><td style="color: #666; font-size: 11px;">{date_str}</td><td>{loc_html}</td><td style="text-align: center; font-weight: 500;">{year_str}</td><td style="text-align: right;"><span class="score-val score-m">{m_round}</span></td><td style="text-align: right;"><span class="score-val score-s">{s_round}</span></td></tr>"""
-
-    # Assemble HTML Table (Compact)
-    # Adjusted widths: Narrowed Date (15->12%) and Year (10->8%), Widened Score cols (10->11%) and Location (35->36%)
-    full_table_html = f"""<div class="activity-table-container"><table class="activity-table"><thead><tr><th style="width: 10%;">Date</th><th style="width: 42%;">Location</th><th style="width: 8%; text-align: center;">Year</th><th style="width: 20%; text-align: right;">Michael</th><th style="width: 20%; text-align: right;">Sarah</th></tr></thead><tbody>{table_rows}</tbody></table></div>"""
+    n_days = st.session_state.setdefault("home_activity_days", ACTIVITY_DAYS)
+    st.markdown(cached_html("home_activity", (n_days,), lambda: activity_table_html(n_days)), unsafe_allow_html=True)
 
-    st.markdown(full_table_html, unsafe_allow_html=True)
+    if n_days * ROUNDS_PER_DAY < len(get_stats()):
+        if st.button("Load more", key="home_activity_more"):
+            st.session_state["home_activity_days"] = n_days + ACTIVITY_DAYS
+            st.rerun()
 
 except FileNotFoundError:
     st.error("Data file not found. Please ensure 'Data/Timeguessr_Stats.csv' exists.")
@@ -1,14 +1,19 @@
-import os
 import streamlit as st
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import datetime
+import hashlib
+import os
+import pickle
 import country_converter as coco
 
 # --- Configuration ---
 st.set_page_config(page_title="The Daily Guessr", layout="wide")
 from background import set_random_sarah_background
+from data_service import get_imputed_stats, get_mutual_dates, get_margins, stats_version
+from disk_cache import disk_cached
+from ranked_history import RankedHistory
 set_random_sarah_background(lightness_level=0.7)
 
 # Global Initialization to drastically improve load speeds
@@ -147,86 +152,50 @@ NEWS_STYLES = """
 st.markdown(NEWS_STYLES, unsafe_allow_html=True)
 
 # --- Data Loading ---
-@st.cache_data
-def load_data(filepath: str = "./Data/Timeguessr_Stats.csv", mtime: float = 0) -> pd.DataFrame:
+def load_data() -> pd.DataFrame:
     try:
-        data = pd.read_csv(filepath)
-        data["Date"] = pd.to_datetime(data["Date"], errors="coerce")
-        data = data.sort_values("Date").reset_index(drop=True)
-        for p in ["Michael", "Sarah"]:
-            t_col = f"{p} Total Score"
-            if t_col in data.columns and data[t_col].dtype == object:
-                 data[t_col] = data[t_col].astype(str).str.replace(',', '')
-            if t_col in data.columns: 
-                data[t_col] = pd.to_numeric(data[t_col], errors='coerce')
-            
-            for cat in ["Geography", "Time"]:
-                mean_c = f"{p} {cat} Score (Mean)"
-                base_c = f"{p} {cat} Score"
-                
-                # Use the Mean column natively if available
-                if mean_c in data.columns:
-                    if data[mean_c].dtype == object:
-                        data[mean_c] = data[mean_c].astype(str).str.replace(',', '')
-                    data[base_c] = pd.to_numeric(data[mean_c], errors='coerce')
-                # Fallback to the basic score column
-                elif base_c in data.columns:
-                    if data[base_c].dtype == object:
-                        data[base_c] = data[base_c].astype(str).str.replace(',', '')
-                    data[base_c] = pd.to_numeric(data[base_c], errors='coerce')
-            
-            if f"{p} Total Score" not in data.columns or data[f"{p} Total Score"].isna().all():
-                data[f"{p} Total Score"] = data.groupby("Date")[f"{p} Geography Score"].transform('sum') + \
-                                           data.groupby("Date")[f"{p} Time Score"].transform('sum')
-
-        m_dates = data[data['Michael Total Score'].notna()]['Date'].dt.date.unique()
-        s_dates = data[data['Sarah Total Score'].notna()]['Date'].dt.date.unique()
-        shared = set(m_dates).intersection(set(s_dates))
-        data = data[data['Date'].dt.date.isin(shared)].copy()
-        
-        if "Year" in data.columns:
-            data["Year"] = pd.to_numeric(data["Year"], errors='coerce')
-
-        return data
+        data = get_imputed_stats()
+        return data[data['Date'].isin(get_mutual_dates())].sort_values("Date", kind="stable").reset_index(drop=True)
     except Exception as e:
         st.error(f"Error loading data: {e}"); return pd.DataFrame()
 
-def prepare_total_margins_data(df):
-    d = df.groupby("Date")[["Michael Total Score", "Sarah Total Score"]].first().reset_index()
-    d = d.sort_values("Date").reset_index(drop=True)
-    d["Score Diff"] = d["Michael Total Score"] - d["Sarah Total Score"]
-    return d
-
-def prepare_time_margins_data(df):
-    d = df.groupby("Date")[["Michael Time Score", "Sarah Time Score"]].sum().reset_index()
-    d = d.sort_values("Date").reset_index(drop=True)
-    d["Score Diff"] = d["Michael Time Score"] - d["Sarah Time Score"]
-    return d
-
-def prepare_geography_margins_data(df):
-    d = df.groupby("Date")[["Michael Geography Score", "Sarah Geography Score"]].sum().reset_index()
-    d = d.sort_values("Date").reset_index(drop=True)
-    d["Score Diff"] = d["Michael Geography Score"] - d["Sarah Geography Score"]
+def prepare_margins_data(cat):
+    """Daily Michael/Sarah scores for `cat` (Total, Time or Geography) on
+    mutual days, with their difference as `Score Diff`."""
+    m = get_margins()
+    d = m[["Date", f"Michael {cat} Score", f"Sarah {cat} Score"]].copy()
+    d["Score Diff"] = m[f"{cat} Margin"]
     return d
 
 # --- Logic ---
 def get_leader_state(d): return "Michael" if d > 0 else ("Sarah" if d < 0 else "Tie")
 
-def generate_news_events(df, cat, window=5):
+def resume_rows(df, state):
+    """Rows of the date-sorted `df` after the last date recorded in `state`,
+    marking them as seen. Each generator keeps its running totals in the
+    `state` dict it is given, so calling it again with the same dict on a
+    longer history only processes the new dates."""
+    last = state.get("last_date")
+    new = df if last is None else df[df["Date"] > last]
+    if len(new): state["last_date"] = new["Date"].iloc[-1]
+    return new
+
+def generate_news_events(df, cat, window=5, state=None):
     """
     Tracks Momentum Flips with added lead sizes.
     """
     if len(df) < window: return []
+    s = {} if state is None else state
     t = df.copy()
     t["Rolling"] = t["Score Diff"].rolling(window=window).mean()
+    t = resume_rows(t, s)
     
     evs = []
-    prev_state = None
-    prev_val = None
-    days_in_state = 0
-    margin_history = {"Michael": [], "Sarah": []}
+    prev_state, prev_val, days_in_state = s.get("prev", (None, None, 0))
+    margin_history = s.setdefault("margin_history", {"Michael": RankedHistory(), "Sarah": RankedHistory()})
+    first_game = s.get("game_num", 0) + 1
     
-    for game_num, (idx, r) in enumerate(t.iterrows(), start=1):
+    for game_num, (idx, r) in enumerate(t.iterrows(), start=first_game):
         if pd.isna(r["Rolling"]): continue
         curr_state = get_leader_state(r["Rolling"])
         curr_val = r["Rolling"]
@@ -260,28 +229,21 @@ def generate_news_events(df, cat, window=5):
         winner = curr_state
         opponent = "Sarah" if winner == "Michael" else "Michael"
         
-        current_largest = sorted(margin_history[winner], key=lambda x: x[0], reverse=True)
-        rank_largest = 1
-        for prev_m in current_largest:
-            if margin < prev_m[0]: rank_largest += 1
-            else: break
+        history = margin_history[winner]
+        rank_largest = history.rank_high(margin)
             
-        days_since_largest = None
+        days_since_largest = game_num
         ref_date_largest = None
-        for i in range(len(margin_history[winner]) - 1, -1, -1):
-            if margin_history[winner][i][0] >= margin:
-                days_since_largest = game_num - margin_history[winner][i][2]
-                ref_date_largest = margin_history[winner][i][1]
-                break
-                
-        if days_since_largest is None:
-            days_since_largest = game_num
+        i = history.last_at_least(margin)
+        if i is not None:
+            days_since_largest = game_num - history.entries[i][2]
+            ref_date_largest = history.entries[i][1]
             
         if rank_largest <= 10:
-            player_max = current_largest[0][0] if current_largest else None
+            player_max = history.best()
             is_pb_tie = player_max is not None and margin == player_max
             
-            opp_max = max([m[0] for m in margin_history[opponent]]) if margin_history[opponent] else 0
+            opp_max = margin_history[opponent].best() if len(margin_history[opponent]) else 0
             overall_max = max(player_max if player_max is not None else 0, opp_max)
             
             is_all_time_new = margin > overall_max
@@ -293,24 +255,27 @@ def generate_news_events(df, cat, window=5):
                 "player": winner, "margin": margin, "rank": rank_largest, 
                 "days_since": days_since_largest, "ref_date": ref_date_largest, 
                 "is_pb_tie": is_pb_tie,
-                "is_all_time_new": is_all_time_new and len(margin_history[winner]) > 0,
-                "is_all_time_tie": is_all_time_tie and len(margin_history[winner]) > 0
+                "is_all_time_new": is_all_time_new and len(history) > 0,
+                "is_all_time_tie": is_all_time_tie and len(history) > 0
             })
             
-        margin_history[winner].append((margin, date, game_num))
+        history.add(margin, date, game_num)
         
+    s["prev"] = (prev_state, prev_val, days_in_state)
+    s["game_num"] = first_game - 1 + len(t)
     return evs
 
-def generate_streak_events(df, cat, min_streak=3):
+def generate_streak_events(df, cat, min_streak=3, state=None):
     if df.empty: return []
+    s = {} if state is None else state
+    df = resume_rows(df, s)
     events = []
-    personal_bests = {"Michael": 0, "Sarah": 0}
-    completed_blocks = {"Michael": [], "Sarah": []}
-    current_winner = None
-    current_streak = 0
-    prev_date = None
+    personal_bests = s.setdefault("personal_bests", {"Michael": 0, "Sarah": 0})
+    completed_blocks = s.setdefault("completed_blocks", {"Michael": [], "Sarah": []})
+    current_winner, current_streak, prev_date = s.get("current", (None, 0, None))
+    first_game = s.get("game_num", 0) + 1
     
-    for game_num, (idx, row) in enumerate(df.iterrows(), start=1):
+    for game_num, (idx, row) in enumerate(df.iterrows(), start=first_game):
         diff, date = row["Score Diff"], row["Date"]
         winner = "Michael" if diff > 0 else ("Sarah" if diff < 0 else "Tie")
             
@@ -351,14 +316,19 @@ def generate_streak_events(df, cat, min_streak=3):
         
         prev_date = date
                 
+    s["current"] = (current_winner, current_streak, prev_date)
+    s["game_num"] = first_game - 1 + len(df)
     return events
 
-def generate_margin_record_events(df, category_name):
+def generate_margin_record_events(df, category_name, state=None):
     if df.empty: return []
+    s = {} if state is None else state
+    df = resume_rows(df, s)
     events = []
-    margin_history = {"Michael": [], "Sarah": []}
+    margin_history = s.setdefault("margin_history", {"Michael": RankedHistory(), "Sarah": RankedHistory()})
+    first_game = s.get("game_num", 0) + 1
     
-    for game_num, (idx, row) in enumerate(df.iterrows(), start=1):
+    for game_num, (idx, row) in enumerate(df.iterrows(), start=first_game):
         diff, date = row["Score Diff"], row["Date"]
         if diff == 0: continue
         winner = "Michael" if diff > 0 else "Sarah"
@@ -366,28 +336,21 @@ def generate_margin_record_events(df, category_name):
         opponent = "Sarah" if winner == "Michael" else "Michael"
         
         # --- Largest Win (Max Margin) Top 10 Logic ---
-        current_largest = sorted(margin_history[winner], key=lambda x: x[0], reverse=True)
-        rank_largest = 1
-        for prev_m in current_largest:
-            if margin < prev_m[0]: rank_largest += 1
-            else: break
+        history = margin_history[winner]
+        rank_largest = history.rank_high(margin)
             
-        days_since_largest = None
+        days_since_largest = game_num
         ref_date_largest = None
-        for i in range(len(margin_history[winner]) - 1, -1, -1):
-            if margin_history[winner][i][0] >= margin:
-                days_since_largest = game_num - margin_history[winner][i][2]
-                ref_date_largest = margin_history[winner][i][1]
-                break
-                
-        if days_since_largest is None:
-            days_since_largest = game_num
+        i = history.last_at_least(margin)
+        if i is not None:
+            days_since_largest = game_num - history.entries[i][2]
+            ref_date_largest = history.entries[i][1]
             
         if rank_largest <= 10:
-            player_max = current_largest[0][0] if current_largest else None
+            player_max = history.best()
             is_pb_tie = player_max is not None and margin == player_max
             
-            opp_max = max([m[0] for m in margin_history[opponent]]) if margin_history[opponent] else 0
+            opp_max = margin_history[opponent].best() if len(margin_history[opponent]) else 0
             overall_max = max(player_max if player_max is not None else 0, opp_max)
             
             is_all_time_new = margin > overall_max
@@ -398,33 +361,25 @@ def generate_margin_record_events(df, category_name):
                 "player": winner, "margin": margin, "rank": rank_largest, 
                 "days_since": days_since_largest, "ref_date": ref_date_largest, 
                 "is_pb_tie": is_pb_tie,
-                "is_all_time_new": is_all_time_new and len(margin_history[winner]) > 0,
-                "is_all_time_tie": is_all_time_tie and len(margin_history[winner]) > 0
+                "is_all_time_new": is_all_time_new and len(history) > 0,
+                "is_all_time_tie": is_all_time_tie and len(history) > 0
             })
             
         # --- Tightest Win (Min Margin) Top 10 Logic ---
-        current_tightest = sorted(margin_history[winner], key=lambda x: x[0])
-        rank_tightest = 1
-        for prev_m in current_tightest:
-            if margin > prev_m[0]: rank_tightest += 1
-            else: break
+        rank_tightest = history.rank_low(margin)
             
-        days_since_tightest = None
+        days_since_tightest = game_num
         ref_date_tightest = None
-        for i in range(len(margin_history[winner]) - 1, -1, -1):
-            if margin_history[winner][i][0] <= margin:
-                days_since_tightest = game_num - margin_history[winner][i][2]
-                ref_date_tightest = margin_history[winner][i][1]
-                break
-                
-        if days_since_tightest is None:
-            days_since_tightest = game_num
+        i = history.last_at_most(margin)
+        if i is not None:
+            days_since_tightest = game_num - history.entries[i][2]
+            ref_date_tightest = history.entries[i][1]
             
         if rank_tightest <= 10:
-            player_min = current_tightest[0][0] if current_tightest else None
+            player_min = history.worst()
             is_pb_tie = player_min is not None and margin == player_min
             
-            opp_min = min([m[0] for m in margin_history[opponent]]) if margin_history[opponent] else float('inf')
+            opp_min = margin_history[opponent].worst() if len(margin_history[opponent]) else float('inf')
             overall_min = min(player_min if player_min is not None else float('inf'), opp_min)
             
             is_all_time_new = margin < overall_min
@@ -435,22 +390,25 @@ def generate_margin_record_events(df, category_name):
                 "player": winner, "margin": margin, "rank": rank_tightest, 
                 "days_since": days_since_tightest, "ref_date": ref_date_tightest, 
                 "is_pb_tie": is_pb_tie,
-                "is_all_time_new": is_all_time_new and len(margin_history[winner]) > 0,
-                "is_all_time_tie": is_all_time_tie and len(margin_history[winner]) > 0
+                "is_all_time_new": is_all_time_new and len(history) > 0,
+                "is_all_time_tie": is_all_time_tie and len(history) > 0
             })
             
-        margin_history[winner].append((margin, date, game_num))
+        history.add(margin, date, game_num)
         
+    s["game_num"] = first_game - 1 + len(df)
     return events
 
-def generate_score_record_events(df, category_name):
+def generate_score_record_events(df, category_name, state=None):
     if df.empty: return []
+    s = {} if state is None else state
+    df = resume_rows(df, s)
     events = []
     
     # Store history for Top 10 logic
-    score_history = {"Michael": [], "Sarah": []}
-    rival_pb = {"Michael": 0, "Sarah": 0}
-    rival_worst = {"Michael": float('inf'), "Sarah": float('inf')}
+    score_history = s.setdefault("score_history", {"Michael": RankedHistory(), "Sarah": RankedHistory()})
+    rival_pb = s.setdefault("rival_pb", {"Michael": 0, "Sarah": 0})
+    rival_worst = s.setdefault("rival_worst", {"Michael": float('inf'), "Sarah": float('inf')})
 
     for idx, row in df.iterrows():
         date = row["Date"]
@@ -461,31 +419,20 @@ def generate_score_record_events(df, category_name):
             opponent = "Sarah" if player == "Michael" else "Michael"
             
             # --- Top 10 Logic ---
-            current_leaderboard = sorted(score_history[player], key=lambda x: x[0], reverse=True)
-            
-            # Calculate Rank
-            rank = 1
-            for prev_score in current_leaderboard:
-                if score < prev_score[0]:
-                    rank += 1
-                else:
-                    break
+            history = score_history[player]
+            rank = history.rank_high(score)
             
             # Calculate "Best score in X games"
-            days_since = None
+            # (all-time record across all games played so far if none)
+            days_since = len(history) + 1
             ref_date = None
-            for i in range(len(score_history[player]) - 1, -1, -1):
-                if score_history[player][i][0] >= score:
-                    days_since = len(score_history[player]) - i
-                    ref_date = score_history[player][i][1]
-                    break
-            
-            if days_since is None:
-                # All-time record across all games played so far
-                days_since = len(score_history[player]) + 1
+            i = history.last_at_least(score)
+            if i is not None:
+                days_since = len(history) - i
+                ref_date = history.entries[i][1]
             
             if rank <= 10:
-                current_max = current_leaderboard[0][0] if current_leaderboard else None
+                current_max = history.best()
                 is_pb_tie = current_max is not None and score == current_max
                 events.append({
                     "date": date, 
@@ -497,36 +444,25 @@ def generate_score_record_events(df, category_name):
                     "days_since": days_since,
                     "ref_date": ref_date,
                     "is_pb_tie": is_pb_tie,
-                    "is_all_time": rank == 1 and len(score_history[player]) > 0
+                    "is_all_time": rank == 1 and len(history) > 0
                 })
 
             # --- Bottom 10 Logic ---
             bottom_days_since = None
             bottom_ref_date = None
-            if len(score_history[player]) > 0:  # Skip game 1 so it doesn't trigger "All-Time Worst" on day 1
-                current_bottom_leaderboard = sorted(score_history[player], key=lambda x: x[0])
-                
-                # Calculate Bottom Rank
-                bottom_rank = 1
-                for prev_score in current_bottom_leaderboard:
-                    if score > prev_score[0]:
-                        bottom_rank += 1
-                    else:
-                        break
+            if len(history) > 0:  # Skip game 1 so it doesn't trigger "All-Time Worst" on day 1
+                bottom_rank = history.rank_low(score)
                 
                 # Calculate "Worst score in X games"
-                for i in range(len(score_history[player]) - 1, -1, -1):
-                    if score_history[player][i][0] <= score:
-                        bottom_days_since = len(score_history[player]) - i
-                        bottom_ref_date = score_history[player][i][1]
-                        break
-                
-                if bottom_days_since is None:
-                    # All-time worst across all games played so far
-                    bottom_days_since = len(score_history[player]) + 1
+                # (all-time worst across all games played so far if none)
+                bottom_days_since = len(history) + 1
+                i = history.last_at_most(score)
+                if i is not None:
+                    bottom_days_since = len(history) - i
+                    bottom_ref_date = history.entries[i][1]
                 
                 if bottom_rank <= 10:
-                    current_min = current_bottom_leaderboard[0][0] if current_bottom_leaderboard else None
+                    current_min = history.worst()
                     is_worst_tie = current_min is not None and score == current_min
                     events.append({
                         "date": date, 
@@ -574,7 +510,7 @@ def generate_score_record_events(df, category_name):
                 })
 
             # Update histories for next day processing
-            score_history[player].append((score, date))
+            history.add(score, date)
             if score > rival_pb[player]:
                 rival_pb[player] = score
             if score < rival_worst[player]:
@@ -582,41 +518,37 @@ def generate_score_record_events(df, category_name):
                 
     return events
 
-def generate_momentum_score_events(df, category_name, window=5):
+def generate_momentum_score_events(df, category_name, window=5, state=None):
     if len(df) < window: return []
+    s = {} if state is None else state
     events = []
     t = df.copy()
     for p in ["Michael", "Sarah"]:
         t[f"{p}_rolling"] = t[f"{p} {category_name}"].rolling(window=window).mean()
+    t = resume_rows(t, s)
         
-    score_history = {"Michael": [], "Sarah": []}
+    score_history = s.setdefault("score_history", {"Michael": RankedHistory(), "Sarah": RankedHistory()})
+    first_game = s.get("game_num", 0) + 1
 
-    for game_num, (idx, row) in enumerate(t.iterrows(), start=1):
+    for game_num, (idx, row) in enumerate(t.iterrows(), start=first_game):
         date = row["Date"]
         for player in ["Michael", "Sarah"]:
             score = row[f"{player}_rolling"]
             if pd.isna(score): continue
             
             # --- Top 10 Logic ---
-            current_leaderboard = sorted(score_history[player], key=lambda x: x[0], reverse=True)
-            rank = 1
-            for prev_score in current_leaderboard:
-                if score < prev_score[0]: rank += 1
-                else: break
+            history = score_history[player]
+            rank = history.rank_high(score)
             
-            days_since = None
+            days_since = game_num
             ref_date = None
-            for i in range(len(score_history[player]) - 1, -1, -1):
-                if score_history[player][i][0] >= score:
-                    days_since = game_num - score_history[player][i][2]
-                    ref_date = score_history[player][i][1]
-                    break
-            
-            if days_since is None:
-                days_since = game_num
+            i = history.last_at_least(score)
+            if i is not None:
+                days_since = game_num - history.entries[i][2]
+                ref_date = history.entries[i][1]
             
             if rank <= 10:
-                current_max = current_leaderboard[0][0] if current_leaderboard else None
+                current_max = history.best()
                 is_pb_tie = current_max is not None and score == current_max
                 events.append({
                     "date": date, 
@@ -629,30 +561,23 @@ def generate_momentum_score_events(df, category_name, window=5):
                     "days_since": days_since,
                     "ref_date": ref_date,
                     "is_pb_tie": is_pb_tie,
-                    "is_all_time": rank == 1 and len(score_history[player]) > 0
+                    "is_all_time": rank == 1 and len(history) > 0
                 })
 
             # --- Bottom 10 Logic ---
             bottom_days_since = None
             bottom_ref_date = None
-            if len(score_history[player]) > 0:
-                current_bottom_leaderboard = sorted(score_history[player], key=lambda x: x[0])
-                bottom_rank = 1
-                for prev_score in current_bottom_leaderboard:
-                    if score > prev_score[0]: bottom_rank += 1
-                    else: break
-                
-                for i in range(len(score_history[player]) - 1, -1, -1):
-                    if score_history[player][i][0] <= score:
-                        bottom_days_since = game_num - score_history[player][i][2]
-                        bottom_ref_date = score_history[player][i][1]
-                        break
+            if len(history) > 0:
+                bottom_rank = history.rank_low(score)
                 
-                if bottom_days_since is None:
-                    bottom_days_since = game_num
+                bottom_days_since = game_num
+                i = history.last_at_most(score)
+                if i is not None:
+                    bottom_days_since = game_num - history.entries[i][2]
+                    bottom_ref_date = history.entries[i][1]
                 
                 if bottom_rank <= 10:
-                    current_min = current_bottom_leaderboard[0][0] if current_bottom_leaderboard else None
+                    current_min = history.worst()
                     is_worst_tie = current_min is not None and score == current_min
                     events.append({
                         "date": date, 
@@ -668,40 +593,44 @@ def generate_momentum_score_events(df, category_name, window=5):
                         "is_all_time": bottom_rank == 1
                     })
 
-            score_history[player].append((score, date, game_num))
+            history.add(score, date, game_num)
             
+    s["game_num"] = first_game - 1 + len(t)
     return events
 
-def generate_score_threshold_streaks(df):
+def generate_score_threshold_streaks(df, state=None):
     if df.empty: return []
+    s = {} if state is None else state
+    df = resume_rows(df, s)
     events = []
     configs = [
         {"cat": "Total Score", "fmt": "{p} Total Score", "th": [{"id": "tgt45", "lbl": ">45k", "chk": lambda s: s>45000, "min": 2, "typ": "hot"}, {"id": "tgt40", "lbl": ">40k", "chk": lambda s: s>40000, "min": 5, "typ": "hot"}, {"id": "tlt40", "lbl": "<40k", "chk": lambda s: s<40000, "min": 5, "typ": "cold"}, {"id": "tlt35", "lbl": "<35k", "chk": lambda s: s<35000, "min": 2, "typ": "cold"}]},
         {"cat": "Time Score", "fmt": "{p} Time Score", "th": [{"id": "tmgt20", "lbl": ">20k", "chk": lambda s: s>20000, "min": 2, "typ": "hot"}, {"id": "time_lt_20k", "lbl": "<20k", "chk": lambda s: s<20000, "min": 5, "typ": "cold"}]},
         {"cat": "Geography Score", "fmt": "{p} Geography Score", "th": [{"id": "ggt225", "lbl": ">22.5k", "chk": lambda s: s>22500, "min": 5, "typ": "hot"}, {"id": "geo_lt_225k", "lbl": "<22.5k", "chk": lambda s: s<22500, "min": 5, "typ": "cold"}]}
     ]
-    stt = {}
-    completed_blocks = {}
+    stt = s.setdefault("stt", {})
+    completed_blocks = s.setdefault("completed_blocks", {})
     for c in configs: 
         cat = c['cat']
-        stt[cat] = {p: {t['id']: {'cur': 0, 'max': 0} for t in c['th']} for p in ["Michael", "Sarah"]}
-        completed_blocks[cat] = {p: {t['id']: [] for t in c['th']} for p in ["Michael", "Sarah"]}
+        stt.setdefault(cat, {p: {t['id']: {'cur': 0, 'max': 0} for t in c['th']} for p in ["Michael", "Sarah"]})
+        completed_blocks.setdefault(cat, {p: {t['id']: [] for t in c['th']} for p in ["Michael", "Sarah"]})
         
-    prev_date = None
-    for game_num, (idx, row) in enumerate(df.iterrows(), start=1):
+    prev_date = s.get("prev_date")
+    first_game = s.get("game_num", 0) + 1
+    for game_num, (idx, row) in enumerate(df.iterrows(), start=first_game):
         date = row["Date"]
         for c in configs:
             cat = c['cat']
             for p in ["Michael", "Sarah"]:
                 col = c['fmt'].format(p=p)
                 if col not in df.columns: continue
-                s = row[col]
+                sc = row[col]
                 for t in c['th']:
                     tid = t['id']
                     trk = stt[cat][p][tid]
                     blocks = completed_blocks[cat][p][tid]
                     
-                    if t['chk'](s):
+                    if t['chk'](sc):
                         trk['cur'] += 1
                         cu = trk['cur']
                         mx = trk['max']
@@ -736,20 +665,24 @@ def generate_score_threshold_streaks(df):
                                     events.append({"date": date, "category": cat, "event_type": "score_streak_broken", "subtype": sub, "player": p, "count": cu, "record": mx, "threshold_label": t['lbl'], "streak_type": t['typ']})
                         trk['cur'] = 0
         prev_date = date
+    s["prev_date"] = prev_date
+    s["game_num"] = first_game - 1 + len(df)
     return events
 
-def generate_milestone_events(df):
+def generate_milestone_events(df, state=None):
     if df.empty: return []
+    s = {} if state is None else state
+    df = resume_rows(df.sort_values("Date", kind="stable"), s)
     evs = []
-    dec, yr, loc = {}, {}, {}
-    dec_years = {}
-    cont_regions = {}
-    reg_countries = {}
-    country_subdivs = {}
-    country_cities = {}
-    subdiv_cities = {}
-    seen_dates = set()
-    total_days = 0
+    dec, yr, loc = s.setdefault("dec", {}), s.setdefault("yr", {}), s.setdefault("loc", {})
+    dec_years = s.setdefault("dec_years", {})
+    cont_regions = s.setdefault("cont_regions", {})
+    reg_countries = s.setdefault("reg_countries", {})
+    country_subdivs = s.setdefault("country_subdivs", {})
+    country_cities = s.setdefault("country_cities", {})
+    subdiv_cities = s.setdefault("subdiv_cities", {})
+    seen_dates = s.setdefault("seen_dates", set())
+    total_days = s.get("total_days", 0)
     
     uc = list(df["Country"].dropna().unique())
     iso_res = cc_obj.convert(names=uc, to='ISO3', not_found='Unknown') if uc else []
@@ -768,7 +701,7 @@ def generate_milestone_events(df):
     def is_milestone(n):
         return n in [5, 10, 15, 20, 25, 50, 75, 100] or (n > 100 and n % 50 == 0)
     
-    for _, r in df.sort_values("Date").iterrows():
+    for _, r in df.iterrows():
         dt = r["Date"]
         if dt not in seen_dates:
             seen_dates.add(dt)
@@ -804,10 +737,10 @@ def generate_milestone_events(df):
                         
                     evs.append({"date": dt, "category": "Milestone", "event_type": "milestone", "subtype": "decade", "name": dstr, "count": milestone_val, "top_subitems": top_subitems, "other_count": other_count, "subitems_label": "Top Years"})
         
-        c, s = r.get("Country"), r.get("Subdivision")
+        c, sd = r.get("Country"), r.get("Subdivision")
         city = r.get("City")
         ccl = str(c).strip() if pd.notna(c) else "Unknown"
-        scl = str(s).strip() if pd.notna(s) and str(s).strip() else None
+        scl = str(sd).strip() if pd.notna(sd) and str(sd).strip() else None
         city_str = str(city).strip() if pd.notna(city) and str(city).strip() else None
         isoc = iso.get(ccl)
         rg, cn = reg.get(isoc, "Unknown"), con.get(isoc, "Unknown")
@@ -874,6 +807,7 @@ def generate_milestone_events(df):
                         event["subitems_label"] = sub_lbl
                         
                     evs.append(event)
+    s["total_days"] = total_days
     return evs
 
 @st.cache_data
@@ -887,22 +821,99 @@ def get_flag_html(name):
     except: pass
     return "🏳️"
 
-def generate_location_events(df):
-    if df.empty: return []
-    events = []
-    perf_data = df.copy()
-    
-    # Strictly base row "Total Score" on Geography + Time 
-    # This prevents using the date-aggregated total for row-specific locations
+SCORE_KEYS = [f"{p}_{m}" for p in ["Michael", "Sarah"] for m in ["Geography", "Time", "Total"]]
+TALLY_LEVELS = {"continent": "new_continent", "region": "new_un_region", "country": "new_country", "subdivision": "new_subdivision", "year": "new_year", "decade": "new_decade"}
+
+def round_scores(df):
+    """Per-round SCORE_KEYS scores of `df` as float arrays. Missing scores
+    count as 0, and Total is Geography + Time rather than the day total."""
+    out = {}
     for p in ["Michael", "Sarah"]:
-        geo_col = f"{p} Geography Score"
-        time_col = f"{p} Time Score"
-        if geo_col not in perf_data.columns: perf_data[geo_col] = 0
-        if time_col not in perf_data.columns: perf_data[time_col] = 0
-        perf_data[geo_col] = perf_data[geo_col].fillna(0)
-        perf_data[time_col] = perf_data[time_col].fillna(0)
-        perf_data[f"{p} Total Score"] = perf_data[geo_col] + perf_data[time_col]
-                
+        for m in ["Geography", "Time"]:
+            col = f"{p} {m} Score"
+            out[f"{p}_{m}"] = df[col].to_numpy("float64", na_value=0) if col in df.columns else np.zeros(len(df))
+        out[f"{p}_Total"] = out[f"{p}_Geography"] + out[f"{p}_Time"]
+    return out
+
+def tally_rows(df, level, names, parents=""):
+    """Rows of `df` tagged with `level`, `names` and `parents`, dropping rows
+    whose name is None."""
+    names = np.asarray(names, dtype=object)
+    keep = pd.notna(names)
+    rows = pd.DataFrame({"Date": df["Date"].to_numpy()[keep], "level": level, "name": names[keep],
+                         "parent": np.asarray(parents, dtype=object)[keep] if not isinstance(parents, str) else parents})
+    for k, v in round_scores(df).items(): rows[k] = v[keep]
+    return rows
+
+def tally_daily(rows, dates, s):
+    """One row per date and (level, name) appearance in `rows`, in feed order.
+
+    `rows` holds one row per round in play order (see `tally_rows`) and
+    `dates` every date being processed. Each appearance gets the day's
+    scores as `shift <key>`, the running totals `before <key>` and
+    `after <key>`, the leaders before and after, the `gap` in days since
+    the previous appearance (0 on the first), the `appearances` so far and
+    `is_new`. Running totals carry over between calls in `s["tally"]`."""
+    first_day = s.get("days", 0) + 1
+    unique_dates = np.sort(dates.unique())
+    s["days"] = first_day - 1 + len(unique_dates)
+    key = ["level", "name"]
+    prior = s.get("tally", pd.DataFrame(columns=key + ["prior day", "prior appearances"] + [f"prior {k}" for k in SCORE_KEYS]))
+
+    g = rows.groupby(["Date", "level", "name"], sort=False)
+    daily = g[SCORE_KEYS].sum().add_prefix("shift ").join(g["parent"].first()).reset_index()
+    daily["order"] = daily["level"].map(list(TALLY_LEVELS).index)
+    daily = daily.sort_values(["Date", "order"], kind="stable").reset_index(drop=True)
+    daily["day"] = first_day + np.searchsorted(unique_dates, daily["Date"].to_numpy())
+    daily = daily.merge(prior, on=key, how="left")
+
+    g = daily.groupby(key, sort=False)
+    seen = g.cumcount()
+    daily["is_new"] = (seen == 0) & daily["prior appearances"].isna()
+    daily["appearances"] = seen + 1 + daily["prior appearances"].astype(float).fillna(0).astype(int)
+    prev_day = g["day"].shift(1).fillna(daily["prior day"].astype(float)).fillna(0)
+    daily["gap"] = np.where(prev_day > 0, daily["day"] - prev_day, 0).astype(int)
+    for k in SCORE_KEYS:
+        daily[f"after {k}"] = g[f"shift {k}"].cumsum() + daily[f"prior {k}"].astype(float).fillna(0)
+        daily[f"before {k}"] = daily[f"after {k}"] - daily[f"shift {k}"]
+    for when in ["before", "after"]:
+        for m in ["Geography", "Time", "Total"]:
+            ms, ss = daily[f"{when} Michael_{m}"], daily[f"{when} Sarah_{m}"]
+            daily[f"{when} {m}"] = np.where(ms > ss, "Michael", np.where(ss > ms, "Sarah", "Tie"))
+
+    last = daily.drop_duplicates(key, keep="last")[key + ["day", "appearances"] + [f"after {k}" for k in SCORE_KEYS]]
+    last.columns = prior.columns
+    s["tally"] = pd.concat([prior, last]).drop_duplicates(key, keep="last").reset_index(drop=True)
+    return daily
+
+def tally_events(daily, category, types, with_country=False):
+    """Discovery, lead-flip and rare-return events for each appearance in
+    `daily`. `types` names the (discovery, flip, rare) event types."""
+    flipped = np.any([daily[f"before {m}"] != daily[f"after {m}"] for m in ["Geography", "Time", "Total"]], axis=0)
+    events = []
+    for r in daily[daily["is_new"] | flipped | (daily["gap"] >= 25)].to_dict("records"):
+        base = {"date": r["Date"], "category": category, "name": r["name"]}
+        if with_country: base["country"] = r["parent"]
+        if r["is_new"]:
+            perf = {m: (r[f"after {m}"], abs(r[f"after Michael_{m}"] - r[f"after Sarah_{m}"])) for m in ["Geography", "Time", "Total"]}
+            events.append({**base, "event_type": types[0], "subtype": TALLY_LEVELS[r["level"]], "perf": perf, "gap": r["gap"]})
+            continue
+        overall_perf = {m: {
+            "Michael": {"before": r[f"before Michael_{m}"], "after": r[f"after Michael_{m}"], "shift": r[f"shift Michael_{m}"]},
+            "Sarah": {"before": r[f"before Sarah_{m}"], "after": r[f"after Sarah_{m}"], "shift": r[f"shift Sarah_{m}"]},
+            "old_leader": r[f"before {m}"], "new_leader": r[f"after {m}"], "did_flip": r[f"after {m}"] != r[f"before {m}"]
+        } for m in ["Geography", "Time", "Total"]}
+        if any(p["did_flip"] for p in overall_perf.values()):
+            events.append({**base, "event_type": types[1], "subtype": r["level"], "overall_perf": overall_perf, "gap": r["gap"], "is_rare": r["gap"] >= 25, "appearances": r["appearances"]})
+        elif r["gap"] >= 25:
+            events.append({**base, "event_type": types[2], "subtype": r["level"], "overall_perf": overall_perf, "gap": r["gap"], "appearances": r["appearances"]})
+    return events
+
+def generate_location_events(df, state=None):
+    if df.empty: return []
+    s = {} if state is None else state
+    df = resume_rows(df, s)
+
     uc = list(df["Country"].dropna().unique())
     iso_res = cc_obj.convert(names=uc, to='ISO3', not_found='Unknown') if uc else []
     if isinstance(iso_res, str): iso_res = [iso_res]
@@ -917,337 +928,35 @@ def generate_location_events(df):
     if isinstance(con_res, str): con_res = [con_res]
     con = dict(zip(ui, con_res))
 
-    locations_state = {"continent": {}, "region": {}, "country": {}, "subdivision": {}}
-    last_seen_day = {"continent": {}, "region": {}, "country": {}, "subdivision": {}}
-    appearances = {"continent": {}, "region": {}, "country": {}, "subdivision": {}}
-    
-    unique_dates = sorted(perf_data["Date"].unique())
-    date_to_day = {d: i for i, d in enumerate(unique_dates, start=1)}
+    country = df["Country"].astype(object)
+    ccl = country.astype(str).str.strip().where(country.notna(), "Unknown")
+    sub = df["Subdivision"].astype(object).astype(str).str.strip()
+    scl = sub.where(df["Subdivision"].notna() & (sub != "") & (ccl != "Unknown"))
+    isoc = ccl.map(iso).fillna("Unknown")
+    known = lambda v: v.where(v != "Unknown")
+    rows = pd.concat([
+        tally_rows(df, "continent", known(isoc.map(con).fillna("Unknown"))),
+        tally_rows(df, "region", known(isoc.map(reg).fillna("Unknown"))),
+        tally_rows(df, "country", known(ccl)),
+        tally_rows(df, "subdivision", scl, ccl),
+    ], ignore_index=True)
+    return tally_events(tally_daily(rows, df["Date"], s), "Discovery", ["discovery", "location_flip", "rare_location"], with_country=True)
 
-    for dt in unique_dates:
-        day_data = perf_data[perf_data["Date"] == dt]
-        current_day = date_to_day[dt]
-        day_locs = {"continent": {}, "region": {}, "country": {}, "subdivision": {}}
-        
-        for _, r in day_data.iterrows():
-            c, s = r.get("Country"), r.get("Subdivision")
-            ccl = str(c).strip() if pd.notna(c) else "Unknown"
-            scl = str(s).strip() if pd.notna(s) and str(s).strip() else None
-            isoc = iso.get(ccl, "Unknown")
-            rg = reg.get(isoc, "Unknown")
-            cn = con.get(isoc, "Unknown")
-            
-            locs_to_update = []
-            if cn != "Unknown": locs_to_update.append(("continent", cn, None, "new_continent"))
-            if rg != "Unknown": locs_to_update.append(("region", rg, None, "new_un_region"))
-            if ccl != "Unknown": locs_to_update.append(("country", ccl, None, "new_country"))
-            if scl and ccl != "Unknown": locs_to_update.append(("subdivision", scl, ccl, "new_subdivision"))
-            
-            for l_type, l_name, parent, sub_str in locs_to_update:
-                if l_name not in day_locs[l_type]:
-                    day_locs[l_type][l_name] = {
-                        "parent": parent, "sub_str": sub_str,
-                        "Michael_Geography": 0, "Michael_Time": 0, "Michael_Total": 0,
-                        "Sarah_Geography": 0, "Sarah_Time": 0, "Sarah_Total": 0
-                    }
-                dl = day_locs[l_type][l_name]
-                for p in ["Michael", "Sarah"]:
-                    dl[f"{p}_Geography"] += r[f"{p} Geography Score"]
-                    dl[f"{p}_Time"] += r[f"{p} Time Score"]
-                    dl[f"{p}_Total"] += r[f"{p} Total Score"]
-                    
-        for l_type, loc_dict in day_locs.items():
-            for l_name, scores in loc_dict.items():
-                parent = scores["parent"]
-                sub_str = scores["sub_str"]
-                
-                prev_day = last_seen_day[l_type].get(l_name, 0)
-                gap = current_day - prev_day if prev_day > 0 else 0
-                last_seen_day[l_type][l_name] = current_day
-                appearances[l_type][l_name] = appearances[l_type].get(l_name, 0) + 1
-                app_count = appearances[l_type][l_name]
-                
-                if l_name not in locations_state[l_type]:
-                    state = {
-                        "Michael_Geography": 0, "Michael_Time": 0, "Michael_Total": 0,
-                        "Sarah_Geography": 0, "Sarah_Time": 0, "Sarah_Total": 0,
-                        "Geography": "Tie", "Time": "Tie", "Total": "Tie"
-                    }
-                    locations_state[l_type][l_name] = state
-                    
-                    for k in ["Michael_Geography", "Michael_Time", "Michael_Total", "Sarah_Geography", "Sarah_Time", "Sarah_Total"]:
-                        state[k] += scores[k]
-                        
-                    perf = {}
-                    for m in ["Geography", "Time", "Total"]:
-                        m_score, s_score = state[f"Michael_{m}"], state[f"Sarah_{m}"]
-                        w = "Michael" if m_score > s_score else ("Sarah" if s_score > m_score else "Tie")
-                        state[m] = w
-                        perf[m] = (w, abs(m_score - s_score))
-                        
-                    events.append({
-                        "date": dt, "category": "Discovery", "event_type": "discovery",
-                        "subtype": sub_str, "name": l_name, "country": parent if parent else "",
-                        "perf": perf, "gap": gap
-                    })
-                else:
-                    state = locations_state[l_type][l_name]
-                    overall_perf = {}
-                    flipped_metrics = []
-                    
-                    for m in ["Geography", "Time", "Total"]:
-                        m_key, s_key = f"Michael_{m}", f"Sarah_{m}"
-                        mb_old, sb_old = state[m_key], state[s_key]
-                        old_w = state[m]
-                        
-                        state[m_key] += scores[m_key]
-                        state[s_key] += scores[s_key]
-                        ma_new, sa_new = state[m_key], state[s_key]
-                        
-                        new_w = "Michael" if ma_new > sa_new else ("Sarah" if sa_new > ma_new else "Tie")
-                        
-                        overall_perf[m] = {
-                            "Michael": {"before": mb_old, "after": ma_new, "shift": scores[m_key]},
-                            "Sarah": {"before": sb_old, "after": sa_new, "shift": scores[s_key]},
-                            "old_leader": old_w, "new_leader": new_w, "did_flip": new_w != old_w
-                        }
-                        
-                        if new_w != old_w:
-                            flipped_metrics.append(m)
-                            state[m] = new_w
-                            
-                    if flipped_metrics:
-                        events.append({
-                            "date": dt, "category": "Discovery", "event_type": "location_flip",
-                            "subtype": l_type, "name": l_name, "country": parent if parent else "",
-                            "overall_perf": overall_perf, "gap": gap, "is_rare": gap >= 25, "appearances": app_count
-                        })
-                    elif gap >= 25:
-                        events.append({
-                            "date": dt, "category": "Discovery", "event_type": "rare_location",
-                            "subtype": l_type, "name": l_name, "country": parent if parent else "",
-                            "overall_perf": overall_perf, "gap": gap, "appearances": app_count
-                        })
-                        
-    return events
-
-def generate_year_events(df):
+def generate_year_events(df, state=None):
     if df.empty: return []
-    events = []
-    perf_data = df.copy()
-    
-    # Strictly base row "Total Score" on Geography + Time 
-    for p in ["Michael", "Sarah"]:
-        geo_col = f"{p} Geography Score"
-        time_col = f"{p} Time Score"
-        if geo_col not in perf_data.columns: perf_data[geo_col] = 0
-        if time_col not in perf_data.columns: perf_data[time_col] = 0
-        perf_data[geo_col] = perf_data[geo_col].fillna(0)
-        perf_data[time_col] = perf_data[time_col].fillna(0)
-        perf_data[f"{p} Total Score"] = perf_data[geo_col] + perf_data[time_col]
-            
-    years_state = {}
-    last_seen_day = {}
-    appearances = {}
-    
-    unique_dates = sorted(perf_data["Date"].unique())
-    date_to_day = {d: i for i, d in enumerate(unique_dates, start=1)}
-    
-    for dt in unique_dates:
-        day_data = perf_data[perf_data["Date"] == dt]
-        current_day = date_to_day[dt]
-        day_years = {}
-        
-        for _, r in day_data.iterrows():
-            y = r.get("Year")
-            if pd.isna(y): continue
-            ystr = str(int(y))
-            
-            if ystr not in day_years:
-                day_years[ystr] = {
-                    "Michael_Geography": 0, "Michael_Time": 0, "Michael_Total": 0,
-                    "Sarah_Geography": 0, "Sarah_Time": 0, "Sarah_Total": 0
-                }
-            dl = day_years[ystr]
-            for p in ["Michael", "Sarah"]:
-                dl[f"{p}_Geography"] += r[f"{p} Geography Score"]
-                dl[f"{p}_Time"] += r[f"{p} Time Score"]
-                dl[f"{p}_Total"] += r[f"{p} Total Score"]
-        
-        for ystr, scores in day_years.items():
-            prev_day = last_seen_day.get(ystr, 0)
-            gap = current_day - prev_day if prev_day > 0 else 0
-            last_seen_day[ystr] = current_day
-            appearances[ystr] = appearances.get(ystr, 0) + 1
-            app_count = appearances[ystr]
-            
-            if ystr not in years_state:
-                state = {
-                    "Michael_Geography": 0, "Michael_Time": 0, "Michael_Total": 0,
-                    "Sarah_Geography": 0, "Sarah_Time": 0, "Sarah_Total": 0,
-                    "Geography": "Tie", "Time": "Tie", "Total": "Tie"
-                }
-                years_state[ystr] = state
-                
-                for k in ["Michael_Geography", "Michael_Time", "Michael_Total", "Sarah_Geography", "Sarah_Time", "Sarah_Total"]:
-                    state[k] += scores[k]
-                    
-                perf = {}
-                for m in ["Geography", "Time", "Total"]:
-                    m_score, s_score = state[f"Michael_{m}"], state[f"Sarah_{m}"]
-                    w = "Michael" if m_score > s_score else ("Sarah" if s_score > m_score else "Tie")
-                    state[m] = w
-                    perf[m] = (w, abs(m_score - s_score))
-                    
-                events.append({
-                    "date": dt, "category": "Year", "event_type": "year_discovery",
-                    "subtype": "new_year", "name": ystr, "perf": perf, "gap": gap
-                })
-            else:
-                state = years_state[ystr]
-                overall_perf = {}
-                flipped_metrics = []
-                
-                for m in ["Geography", "Time", "Total"]:
-                    m_key, s_key = f"Michael_{m}", f"Sarah_{m}"
-                    mb_old, sb_old = state[m_key], state[s_key]
-                    old_w = state[m]
-                    
-                    state[m_key] += scores[m_key]
-                    state[s_key] += scores[s_key]
-                    ma_new, sa_new = state[m_key], state[s_key]
-                    
-                    new_w = "Michael" if ma_new > sa_new else ("Sarah" if sa_new > ma_new else "Tie")
-                    
-                    overall_perf[m] = {
-                        "Michael": {"before": mb_old, "after": ma_new, "shift": scores[m_key]},
-                        "Sarah": {"before": sb_old, "after": sa_new, "shift": scores[s_key]},
-                        "old_leader": old_w, "new_leader": new_w, "did_flip": new_w != old_w
-                    }
-                    if new_w != old_w:
-                        flipped_metrics.append(m)
-                        state[m] = new_w
-                        
-                if flipped_metrics:
-                    events.append({
-                        "date": dt, "category": "Year", "event_type": "year_flip",
-                        "subtype": "year", "name": ystr, "overall_perf": overall_perf, "gap": gap, "is_rare": gap >= 25, "appearances": app_count
-                    })
-                elif gap >= 25:
-                    events.append({
-                        "date": dt, "category": "Year", "event_type": "rare_year",
-                        "subtype": "year", "name": ystr, "overall_perf": overall_perf, "gap": gap, "appearances": app_count
-                    })
-    return events
+    s = {} if state is None else state
+    df = resume_rows(df, s)
+    y = df["Year"].astype(float)
+    rows = tally_rows(df, "year", y.dropna().astype(int).astype(str).reindex(df.index))
+    return tally_events(tally_daily(rows, df["Date"], s), "Year", ["year_discovery", "year_flip", "rare_year"])
 
-def generate_decade_events(df):
+def generate_decade_events(df, state=None):
     if df.empty: return []
-    events = []
-    perf_data = df.copy()
-    
-    # Strictly base row "Total Score" on Geography + Time 
-    for p in ["Michael", "Sarah"]:
-        geo_col = f"{p} Geography Score"
-        time_col = f"{p} Time Score"
-        if geo_col not in perf_data.columns: perf_data[geo_col] = 0
-        if time_col not in perf_data.columns: perf_data[time_col] = 0
-        perf_data[geo_col] = perf_data[geo_col].fillna(0)
-        perf_data[time_col] = perf_data[time_col].fillna(0)
-        perf_data[f"{p} Total Score"] = perf_data[geo_col] + perf_data[time_col]
-            
-    decades_state = {}
-    last_seen_day = {}
-    appearances = {}
-    
-    unique_dates = sorted(perf_data["Date"].unique())
-    date_to_day = {d: i for i, d in enumerate(unique_dates, start=1)}
-    
-    for dt in unique_dates:
-        day_data = perf_data[perf_data["Date"] == dt]
-        current_day = date_to_day[dt]
-        day_decades = {}
-        
-        for _, r in day_data.iterrows():
-            y = r.get("Year")
-            if pd.isna(y): continue
-            dstr = str(int(y // 10) * 10) + "s"
-            
-            if dstr not in day_decades:
-                day_decades[dstr] = {
-                    "Michael_Geography": 0, "Michael_Time": 0, "Michael_Total": 0,
-                    "Sarah_Geography": 0, "Sarah_Time": 0, "Sarah_Total": 0
-                }
-            dl = day_decades[dstr]
-            for p in ["Michael", "Sarah"]:
-                dl[f"{p}_Geography"] += r[f"{p} Geography Score"]
-                dl[f"{p}_Time"] += r[f"{p} Time Score"]
-                dl[f"{p}_Total"] += r[f"{p} Total Score"]
-        
-        for dstr, scores in day_decades.items():
-            prev_day = last_seen_day.get(dstr, 0)
-            gap = current_day - prev_day if prev_day > 0 else 0
-            last_seen_day[dstr] = current_day
-            appearances[dstr] = appearances.get(dstr, 0) + 1
-            app_count = appearances[dstr]
-            
-            if dstr not in decades_state:
-                state = {
-                    "Michael_Geography": 0, "Michael_Time": 0, "Michael_Total": 0,
-                    "Sarah_Geography": 0, "Sarah_Time": 0, "Sarah_Total": 0,
-                    "Geography": "Tie", "Time": "Tie", "Total": "Tie"
-                }
-                decades_state[dstr] = state
-                
-                for k in ["Michael_Geography", "Michael_Time", "Michael_Total", "Sarah_Geography", "Sarah_Time", "Sarah_Total"]:
-                    state[k] += scores[k]
-                    
-                perf = {}
-                for m in ["Geography", "Time", "Total"]:
-                    m_score, s_score = state[f"Michael_{m}"], state[f"Sarah_{m}"]
-                    w = "Michael" if m_score > s_score else ("Sarah" if s_score > m_score else "Tie")
-                    state[m] = w
-                    perf[m] = (w, abs(m_score - s_score))
-                    
-                events.append({
-                    "date": dt, "category": "Decade", "event_type": "decade_discovery",
-                    "subtype": "new_decade", "name": dstr, "perf": perf, "gap": gap
-                })
-            else:
-                state = decades_state[dstr]
-                overall_perf = {}
-                flipped_metrics = []
-                
-                for m in ["Geography", "Time", "Total"]:
-                    m_key, s_key = f"Michael_{m}", f"Sarah_{m}"
-                    mb_old, sb_old = state[m_key], state[s_key]
-                    old_w = state[m]
-                    
-                    state[m_key] += scores[m_key]
-                    state[s_key] += scores[s_key]
-                    ma_new, sa_new = state[m_key], state[s_key]
-                    
-                    new_w = "Michael" if ma_new > sa_new else ("Sarah" if sa_new > ma_new else "Tie")
-                    
-                    overall_perf[m] = {
-                        "Michael": {"before": mb_old, "after": ma_new, "shift": scores[m_key]},
-                        "Sarah": {"before": sb_old, "after": sa_new, "shift": scores[s_key]},
-                        "old_leader": old_w, "new_leader": new_w, "did_flip": new_w != old_w
-                    }
-                    if new_w != old_w:
-                        flipped_metrics.append(m)
-                        state[m] = new_w
-                        
-                if flipped_metrics:
-                    events.append({
-                        "date": dt, "category": "Decade", "event_type": "decade_flip",
-                        "subtype": "decade", "name": dstr, "overall_perf": overall_perf, "gap": gap, "is_rare": gap >= 25, "appearances": app_count
-                    })
-                elif gap >= 25:
-                    events.append({
-                        "date": dt, "category": "Decade", "event_type": "rare_decade",
-                        "subtype": "decade", "name": dstr, "overall_perf": overall_perf, "gap": gap, "appearances": app_count
-                    })
-    return events
+    s = {} if state is None else state
+    df = resume_rows(df, s)
+    y = df["Year"].astype(float)
+    rows = tally_rows(df, "decade", ((y.dropna() // 10) * 10).astype(int).astype(str).add("s").reindex(df.index))
+    return tally_events(tally_daily(rows, df["Date"], s), "Decade", ["decade_discovery", "decade_flip", "rare_decade"])
 
 def get_full_category_forecast(df, cat):
     if len(df) < 5: return None
@@ -1320,6 +1029,72 @@ def get_full_category_forecast(df, cat):
         if acts: sh += f"""<div style="margin-top:10px; padding-top:10px; border-top:1px dashed #ccc;"><div style="font-size:10px; font-weight:700; color:#999; margin-bottom:5px; text-transform:uppercase;">Active Score Runs</div>{''.join(acts)}</div>"""
     return {"category": cat, "l5": l5, "m5": m5, "l10": l10, "m10": m10, "streaks_html": sh}
 
+NEWS_EVENTS_CACHE = "Data/Timeguessr_News_Events.pkl"
+NEWS_EVENTS_FORMAT = 3  # bump when a generator's saved state changes shape
+NEWS_FEED_VERSION = 1  # bump when render_daily_news's output changes
+NEWS_COLS = ["Date", "City", "Subdivision", "Country", "Year"] + [
+    f"{p} {c} Score" for p in ["Michael", "Sarah"] for c in ["Geography", "Time"]
+]
+
+def generate_all_events(raw, margins, states):
+    """Every feed event in feed order. `margins` maps each score category to
+    its `prepare_margins_data` frame; each generator call resumes from its
+    own entry in `states`."""
+    def state(*key): return states.setdefault(key, {})
+    evs = []
+    for cat, df in margins.items():
+        for w in [5, 10]: evs.extend(generate_news_events(df, cat, w, state=state("news", cat, w)))
+    for cat, df in margins.items():
+        for w in [5, 10]: evs.extend(generate_momentum_score_events(df, cat, w, state=state("momentum", cat, w)))
+    for cat, df in margins.items(): evs.extend(generate_streak_events(df, cat, state=state("streak", cat)))
+    for cat, df in margins.items(): evs.extend(generate_score_threshold_streaks(df, state=state("threshold", cat)))
+    for cat, df in margins.items(): evs.extend(generate_margin_record_events(df, cat, state=state("margin", cat)))
+    for cat, df in margins.items(): evs.extend(generate_score_record_events(df, cat, state=state("score", cat)))
+    evs.extend(generate_location_events(raw, state=state("location")))
+    evs.extend(generate_year_events(raw, state=state("year")))
+    evs.extend(generate_decade_events(raw, state=state("decade")))
+    evs.extend(generate_milestone_events(raw, state=state("milestone")))
+    return evs
+
+def history_hash(raw, margins, last_date):
+    """Content hash of every generator input up to and including `last_date`."""
+    h = hashlib.sha1()
+    parts = [raw.loc[raw["Date"] <= last_date, [c for c in NEWS_COLS if c in raw.columns]]]
+    parts += [df[df["Date"] <= last_date] for df in margins.values()]
+    for part in parts:
+        h.update(pd.util.hash_pandas_object(part, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def load_news_feed(version):
+    """(events, forecasts) for stats `version`. Events are persisted with the
+    generator states in NEWS_EVENTS_CACHE. When the new stats only add dates
+    after the last cached one, the generators resume from their saved state
+    and only the new dates are processed; any other change rebuilds."""
+    raw = load_data()
+    margins = {cat: prepare_margins_data(cat.split()[0]) for cat in ["Total Score", "Time Score", "Geography Score"]}
+    forecasts = [get_full_category_forecast(df, cat) for cat, df in margins.items()]
+    if raw.empty: return [], forecasts
+
+    try:
+        with open(NEWS_EVENTS_CACHE, "rb") as f: cached = pickle.load(f)
+    except Exception: cached = None
+    if cached and cached.get("format") != NEWS_EVENTS_FORMAT: cached = None
+    if cached and cached["version"] == version:
+        return cached["events"], forecasts
+    if cached and cached["history"] == history_hash(raw, margins, cached["last_date"]):
+        events, states = cached["events"], cached["states"]
+    else:
+        events, states = [], {}
+    events = events + generate_all_events(raw, margins, states)
+
+    last_date = raw["Date"].max()
+    tmp = NEWS_EVENTS_CACHE + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump({"format": NEWS_EVENTS_FORMAT, "version": version, "last_date": last_date, "history": history_hash(raw, margins, last_date), "events": events, "states": states}, f)
+    os.replace(tmp, NEWS_EVENTS_CACHE)
+    return events, forecasts
+
 def render_forecast_section(fs_list):
     html = '<div class="forecast-container">'
     icons = {"Total Score": "🏆", "Time Score": "⏱️", "Geography Score": "🌍"}
@@ -1902,49 +1677,9 @@ def render_daily_news(dt, evs):
         rh += '</div>'
     return f"""<div class="daily-card" id="{day_id}"><div class="daily-header"><span class="daily-date">{ds}</span><span class="daily-badge">{ec} Updates</span></div><div class="events-list">{rh}</div></div>"""
 
-stats_mtime = os.path.getmtime("./Data/Timeguessr_Stats.csv") if os.path.exists("./Data/Timeguessr_Stats.csv") else 0
-raw_data = load_data(mtime=stats_mtime)
-if not raw_data.empty:
-    df_t, df_tm, df_g = prepare_total_margins_data(raw_data), prepare_time_margins_data(raw_data), prepare_geography_margins_data(raw_data)
-    all_evs = []
-    all_evs.extend(generate_news_events(df_t, "Total Score", 5))
-    all_evs.extend(generate_news_events(df_t, "Total Score", 10))
-    all_evs.extend(generate_news_events(df_tm, "Time Score", 5))
-    all_evs.extend(generate_news_events(df_tm, "Time Score", 10))
-    all_evs.extend(generate_news_events(df_g, "Geography Score", 5))
-    all_evs.extend(generate_news_events(df_g, "Geography Score", 10))
-    all_evs.extend(generate_momentum_score_events(df_t, "Total Score", 5))
-    all_evs.extend(generate_momentum_score_events(df_t, "Total Score", 10))
-    all_evs.extend(generate_momentum_score_events(df_tm, "Time Score", 5))
-    all_evs.extend(generate_momentum_score_events(df_tm, "Time Score", 10))
-    all_evs.extend(generate_momentum_score_events(df_g, "Geography Score", 5))
-    all_evs.extend(generate_momentum_score_events(df_g, "Geography Score", 10))
-    all_evs.extend(generate_streak_events(df_t, "Total Score"))
-    all_evs.extend(generate_streak_events(df_tm, "Time Score"))
-    all_evs.extend(generate_streak_events(df_g, "Geography Score"))
-    all_evs.extend(generate_score_threshold_streaks(df_t))
-    all_evs.extend(generate_score_threshold_streaks(df_tm)) 
-    all_evs.extend(generate_score_threshold_streaks(df_g)) 
-    all_evs.extend(generate_margin_record_events(df_t, "Total Score"))
-    all_evs.extend(generate_margin_record_events(df_tm, "Time Score"))
-    all_evs.extend(generate_margin_record_events(df_g, "Geography Score"))
-    all_evs.extend(generate_score_record_events(df_t, "Total Score"))
-    all_evs.extend(generate_score_record_events(df_tm, "Time Score"))
-    all_evs.extend(generate_score_record_events(df_g, "Geography Score"))
-    all_evs.extend(generate_location_events(raw_data))
-    all_evs.extend(generate_year_events(raw_data))
-    all_evs.extend(generate_decade_events(raw_data))
-    all_evs.extend(generate_milestone_events(raw_data))
-    
-    with st.sidebar:
-        st.header("Feed Settings")
-        sf = st.multiselect("Filter Categories:", options=list(FEED_CATEGORIES.keys()), default=list(FEED_CATEGORIES.keys()))
-
-    st.markdown('<div id="top"></div>', unsafe_allow_html=True)
-    st.markdown("""<div class="page-header"><h1 class="page-title">The Daily Guessr</h1><div class="page-subtitle">Tracking Momentum & Leaderboard Shifts</div></div>""", unsafe_allow_html=True)
-    st.markdown(render_forecast_section([get_full_category_forecast(df_t, "Total Score"), get_full_category_forecast(df_tm, "Time Score"), get_full_category_forecast(df_g, "Geography Score")]), unsafe_allow_html=True)
-    st.markdown('<a href="#top" class="back-to-top">↑</a>', unsafe_allow_html=True)
-    
+def news_feed_html(all_evs, sf):
+    """The feed of `all_evs` in the categories `sf`, newest day first (kept on
+    disk), or None when no event matches."""
     # Collect requested event types based on sidebar selection
     active_types = set()
     for cat_name in sf:
@@ -1957,16 +1692,35 @@ if not raw_data.empty:
         d = e['date']
         if d not in ev_d: ev_d[d] = []
         ev_d[d].append(e)
-        
+
     sd = sorted(ev_d.keys(), reverse=True)
-    
-    if not sd: 
-        st.markdown('<div class="news-container"><div style="text-align:center; padding:50px; color:#666; font-size: 18px;">No news events detected matching your filters.</div></div>', unsafe_allow_html=True)
-    else:
+    if not sd:
+        return None
+
+    def build_feed():
         feed_html = '<div class="news-container">\n'
         for d in sd:
             feed_html += render_daily_news(d, ev_d[d]) + '\n'
-        feed_html += '</div>'
+        return feed_html + '</div>'
+    return disk_cached("news_feed", NEWS_FEED_VERSION, (frozenset(sf),), build_feed)
+
+raw_data = load_data()
+if not raw_data.empty:
+    all_evs, forecasts = load_news_feed(stats_version())
+    
+    with st.sidebar:
+        st.header("Feed Settings")
+        sf = st.multiselect("Filter Categories:", options=list(FEED_CATEGORIES.keys()), default=list(FEED_CATEGORIES.keys()))
+
+    st.markdown('<div id="top"></div>', unsafe_allow_html=True)
+    st.markdown("""<div class="page-header"><h1 class="page-title">The Daily Guessr</h1><div class="page-subtitle">Tracking Momentum & Leaderboard Shifts</div></div>""", unsafe_allow_html=True)
+    st.markdown(render_forecast_section(forecasts), unsafe_allow_html=True)
+    st.markdown('<a href="#top" class="back-to-top">↑</a>', unsafe_allow_html=True)
+    
+    feed_html = news_feed_html(all_evs, sf)
+    if feed_html is None:
+        st.markdown('<div class="news-container"><div style="text-align:center; padding:50px; color:#666; font-size: 18px;">No news events detected matching your filters.</div></div>', unsafe_allow_html=True)
+    else:
         st.markdown(feed_html, unsafe_allow_html=True)
 
 else: st.warning("Please ensure 'Timeguessr_Stats.csv' is in the 'Data' folder.")
\ No newline at end of file
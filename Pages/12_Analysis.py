@@ -1,4 +1,3 @@
-import os
 import streamlit as st
 import pandas as pd
 import plotly.express as px
@@ -9,6 +8,7 @@ import numpy as np
 # --- Configuration ---
 st.set_page_config(page_title="Analysis", layout="wide")
 from background import set_random_sarah_background
+from data_service import get_margins
 set_random_sarah_background(lightness_level=0.7)
 
 # --- Load Global CSS ---
@@ -127,43 +127,11 @@ st.markdown(
 )
 
 # --- Helper Functions ---
-@st.cache_data
-def load_data(mtime=0):
+def load_data():
     try:
-        df = pd.read_csv("./Data/Timeguessr_Stats.csv")
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-        
-        # Helper to clean numeric columns
-        def clean_col(col_name):
-            if col_name in df.columns:
-                return pd.to_numeric(df[col_name], errors='coerce').fillna(0)
-            return pd.Series(0, index=df.index)
-
-        # Totals
-        df['Michael Total Score'] = clean_col('Michael Total Score')
-        df['Sarah Total Score'] = clean_col('Sarah Total Score')
-        
-        # Component Scores - Load and calculate Average of Min/Max
-        df['Michael Geography Score (Min)'] = clean_col('Michael Geography Score (Min)')
-        df['Michael Geography Score (Max)'] = clean_col('Michael Geography Score (Max)')
-        df['Sarah Geography Score (Min)'] = clean_col('Sarah Geography Score (Min)')
-        df['Sarah Geography Score (Max)'] = clean_col('Sarah Geography Score (Max)')
-        
-        df['M_Geo_Row'] = (df['Michael Geography Score (Min)'] + df['Michael Geography Score (Max)']) / 2
-        df['S_Geo_Row'] = (df['Sarah Geography Score (Min)'] + df['Sarah Geography Score (Max)']) / 2
-
-        df['Michael Time Score (Min)'] = clean_col('Michael Time Score (Min)')
-        df['Michael Time Score (Max)'] = clean_col('Michael Time Score (Max)')
-        df['Sarah Time Score (Min)'] = clean_col('Sarah Time Score (Min)')
-        df['Sarah Time Score (Max)'] = clean_col('Sarah Time Score (Max)')
-
-        df['M_Time_Row'] = (df['Michael Time Score (Min)'] + df['Michael Time Score (Max)']) / 2
-        df['S_Time_Row'] = (df['Sarah Time Score (Min)'] + df['Sarah Time Score (Max)']) / 2
-        
-        # Filter for rows where data exists (Based on Total Score Presence)
-        df = df[(df['Michael Total Score'] > 0) & (df['Sarah Total Score'] > 0)].copy()
-        
-        return df
+        # One row per mutually played day with daily totals and summed
+        # (imputed) Geography/Time scores
+        return get_margins()
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return None
@@ -222,24 +190,15 @@ metric_option = st.radio(
     horizontal=True
 )
 
-stats_mtime = os.path.getmtime("./Data/Timeguessr_Stats.csv") if os.path.exists("./Data/Timeguessr_Stats.csv") else 0
-df_raw = load_data(stats_mtime)
+df_raw = load_data()
 
 if df_raw is not None and not df_raw.empty:
     
-    # --- CRITICAL STEP: Aggregate to Daily Level based on Selection ---
-    if metric_option == "Total Score":
-        agg_cols = {'Michael Total Score': 'max', 'Sarah Total Score': 'max'}
-        rename_map = {'Michael Total Score': 'Michael Score', 'Sarah Total Score': 'Sarah Score'}
-    elif metric_option == "Geography Score":
-        agg_cols = {'M_Geo_Row': 'sum', 'S_Geo_Row': 'sum'}
-        rename_map = {'M_Geo_Row': 'Michael Score', 'S_Geo_Row': 'Sarah Score'}
-    else: # Time Score
-        agg_cols = {'M_Time_Row': 'sum', 'S_Time_Row': 'sum'}
-        rename_map = {'M_Time_Row': 'Michael Score', 'S_Time_Row': 'Sarah Score'}
-
-    df = df_raw.groupby('Date').agg(agg_cols).reset_index()
-    df.rename(columns=rename_map, inplace=True)
+    # --- CRITICAL STEP: Pick the Daily Columns based on Selection ---
+    df = df_raw[['Date', f'Michael {metric_option}', f'Sarah {metric_option}']].rename(columns={
+        f'Michael {metric_option}': 'Michael Score',
+        f'Sarah {metric_option}': 'Sarah Score',
+    })
 
     # --- Data Processing on DAILY DataFrame ---
     df['Day'] = df['Date'].dt.day_name()
@@ -1,5 +1,4 @@
-import io
-import os
+import hashlib
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
@@ -10,6 +9,8 @@ import numpy as np
 # ──────────────────────────────────────────────────────────────────────────────
 st.set_page_config(layout="wide", page_title="Electoral College")
 from background import set_random_sarah_background
+from data_service import get_imputed_stats
+from disk_cache import disk_cached
 set_random_sarah_background(lightness_level=0.7)
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -89,6 +90,7 @@ WIN_LABELS = {
     'tied':    'Tied',
     'third':   'Not Played',
 }
+WINNER_KEYS = list(WIN_LABELS)
 
 # ──────────────────────────────────────────────────────────────────────────────
 # CSS & Styles
@@ -178,43 +180,31 @@ st.markdown("""
 # ──────────────────────────────────────────────────────────────────────────────
 # Data Loading
 # ──────────────────────────────────────────────────────────────────────────────
-@st.cache_data
-def load_data(mtime=0):
+def load_data():
     try:
-        df = pd.read_csv("./Data/Timeguessr_Stats.csv")
-        df["Date"] = pd.to_datetime(df["Date"], errors='coerce')
-
-        def fill_missing_scores(prefix, round_col_name):
-            geo_col  = f"{prefix} Geography Score"
-            time_col = f"{prefix} Time Score"
-            geo_min,  geo_max  = f"{geo_col} (Min)",  f"{geo_col} (Max)"
-            time_min, time_max = f"{time_col} (Min)", f"{time_col} (Max)"
-            if not {geo_min, geo_max, time_min, time_max}.issubset(df.columns):
-                return
-            m_geo  = df[geo_col].isna()  & df[geo_min].notna()  & df[geo_max].notna()
-            m_time = df[time_col].isna() & df[time_min].notna() & df[time_max].notna()
-            if m_geo.any():
-                df.loc[m_geo,  geo_col]  = (df.loc[m_geo,  geo_min]  + df.loc[m_geo,  geo_max])  / 2
-            if m_time.any():
-                df.loc[m_time, time_col] = (df.loc[m_time, time_min] + df.loc[m_time, time_max]) / 2
-            if round_col_name and round_col_name in df.columns:
-                m_rnd = df[round_col_name].isna() & df[geo_col].notna() & df[time_col].notna()
-                if m_rnd.any():
-                    df.loc[m_rnd, round_col_name] = df.loc[m_rnd, geo_col] + df.loc[m_rnd, time_col]
-
-        m_col = 'Michael Round Score' if 'Michael Round Score' in df.columns else None
-        s_col = 'Sarah Round Score'   if 'Sarah Round Score'   in df.columns else None
-        fill_missing_scores('Michael', m_col)
-        fill_missing_scores('Sarah',   s_col)
-        return df
+        return get_imputed_stats()
     except FileNotFoundError:
         st.error("Stats file not found at ./Data/Timeguessr_Stats.csv")
         st.stop()
 
+def date_range(raw):
+    """The date slider's full range: the first date with a location to the last date played."""
+    return raw[raw['Country'].notna()]["Date"].min().date(), raw["Date"].max().date()
+
+def filter_dates(data, sel_dates):
+    if not sel_dates:
+        return data.copy()
+    return data[
+        (data["Date"].dt.date >= sel_dates[0]) &
+        (data["Date"].dt.date <= sel_dates[1])
+    ].copy()
+
 # ──────────────────────────────────────────────────────────────────────────────
 # State Results (snapshot)
 # ──────────────────────────────────────────────────────────────────────────────
-def calculate_state_results(df, score_mode):
+def us_state_scores(df, score_mode):
+    """US rounds both players have a round score for, with a normalized
+    `State` and the selected mode's per-round scores in `_m` / `_s`."""
     us_df = df[
         df['Country'].isin(['United States', 'USA', 'United States of America'])
     ].copy()
@@ -241,6 +231,10 @@ def calculate_state_results(df, score_mode):
     else:
         us_df['_m'] = us_df['Michael Time Score']
         us_df['_s'] = us_df['Sarah Time Score']
+    return us_df
+
+def calculate_state_results(df, score_mode):
+    us_df = us_state_scores(df, score_mode)
 
     m_played = us_df['_m'].notna()
     s_played = us_df['_s'].notna()
@@ -271,143 +265,87 @@ def calculate_state_results(df, score_mode):
 # ──────────────────────────────────────────────────────────────────────────────
 # EV Timeline
 # ──────────────────────────────────────────────────────────────────────────────
-@st.cache_data
-def calculate_ev_timeline(df_json, score_mode, is_tg):
-    """
-    Returns a DataFrame with columns:
-        Date, michael_votes, sarah_votes, tied_votes, third_votes, total_votes
-    one row per unique date on which the EV tally changes.
+TIMELINE_COLS = ['Date', 'Country', 'Subdivision'] + [
+    f'{p} {c} Score' for p in ('Michael', 'Sarah') for c in ('Round', 'Geography', 'Time')
+]
 
-    Strategy: replay rows chronologically, maintaining per-state running
-    score totals; after every new date boundary, recompute state winners
-    and EV sums — but only emit a row when something actually changed.
-    """
-    df = pd.read_json(io.StringIO(df_json), orient='split')
-    df['Date'] = pd.to_datetime(df['Date'])
+EV_TIMELINE_VERSION = 1  # bump when build_ev_timeline's output changes
 
-    us_df = df[df['Country'].isin(['United States', 'USA', 'United States of America'])].copy()
-    us_df['State'] = us_df['Subdivision'].replace(SUBDIV_NORMALIZATION)
-    us_df = us_df[us_df['State'].notna()]
+def timeline_frame(df):
+    """The columns of `df` that `calculate_ev_timeline` reads."""
+    return df[[c for c in TIMELINE_COLS if c in df.columns]]
 
-    m_total_col = 'Michael Round Score' if 'Michael Round Score' in us_df.columns else None
-    s_total_col = 'Sarah Round Score'   if 'Sarah Round Score'   in us_df.columns else None
-    if m_total_col and s_total_col:
-        us_df = us_df[us_df[m_total_col].notna() & us_df[s_total_col].notna()]
+def frame_hash(df):
+    """Content hash of `df`, used as the cache key in place of the frame."""
+    return hashlib.sha1(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()
 
-    # Pick the scoring column
-    if score_mode == "Total Score":
-        score_col_m = 'Michael Round Score' if 'Michael Round Score' in us_df.columns else None
-        score_col_s = 'Sarah Round Score'   if 'Sarah Round Score'   in us_df.columns else None
-        us_df['_m'] = us_df[score_col_m] if score_col_m else (
-            us_df['Michael Geography Score'].fillna(0) + us_df['Michael Time Score'].fillna(0))
-        us_df['_s'] = us_df[score_col_s] if score_col_s else (
-            us_df['Sarah Geography Score'].fillna(0) + us_df['Sarah Time Score'].fillna(0))
-    elif score_mode == "Geography Score":
-        us_df['_m'] = us_df['Michael Geography Score']
-        us_df['_s'] = us_df['Sarah Geography Score']
-    else:
-        us_df['_m'] = us_df['Michael Time Score']
-        us_df['_s'] = us_df['Sarah Time Score']
+@st.cache_data
+def calculate_ev_timeline(_df, df_hash, score_mode, is_tg):
+    """
+    Returns a DataFrame with columns:
+        Date, michael, sarah, tied, third, threshold, round_num
+    one row per unique date on which the EV tally changes, plus a copy of the
+    last row dated today. `_df` is not hashed by Streamlit; `df_hash` (see
+    `frame_hash`) keys this cache and the on-disk copy of `build_ev_timeline`.
+    """
+    timeline = disk_cached("ev_timeline", EV_TIMELINE_VERSION, (df_hash, score_mode, is_tg),
+                           lambda: build_ev_timeline(_df, score_mode, is_tg), sources=())
+    if timeline.empty:
+        return timeline
+    last = timeline.iloc[-1].copy()
+    last['Date'] = pd.Timestamp.now().normalize()
+    if last['Date'] > timeline['Date'].iloc[-1]:
+        timeline = pd.concat([timeline, last.to_frame().T], ignore_index=True)
+    return timeline
 
-    us_df = us_df.sort_values('Date').reset_index(drop=True)
+def build_ev_timeline(_df, score_mode, is_tg):
+    """
+    The EV timeline up to the last date played (see `calculate_ev_timeline`).
 
-    # Running per-state accumulators
-    state_m_score  = {}   # state → cumulative michael score
-    state_s_score  = {}   # state → cumulative sarah score
-    state_m_rounds = {}   # state → michael round count
-    state_s_rounds = {}   # state → sarah round count
+    Strategy: pivot per-state score sums and round counts into a
+    date × state grid and cumsum it down the dates, so every state's winner
+    on every date falls out of one vectorized comparison. Tallies are the
+    EV (or rounds, in TG mode) of the states each player holds; a row is
+    kept only where the tally differs from the previous date.
+    """
+    us_df = us_state_scores(_df, score_mode)
+    if us_df.empty:
+        return pd.DataFrame(columns=['Date', 'michael', 'sarah', 'tied', 'third', 'threshold', 'round_num'])
 
-    # Current winner per state (cached to detect changes)
-    state_winner = {}
+    dates  = pd.DatetimeIndex(us_df['Date'].unique()).sort_values()
+    states = list(ELECTORAL_VOTES)
+    ev_df  = us_df[us_df['State'].isin(states)]
 
-    def state_ev(state):
-        return ELECTORAL_VOTES.get(state, 0)
+    per_day = pd.DataFrame({
+        'Date': ev_df['Date'], 'State': ev_df['State'],
+        'ms': ev_df['_m'].fillna(0).astype(np.float64), 'ss': ev_df['_s'].fillna(0).astype(np.float64),
+        'mr': ev_df['_m'].notna().astype(int), 'sr': ev_df['_s'].notna().astype(int),
+    }).groupby(['Date', 'State']).sum()
 
-    def compute_winner(state):
-        ms = state_m_score.get(state, 0)
-        ss = state_s_score.get(state, 0)
-        mr = state_m_rounds.get(state, 0)
-        sr = state_s_rounds.get(state, 0)
-        if mr == 0 and sr == 0: return 'third'
-        if mr > 0  and sr == 0: return 'michael'
-        if sr > 0  and mr == 0: return 'sarah'
-        if ms > ss: return 'michael'
-        if ss > ms: return 'sarah'
-        return 'tied'
+    def cumulative(col):
+        grid = per_day[col].unstack('State').reindex(index=dates, columns=states).fillna(0)
+        return grid.to_numpy().cumsum(axis=0)
 
-    def tally(is_tg_mode):
-        ev = {'michael': 0, 'sarah': 0, 'tied': 0, 'third': 0}
-        if is_tg_mode:
-            for state in ELECTORAL_VOTES:
-                mr = state_m_rounds.get(state, 0)
-                sr = state_s_rounds.get(state, 0)
-                w  = state_winner.get(state, 'third')
-                ev[w] += mr + sr
-            # Unplayed states have 0 rounds; add nothing — they just stay in 'third' with 0
-        else:
-            for state, votes in ELECTORAL_VOTES.items():
-                w = state_winner.get(state, 'third')
-                ev[w] += votes
-        return ev
-
-    rows = []
-    prev_ev = None
-
-    total_rounds = 0
-
-    # Group by date — process all rounds that happened on the same day together
-    for date, group in us_df.groupby('Date', sort=True):
-        changed_states = set()
-        group_rounds = 0
-        for _, row in group.iterrows():
-            state = row['State']
-            if state not in ELECTORAL_VOTES:
-                continue
-            changed_states.add(state)
-            group_rounds += 1
-        total_rounds += group_rounds
-        for _, row in group.iterrows():
-            state = row['State']
-            if state not in ELECTORAL_VOTES:
-                continue
-
-            m_val = row['_m']
-            s_val = row['_s']
-
-            if pd.notna(m_val):
-                state_m_score[state]  = state_m_score.get(state, 0)  + m_val
-                state_m_rounds[state] = state_m_rounds.get(state, 0) + 1
-            if pd.notna(s_val):
-                state_s_score[state]  = state_s_score.get(state, 0)  + s_val
-                state_s_rounds[state] = state_s_rounds.get(state, 0) + 1
-
-            changed_states.add(state)
-
-        # Recompute winner for every touched state
-        for state in changed_states:
-            state_winner[state] = compute_winner(state)
-
-        current_ev = tally(is_tg)
-
-        # Dynamic threshold: for TG mode, total votes = sum of rounds played so far
-        if is_tg:
-            total_so_far = sum(current_ev.values())
-            current_threshold = total_so_far // 2 + 1
-        else:
-            current_threshold = 270
+    ms, ss, mr, sr = (cumulative(c) for c in ('ms', 'ss', 'mr', 'sr'))
 
-        if current_ev != prev_ev:
-            rows.append({'Date': date, **current_ev, 'threshold': current_threshold, 'round_num': total_rounds})
-            prev_ev = current_ev.copy()
+    # Winner codes index WINNER_KEYS: michael, sarah, tied, third
+    winner = np.select(
+        [(mr == 0) & (sr == 0), sr == 0, mr == 0, ms > ss, ss > ms],
+        [3, 0, 1, 0, 1], default=2,
+    )
+    weight = (mr + sr).astype(int) if is_tg else np.broadcast_to(np.array(list(ELECTORAL_VOTES.values())), winner.shape)
+    tally = np.stack([np.where(winner == k, weight, 0).sum(axis=1) for k in range(len(WINNER_KEYS))], axis=1)
 
-    if not rows:
-        return pd.DataFrame(columns=['Date', 'michael', 'sarah', 'tied', 'third', 'threshold', 'round_num'])
+    changed = np.r_[True, (tally[1:] != tally[:-1]).any(axis=1)]
+    threshold = tally.sum(axis=1) // 2 + 1 if is_tg else np.full(len(dates), 270)
+    round_num = ev_df.groupby('Date').size().reindex(dates, fill_value=0).cumsum().to_numpy()
 
-    timeline = pd.DataFrame(rows)
-    last = timeline.iloc[-1].copy()
-    last['Date'] = pd.Timestamp.now().normalize()
-    if last['Date'] > timeline['Date'].iloc[-1]:
-        timeline = pd.concat([timeline, last.to_frame().T], ignore_index=True)
+    timeline = pd.DataFrame({
+        'Date': dates,
+        **{k: tally[:, i] for i, k in enumerate(WINNER_KEYS)},
+        'threshold': threshold,
+        'round_num': round_num,
+    })[changed].reset_index(drop=True)
 
     return timeline
 
@@ -426,23 +364,14 @@ with st.sidebar:
         ["Total Score", "Geography Score", "Time Score"],
         index=0,
     )
-    stats_mtime = os.path.getmtime("./Data/Timeguessr_Stats.csv") if os.path.exists("./Data/Timeguessr_Stats.csv") else 0
-    if "Date" in load_data(stats_mtime).columns:
-        raw = load_data(stats_mtime)
-        min_d = raw[raw['Country'].notna()]["Date"].min().date()
-        max_d = raw["Date"].max().date()
+    if "Date" in load_data().columns:
+        min_d, max_d = date_range(load_data())
         sel_dates = st.slider("Date Range:", min_d, max_d, (min_d, max_d), format="MM/DD/YY")
     else:
         sel_dates = None
 
-data = load_data(stats_mtime)
-if sel_dates:
-    filtered_data = data[
-        (data["Date"].dt.date >= sel_dates[0]) &
-        (data["Date"].dt.date <= sel_dates[1])
-    ].copy()
-else:
-    filtered_data = data.copy()
+data = load_data()
+filtered_data = filter_dates(data, sel_dates)
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Compute snapshot results
@@ -701,9 +630,8 @@ st.markdown(f"""
 # ──────────────────────────────────────────────────────────────────────────────
 st.markdown(f'<div class="section-header">{vote_label} Over Time</div>', unsafe_allow_html=True)
 
-# Serialize filtered_data → JSON for cache-safe passing
-df_json = filtered_data.to_json(orient='split', date_format='iso')
-timeline = calculate_ev_timeline(df_json, score_mode, is_tg_college)
+timeline_data = timeline_frame(filtered_data)
+timeline = calculate_ev_timeline(timeline_data, frame_hash(timeline_data), score_mode, is_tg_college)
 
 if not timeline.empty and len(timeline) > 1:
 
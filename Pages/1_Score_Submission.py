@@ -12,13 +12,15 @@ from streamlit.components.v1 import html as components_html
 st.set_page_config(layout="wide", page_title="Timeguessr Score Submission")
 
 from background import set_random_sarah_background
+from data_service import get_stats, stats_version
+import scoring
 set_random_sarah_background(lightness_level=0.7)
 
 # --- Setup & Config ---
 try:
-    from Score_Update import score_update
+    from pipeline import run_pipeline
 except ImportError:
-    def score_update(): pass
+    def run_pipeline(force=False): pass
 
 try:
     from aggregation import (
@@ -95,7 +97,10 @@ except FileNotFoundError:
     config = {}
 
 st.title("Score Submission")
-score_update()
+
+# Stats are only rebuilt after a save on the previous run
+if st.session_state.pop("_stats_dirty", False):
+    run_pipeline()
 
 # --- 1. Constants ---
 COUNTRY_ALIASES = {
@@ -113,26 +118,36 @@ COUNTRY_ALIASES = {
     "Bosnia & Herzegovina": "Bosnia and Herzegovina",
 }
 
-GEOGRAPHY_RANGES = {
-    "OOO": (5000, 5000), "OO%": (4750, 4999), "OOX": (4500, 4749),
-    "O%X": (4250, 4499), "OXX": (3500, 4249), "%XX": (2500, 3499), "XXX": (12, 2499)
-}
-
-TIME_RANGES = {
-    "OOO": (5000, 5000), "OO%": (4800, 4950), "OOX": (4300, 4600),
-    "O%X": (3400, 3900), "OXX": (2000, 2500), "%XX": (1000, 1000), "XXX": (0, 0)
-}
+GEOGRAPHY_RANGES = scoring.GEO_PATTERN_RANGES
+TIME_RANGES = scoring.TIME_PATTERN_RANGES
 
 # --- 2. Helper Functions (Visuals & Data) ---
 @st.cache_data
-def load_data(filepath, mtime):
+def load_data(mtime):
     try:
-        df = pd.read_csv(filepath)
-        df["Date"] = pd.to_datetime(df["Date"]).dt.date
+        df = get_stats().copy()
+        df["Date"] = df["Date"].dt.date
         return df
     except FileNotFoundError:
         return None
 
+@st.cache_data
+def load_parsed(path, mtime):
+    _ = mtime  # cache-busting key only
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    df = pd.read_csv(path)
+    df.index = df['Timeguessr Day'].to_numpy()
+    return df.sort_index(kind='stable')
+
+def parsed_day(path, day):
+    """The parsed CSV at `path` and its rows for `day`."""
+    df = load_parsed(path, os.path.getmtime(path) if os.path.exists(path) else 0)
+    return df, (df.loc[[day]] if day in df.index else df.iloc[0:0])
+
+def mark_stats_dirty():
+    st.session_state["_stats_dirty"] = True
+
 def get_flag_emoji(country_name):
     import pycountry
     fallback = '<img src="https://twemoji.maxcdn.com/v/latest/svg/1f1fa-1f1f3.svg" width="20" style="vertical-align:middle;"/>'
@@ -298,30 +313,11 @@ def country_to_iso3(country_name):
 
 # --- 3. Math & Logic Helpers ---
 def geography_score(x):
-    if x <= 50: return 5000
-    elif x <= 1000: return 5000 - (x * 0.02)
-    elif x <= 5000: return 4980 - (x * 0.016)
-    elif x <= 100000: return 4900 - (x * 0.004)
-    elif x <= 1000000: return 4500 - (x * 0.001)
-    elif x <= 2000000: return 3500 - (x * 0.0005)
-    elif x <= 3000000: return 2500 - (x * 0.0003333)
-    elif x <= 6000000: return 1500 - (x * 0.0002)
-    else: return 12
+    return float(scoring.geo_score(x))
 
 def calculate_time_score(year_guessed, actual_year):
     if actual_year is None: return None
-    years_off = abs(int(year_guessed) - actual_year)
-    if years_off == 0: return 5000
-    elif years_off == 1: return 4950
-    elif years_off == 2: return 4800
-    elif years_off == 3: return 4600
-    elif years_off == 4: return 4300
-    elif years_off == 5: return 3900
-    elif years_off in [6, 7]: return 3400
-    elif years_off in [8, 9, 10]: return 2500
-    elif 10 < years_off < 16: return 2000
-    elif 15 < years_off < 21: return 1000
-    else: return 0
+    return int(scoring.time_score(int(year_guessed) - actual_year))
 
 UNIT_ALIASES = {
     "ft": "ft", "feet": "ft", "foot": "ft",
@@ -363,8 +359,7 @@ with date_col:
 df = None
 date_rows = pd.DataFrame()
 if date:
-    stats_mtime = os.path.getmtime("./Data/Timeguessr_Stats.csv") if os.path.exists("./Data/Timeguessr_Stats.csv") else 0
-    df = load_data("./Data/Timeguessr_Stats.csv", stats_mtime)
+    df = load_data(stats_version())
     if df is not None:
         date_rows = df[df["Date"] == date]
 
@@ -575,13 +570,11 @@ if date:
 
     # --- Pre-load Actuals Data ---
     act_path = "./Data/Timeguessr_Actuals_Parsed.csv"
-    act_df = pd.DataFrame()
-    if os.path.exists(act_path): act_df = pd.read_csv(act_path)
+    act_df, curr_act = parsed_day(act_path, timeguessr_day)
 
     map_mtime = os.path.getmtime("./Data/Custom_World_Map_New.json") if os.path.exists("./Data/Custom_World_Map_New.json") else 0
     map_subdivs = load_map_subdivisions(map_mtime)
     
-    curr_act = act_df[(act_df['Timeguessr Day'] == timeguessr_day)] if not act_df.empty else pd.DataFrame()
     act_exists = not curr_act.empty
     
     is_act_edit = st.session_state.get(f"edit_act_{date}", False)
@@ -590,24 +583,17 @@ if date:
             for k in [f"ay_{r_idx}_{date}", f"ac_{r_idx}_{date}", f"as_{r_idx}_{date}", f"acs_{r_idx}_{date}", f"aci_{r_idx}_{date}", f"acity_{r_idx}_{date}"]:
                 if k in st.session_state: del st.session_state[k]
     
-    m_path = "./Data/Timeguessr_Michael_Parsed.csv"
-    s_path = "./Data/Timeguessr_Sarah_Parsed.csv"
-    m_has = not pd.read_csv(m_path)[pd.read_csv(m_path)['Timeguessr Day'] == timeguessr_day].empty if os.path.exists(m_path) else False
-    s_has = not pd.read_csv(s_path)[pd.read_csv(s_path)['Timeguessr Day'] == timeguessr_day].empty if os.path.exists(s_path) else False
+    parsed = {p: parsed_day(f"./Data/Timeguessr_{p}_Parsed.csv", timeguessr_day) for p in ("Michael", "Sarah")}
+    m_has = not parsed["Michael"][1].empty
+    s_has = not parsed["Sarah"][1].empty
     
     act_hidden = date == datetime.date.today() and act_exists and not (m_has and s_has)
 
     # --- Pre-load Player State Data ---
     p_state = {}
     for p_name, opp_name in [("Michael", "Sarah"), ("Sarah", "Michael")]:
-        csv_p = f"./Data/Timeguessr_{p_name}_Parsed.csv"
-        csv_o = f"./Data/Timeguessr_{opp_name}_Parsed.csv"
-        
-        df_p = pd.read_csv(csv_p) if os.path.exists(csv_p) else pd.DataFrame()
-        df_o = pd.read_csv(csv_o) if os.path.exists(csv_o) else pd.DataFrame()
-        
-        curr_p = df_p[df_p['Timeguessr Day'] == timeguessr_day] if not df_p.empty else pd.DataFrame()
-        curr_o = df_o[df_o['Timeguessr Day'] == timeguessr_day] if not df_o.empty else pd.DataFrame()
+        _, curr_p = parsed[p_name]
+        curr_o = parsed[opp_name][1]
         
         has_g = not curr_p.empty
         opp_has_g = not curr_o.empty
@@ -629,8 +615,8 @@ if date:
             def_total = "" if pd.isna(ts) else f"{ts:g}"
 
         p_state[p_name] = {
-            'df': df_p, 'curr': curr_p, 'has_g': has_g, 'is_hid': is_hid,
-            'def_total': def_total, 'csv': csv_p,
+            'curr': curr_p, 'has_g': has_g, 'is_hid': is_hid,
+            'def_total': def_total,
             'input': {}, 'comp_tot': 0, 'edit': False,
         }
 
@@ -984,16 +970,13 @@ if date:
             st.markdown("<br>", unsafe_allow_html=True)
             if st.button("Submit Actuals", key=f"sub_act_{date}", use_container_width=True):
                 if all_valid_act:
-                    f_df = act_df[act_df['Timeguessr Day'] != timeguessr_day]
-                    f_df = pd.concat([f_df, pd.DataFrame(save_rows_act)], ignore_index=True)
-                    f_df.sort_values(['Timeguessr Day', 'Timeguessr Round']).to_csv(act_path, index=False)
-
                     rounds_for_txt = {row["Timeguessr Round"]: row for row in save_rows_act}
                     update_actuals_txt_entry(timeguessr_day, {
                         r: {'city': v['City'], 'subdivision': v['Subdivision'], 'country': v['Country'], 'year': v['Year']}
                         for r, v in rounds_for_txt.items()
                     })
 
+                    mark_stats_dirty()
                     st.session_state[f"_exit_edit_act_{date}"] = True
                     st.success("Saved!"); st.rerun()
                 else: st.error("Invalid actuals")
@@ -1079,7 +1062,6 @@ if date:
                                 st.error(f"Computed total ({int(st_state['comp_tot']):,}) differs from Total Score ({ts_val:,}) by more than 10 points.")
                                 return
 
-                            new_rows = []
                             rounds_for_txt = {}
                             for r in range(1, 6):
                                 d = st_state['input'][r]
@@ -1092,52 +1074,20 @@ if date:
                                 if d['dist_value'] < 0:
                                     st.error(f"Round {r} negative distance"); return
 
-                                act_y = actual_rounds_data.get(r, {}).get('year')
-
-                                t_dist = np.nan
-                                t_score = np.nan
-                                r_score = np.nan
-
-                                if act_y:
-                                    t_dist = abs(d['year_int'] - int(act_y))
-                                    t_score = calculate_time_score(d['year_int'], int(act_y))
-
-                                if pd.notna(t_score) and pd.notna(d['g_score']):
-                                    r_score = t_score + d['g_score']
-
                                 rounds_for_txt[r] = {
                                     'year': d['year_int'], 'dist_value': d['dist_value'], 'unit': d['unit'],
                                 }
 
-                                new_rows.append({
-                                    "Timeguessr Day": int(timeguessr_day),
-                                    "Timeguessr Round": int(r),
-                                    f"{p_name} Total Score": ts_val,
-                                    f"{p_name} Round Score": r_score,
-                                    f"{p_name} Geography Distance": int(d['dist_m']),
-                                    f"{p_name} Time Guessed": int(d['year_int']),
-                                    f"{p_name} Time Distance": t_dist,
-                                    f"{p_name} Geography Score": d['g_score'],
-                                    f"{p_name} Geography Score (Min)": d['g_score'],
-                                    f"{p_name} Geography Score (Max)": d['g_score'],
-                                    f"{p_name} Time Score": t_score,
-                                    f"{p_name} Time Score (Min)": t_score,
-                                    f"{p_name} Time Score (Max)": t_score,
-                                })
-
                             try:
-                                df_out = st_state['df'][st_state['df']['Timeguessr Day'] != timeguessr_day]
-                                df_out = pd.concat([df_out, pd.DataFrame(new_rows)], ignore_index=True)
-                                df_out.sort_values(['Timeguessr Day', 'Timeguessr Round']).to_csv(st_state['csv'], index=False)
-
+                                update_player_txt_entry(p_name, timeguessr_day, ts_val, rounds_for_txt)
                                 update_averages_entry(
                                     timeguessr_day, p_name,
                                     percentile=_to_float(pct_in),
                                     years=_to_float(yrs_in),
                                     location=_to_float(loc_in),
                                 )
-                                update_player_txt_entry(p_name, timeguessr_day, ts_val, rounds_for_txt)
 
+                                mark_stats_dirty()
                                 st.session_state[f"_exit_edit_{p_name}_{date}"] = True
                                 st.success("Saved!")
                                 st.rerun()
@@ -1217,6 +1167,7 @@ if date:
                         location_average=_to_float_c(c_loc_in),
                         rounds=rounds_payload,
                     )
+                    mark_stats_dirty()
                     st.session_state[f"_exit_edit_community_{date}"] = True
                     st.success("Saved!")
                     st.rerun()
\ No newline at end of file
@@ -1,6 +1,9 @@
-import os
 import streamlit as st
 from background import set_random_sarah_background
+from data_service import get_stats
+from stats_store import upcast_scores
+from streaks import threshold_streaks, cumulative_avg_streak, change_streak, win_streaks
+from render_cache import cached_html, cached_figure
 
 import pandas as pd
 import numpy as np
@@ -113,16 +116,12 @@ st.markdown(CUSTOM_STYLES, unsafe_allow_html=True)
 set_random_sarah_background(lightness_level=0.7)
 
 # --- Helper Functions ---
-@st.cache_data
-def load_data(filepath: str = "./Data/Timeguessr_Stats.csv", mtime: float = 0) -> pd.DataFrame:
-    """Load and preprocess data with caching."""
+def load_data() -> pd.DataFrame:
+    """The chronologically sorted stats frame, with float64 scores for summing."""
     try:
-        data = pd.read_csv(filepath)
-        data["Date"] = pd.to_datetime(data["Date"])
-        data = data.sort_values("Date").reset_index(drop=True)
-        return data
+        return upcast_scores(get_stats())
     except FileNotFoundError:
-        st.error(f"Data file not found at {filepath}")
+        st.error("Data file not found at ./Data/Timeguessr_Stats.csv")
         st.stop()
     except Exception as e:
         st.error(f"Error loading data: {e}")
@@ -370,110 +369,37 @@ def get_date_bold_style(date1: str, date2: str, date_format: str) -> Tuple[str,
         pass
     return "", ""
 
+def streak_with_dates(streak: Tuple[int, int, int], dates: pd.Series,
+                      date_format: str = "%b %d, %Y") -> Tuple[int, str, str]:
+    """Format a (length, start, end) streak as (length, start date, end date)."""
+    length, start, end = streak
+    if length == 0:
+        return 0, "", ""
+    return int(length), dates.iloc[start].strftime(date_format), dates.iloc[end].strftime(date_format)
+
 def calculate_streak_with_dates(scores: np.ndarray, dates: pd.Series, 
                                 threshold: float, above: bool = True, 
                                 date_format: str = "%b %d, %Y") -> Tuple[int, str, str]:
     """Calculate longest streak above/below threshold with date range."""
-    max_streak = 0
-    current_streak = 0
-    max_start_idx = 0
-    max_end_idx = 0
-    current_start_idx = 0
-
-    for i, score in enumerate(scores):
-        condition = (above and score >= threshold) or (not above and score < threshold)
-        
-        if condition:
-            if current_streak == 0:
-                current_start_idx = i
-            current_streak += 1
-
-            if current_streak > max_streak or (current_streak == max_streak and i > max_end_idx):
-                max_streak = current_streak
-                max_start_idx = current_start_idx
-                max_end_idx = i
-        else:
-            current_streak = 0
-
-    if max_streak > 0:
-        start_date = dates.iloc[max_start_idx].strftime(date_format)
-        end_date = dates.iloc[max_end_idx].strftime(date_format)
-        return max_streak, start_date, end_date
+    return calculate_streaks_with_dates(scores, dates, [threshold], above, date_format)[0]
 
-    return 0, "", ""
+def calculate_streaks_with_dates(scores: np.ndarray, dates: pd.Series,
+                                 thresholds: List[float], above: bool = True,
+                                 date_format: str = "%b %d, %Y") -> List[Tuple[int, str, str]]:
+    """`calculate_streak_with_dates` for every threshold in one call."""
+    return [streak_with_dates(streak, dates, date_format) for streak in zip(*threshold_streaks(scores, thresholds, above))]
 
 def calculate_cumulative_avg_streak(scores: pd.Series, dates: pd.Series, 
                                    above: bool = True, 
                                    date_format: str = "%b %d, %Y") -> Tuple[int, str, str]:
     """Calculate longest streak relative to cumulative average."""
-    if len(scores) == 0:
-        return 0, "", ""
-    
-    scores_array = scores.values if hasattr(scores, 'values') else scores
-    max_streak = 0
-    current_streak = 0
-    max_start_idx = 0
-    max_end_idx = 0
-    current_start_idx = 0
-
-    for i in range(len(scores_array)):
-        cumulative_avg = scores_array[:i+1].mean()
-        condition = (above and scores_array[i] >= cumulative_avg) or (not above and scores_array[i] < cumulative_avg)
-        
-        if condition:
-            if current_streak == 0:
-                current_start_idx = i
-            current_streak += 1
-
-            if current_streak > max_streak or (current_streak == max_streak and i > max_end_idx):
-                max_streak = current_streak
-                max_start_idx = current_start_idx
-                max_end_idx = i
-        else:
-            current_streak = 0
-
-    if max_streak > 0:
-        start_date = dates.iloc[max_start_idx].strftime(date_format)
-        end_date = dates.iloc[max_end_idx].strftime(date_format)
-        return max_streak, start_date, end_date
-
-    return 0, "", ""
+    return streak_with_dates(cumulative_avg_streak(scores, above), dates, date_format)
 
 def calculate_score_change_streak(scores: np.ndarray, dates: pd.Series, 
                                   threshold: float, mode: str = "change", 
                                   date_format: str = "%b %d, %Y") -> Tuple[int, str, str]:
     """Calculate streak based on daily score changes."""
-    if len(scores) < 2:
-        return 0, "", ""
-
-    max_streak = 0
-    current_streak = 0
-    max_start_idx = 0
-    max_end_idx = 0
-    current_start_idx = 0
-
-    for i in range(1, len(scores)):
-        diff = abs(scores[i] - scores[i - 1])
-        condition = (mode == "change" and diff >= threshold) or (mode == "stable" and diff <= threshold)
-
-        if condition:
-            if current_streak == 0:
-                current_start_idx = i - 1
-            current_streak += 1
-
-            if current_streak > max_streak or (current_streak == max_streak and i > max_end_idx):
-                max_streak = current_streak
-                max_start_idx = current_start_idx
-                max_end_idx = i
-        else:
-            current_streak = 0
-
-    if max_streak > 0:
-        start_date = dates.iloc[max_start_idx].strftime(date_format)
-        end_date = dates.iloc[max_end_idx].strftime(date_format)
-        return max_streak, start_date, end_date
-
-    return 0, "", ""
+    return streak_with_dates(change_streak(scores, threshold, mode), dates, date_format)
 
 def format_bucket_label(lower: int, upper: int, bin_size: int, is_top: bool = False) -> str:
     """Format bucket label based on range."""
@@ -635,36 +561,28 @@ def format_streak_dates(streak_count: int, start_date: str, end_date: str) -> st
         return '-'
     return start_date if start_date == end_date else compact_date_range_str(start_date, end_date)
 
+def streak_bin_flags(scores: pd.Series, lowers: np.ndarray, uppers: np.ndarray, ceiling: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """For each [lower, upper) bin (the top bin is open-ended): whether any
+    score falls in it, and whether all scores are at or above / below its
+    lower edge."""
+    values = np.asarray(scores, dtype=float)
+    ordered = np.sort(values[~np.isnan(values)])
+    complete = len(ordered) == len(values)
+    has_data = np.searchsorted(ordered, np.where(uppers == ceiling, np.inf, uppers)) > np.searchsorted(ordered, lowers)
+    if not len(ordered):
+        return has_data, np.full(len(lowers), complete), np.full(len(lowers), complete)
+    return has_data, complete & (ordered[0] >= lowers), complete & (ordered[-1] < lowers)
+
 def generate_streak_thresholds(michael_scores: pd.Series, sarah_scores: pd.Series, bin_size: int, ceiling: int) -> List[int]:
     """Generate streak thresholds based on bin size."""
-    streak_thresholds = []
-    current_upper = ceiling
-
-    while current_upper > 0:
-        current_lower = max(current_upper - bin_size, 0)
-        
-        # Check if there's any data in this range
-        if current_upper == ceiling:
-            michael_has_data = (michael_scores >= current_lower).any()
-            sarah_has_data = (sarah_scores >= current_lower).any()
-        else:
-            michael_has_data = ((michael_scores >= current_lower) & (michael_scores < current_upper)).any()
-            sarah_has_data = ((sarah_scores >= current_lower) & (sarah_scores < current_upper)).any()
-        
-        if michael_has_data or sarah_has_data:
-            michael_all_above = (michael_scores >= current_lower).all()
-            michael_all_below = (michael_scores < current_lower).all()
-            sarah_all_above = (sarah_scores >= current_lower).all()
-            sarah_all_below = (sarah_scores < current_lower).all()
-            
-            if not ((michael_all_above and sarah_all_above) or (michael_all_below and sarah_all_below)):
-                streak_thresholds.append(current_lower)
-        
-        current_upper = current_lower
-        if current_lower == 0:
-            break
-
-    return streak_thresholds
+    if ceiling <= 0:
+        return []
+    lowers = np.maximum(np.arange(ceiling - bin_size, -bin_size, -bin_size), 0)
+    uppers = np.concatenate(([ceiling], lowers[:-1]))
+    m_has, m_above, m_below = streak_bin_flags(michael_scores, lowers, uppers, ceiling)
+    s_has, s_above, s_below = streak_bin_flags(sarah_scores, lowers, uppers, ceiling)
+    keep = (m_has | s_has) & ~((m_above & s_above) | (m_below & s_below))
+    return [int(lower) for lower in lowers[keep]]
 
 def create_streaks_table_html(michael_scores: pd.Series, sarah_scores: pd.Series,
                              michael_dates: pd.Series, sarah_dates: pd.Series,
@@ -674,13 +592,15 @@ def create_streaks_table_html(michael_scores: pd.Series, sarah_scores: pd.Series
     streak_thresholds = generate_streak_thresholds(michael_scores, sarah_scores, bin_size, ceiling)
     
     rows = []
+    michael_above = calculate_streaks_with_dates(michael_scores.values, michael_dates, streak_thresholds, above=True, date_format=date_format)
+    sarah_above = calculate_streaks_with_dates(sarah_scores.values, sarah_dates, streak_thresholds, above=True, date_format=date_format)
+    michael_below = calculate_streaks_with_dates(michael_scores.values, michael_dates, streak_thresholds, above=False, date_format=date_format)
+    sarah_below = calculate_streaks_with_dates(sarah_scores.values, sarah_dates, streak_thresholds, above=False, date_format=date_format)
     
     # Above threshold streaks
-    for threshold in streak_thresholds:
-        michael_streak, michael_start, michael_end = calculate_streak_with_dates(
-            michael_scores.values, michael_dates, threshold, above=True, date_format=date_format)
-        sarah_streak, sarah_start, sarah_end = calculate_streak_with_dates(
-            sarah_scores.values, sarah_dates, threshold, above=True, date_format=date_format)
+    for i, threshold in enumerate(streak_thresholds):
+        michael_streak, michael_start, michael_end = michael_above[i]
+        sarah_streak, sarah_start, sarah_end = sarah_above[i]
         
         label = format_bucket_label(threshold, threshold + bin_size, bin_size).replace("Scores ", "Above ")
         if threshold % 1000 == 0:
@@ -697,11 +617,9 @@ def create_streaks_table_html(michael_scores: pd.Series, sarah_scores: pd.Series
                                      date_format))
     
     # Below threshold streaks
-    for threshold in reversed(streak_thresholds):
-        michael_streak, michael_start, michael_end = calculate_streak_with_dates(
-            michael_scores.values, michael_dates, threshold, above=False, date_format=date_format)
-        sarah_streak, sarah_start, sarah_end = calculate_streak_with_dates(
-            sarah_scores.values, sarah_dates, threshold, above=False, date_format=date_format)
+    for i, threshold in reversed(list(enumerate(streak_thresholds))):
+        michael_streak, michael_start, michael_end = michael_below[i]
+        sarah_streak, sarah_start, sarah_end = sarah_below[i]
         
         if threshold % 1000 == 0:
             label = f"Below {threshold//1000}k"
@@ -1577,32 +1495,10 @@ def get_win_stats_margin(df: pd.DataFrame, lower: float, upper: float, is_michae
 
 def calculate_win_streaks(df: pd.DataFrame) -> List[Dict]:
     """Calculate win streaks for Michael and Sarah."""
-    streaks = []
-    current_streak = 0
-    current_winner = None
-    streak_start = None
-
-    for idx, row in df.iterrows():
-        if row["Score Diff"] > 0:
-            winner = "Michael"
-        elif row["Score Diff"] < 0:
-            winner = "Sarah"
-        else:
-            continue
-        if winner == current_winner:
-            current_streak += 1
-        else:
-            if current_winner is not None and current_streak > 0:
-                streaks.append({'winner': current_winner, 'length': current_streak,
-                                'start_date': streak_start, 'end_date': df.iloc[idx-1]["Date"]})
-            current_winner = winner
-            current_streak = 1
-            streak_start = row["Date"]
-
-    if current_winner is not None and current_streak > 0:
-        streaks.append({'winner': current_winner, 'length': current_streak,
-                        'start_date': streak_start, 'end_date': df.iloc[-1]["Date"]})
-    return streaks
+    dates = df["Date"].to_numpy()
+    return [{'winner': "Michael" if w > 0 else "Sarah", 'length': int(n),
+             'start_date': pd.Timestamp(dates[a]), 'end_date': pd.Timestamp(dates[b])}
+            for w, n, a, b in zip(*win_streaks(df["Score Diff"]))]
 
 
 def create_win_summary_table(mask_filtered: pd.DataFrame, win_categories: Dict) -> str:
@@ -1917,32 +1813,27 @@ def self_create_scores_streaks_table(time_scores: pd.Series, geo_scores: pd.Seri
                                       bin_size: int, ceiling: int,
                                       date_format: str = "%b %d, %Y", change_threshold: int = 5000) -> str:
     thresholds = self_generate_streak_thresholds(bin_size, ceiling)
+    t_above = calculate_streaks_with_dates(time_scores.values, time_dates, thresholds, above=True, date_format=date_format)
+    g_above = calculate_streaks_with_dates(geo_scores.values, geo_dates, thresholds, above=True, date_format=date_format)
+    t_below = calculate_streaks_with_dates(time_scores.values, time_dates, thresholds, above=False, date_format=date_format)
+    g_below = calculate_streaks_with_dates(geo_scores.values, geo_dates, thresholds, above=False, date_format=date_format)
     rows = []
-    for threshold in thresholds:
+    for i, threshold in enumerate(thresholds):
         if len(time_scores) > 0 and (time_scores >= threshold).all() and len(geo_scores) > 0 and (geo_scores >= threshold).all():
             continue
-        t_s = t_st = t_en = g_s = g_st = g_en = 0, "", ""
-        if len(time_scores) > 0:
-            t_s, t_st, t_en = calculate_streak_with_dates(time_scores.values, time_dates, threshold, above=True, date_format=date_format)
-        else:
-            t_s, t_st, t_en = 0, "", ""
-        if len(geo_scores) > 0:
-            g_s, g_st, g_en = calculate_streak_with_dates(geo_scores.values, geo_dates, threshold, above=True, date_format=date_format)
-        else:
-            g_s, g_st, g_en = 0, "", ""
+        t_s, t_st, t_en = t_above[i]
+        g_s, g_st, g_en = g_above[i]
         if t_s == 0 and g_s == 0:
             continue
         label = f"Above {threshold//1000}k" if threshold % 1000 == 0 else f"Above {threshold/1000:.1f}k"
         rows.append(self_create_table_row(label, str(t_s), str(g_s),
                                           format_streak_dates(t_s, t_st, t_en).replace('<br/>', ' '),
                                           format_streak_dates(g_s, g_st, g_en).replace('<br/>', ' '), date_format))
-    for threshold in reversed(thresholds):
+    for i, threshold in reversed(list(enumerate(thresholds))):
         if len(time_scores) > 0 and (time_scores < threshold).all() and len(geo_scores) > 0 and (geo_scores < threshold).all():
             continue
-        t_s, t_st, t_en = (calculate_streak_with_dates(time_scores.values, time_dates, threshold, above=False, date_format=date_format)
-                            if len(time_scores) > 0 else (0, "", ""))
-        g_s, g_st, g_en = (calculate_streak_with_dates(geo_scores.values, geo_dates, threshold, above=False, date_format=date_format)
-                            if len(geo_scores) > 0 else (0, "", ""))
+        t_s, t_st, t_en = t_below[i]
+        g_s, g_st, g_en = g_below[i]
         if t_s == 0 and g_s == 0:
             continue
         label = f"Below {threshold//1000}k" if threshold % 1000 == 0 else f"Below {threshold/1000:.1f}k"
@@ -2274,8 +2165,7 @@ def self_create_scores_momentum_html(data: pd.DataFrame, player: str, window_len
 # --- Main App ---
 
 # Load data
-stats_mtime = os.path.getmtime("./Data/Timeguessr_Stats.csv") if os.path.exists("./Data/Timeguessr_Stats.csv") else 0
-data = load_data(mtime=stats_mtime)
+data = load_data()
 
 # Render Sidebar Controls
 with st.sidebar:
@@ -2442,6 +2332,11 @@ with st.sidebar:
             st.warning("No data available for selected options.")
             st.stop()
 
+# Every sidebar choice the filtered data depends on; each rendered block adds its own
+render_key = (comp_type, view_mode, page_type if comp_type == 'Cross' else player,
+              remove_pre_tracking, remove_pre_survey, remove_pre_summary,
+              start_date, end_date, include_single_player_days, include_self_single)
+
 # --- Main Area ---
 
 if comp_type == 'Cross':
@@ -2501,10 +2396,12 @@ if comp_type == 'Cross':
 
     if view_mode == "Scores":
         mask_filtered = calculate_rolling_averages(mask_filtered, window_length, score_type)
-        fig = create_plotly_figure(df_daily_filtered, mask_filtered, window_length, score_type,
-                                   show_single_player_days=include_single_player_days)
+        fig = cached_figure("cc_scores", render_key + (window_length,), lambda: create_plotly_figure(
+            df_daily_filtered, mask_filtered, window_length, score_type,
+            show_single_player_days=include_single_player_days))
         st.plotly_chart(fig, use_container_width=True, key="main_chart")
-        st.markdown(create_momentum_html(mask_filtered, window_length, score_type, ceiling), unsafe_allow_html=True)
+        st.markdown(cached_html("cc_momentum", render_key + (window_length,), lambda: create_momentum_html(
+            mask_filtered, window_length, score_type, ceiling)), unsafe_allow_html=True)
         st.markdown("---")
         st.subheader("Statistics Summary")
 
@@ -2531,18 +2428,20 @@ if comp_type == 'Cross':
 
         col1, col2 = st.columns(2)
         with col1:
-            st.markdown(create_stats_table_html(michael_scores, sarah_scores, michael_dates, sarah_dates,
-                                                bin_size, date_format, ceiling), unsafe_allow_html=True)
+            st.markdown(cached_html("cc_stats_table", render_key + (bin_size,), lambda: create_stats_table_html(
+                michael_scores, sarah_scores, michael_dates, sarah_dates, bin_size, date_format, ceiling
+            )), unsafe_allow_html=True)
             st.markdown("<br>", unsafe_allow_html=True)
-            st.plotly_chart(create_cumulative_histogram(
+            st.plotly_chart(cached_figure("cc_cumulative_histogram", render_key, lambda: create_cumulative_histogram(
                 [(michael_scores, 'Michael', COLORS['michael']), (sarah_scores, 'Sarah', COLORS['sarah'])], ceiling
-            ), use_container_width=True, key="cumulative_histogram_chart")
-            st.plotly_chart(create_density_plot(michael_scores, sarah_scores, avg_scores, ceiling),
-                            use_container_width=True, key="density_chart")
+            )), use_container_width=True, key="cumulative_histogram_chart")
+            st.plotly_chart(cached_figure("cc_density", render_key, lambda: create_density_plot(
+                michael_scores, sarah_scores, avg_scores, ceiling
+            )), use_container_width=True, key="density_chart")
         with col2:
-            st.markdown(create_streaks_table_html(michael_scores, sarah_scores, michael_dates, sarah_dates,
-                                                  bin_size, date_format, ceiling, change_threshold),
-                        unsafe_allow_html=True)
+            st.markdown(cached_html("cc_streaks_table", render_key + (bin_size,), lambda: create_streaks_table_html(
+                michael_scores, sarah_scores, michael_dates, sarah_dates, bin_size, date_format, ceiling, change_threshold
+            )), unsafe_allow_html=True)
 
     else:
         if score_type == "total":
@@ -2559,19 +2458,25 @@ if comp_type == 'Cross':
         margin_mask["Cumulative Diff"] = margin_mask["Score Diff"].expanding().mean()
         margin_mask = add_zero_crossing_interpolation(margin_mask, window_length)
 
-        st.plotly_chart(create_win_margins_figure(margin_mask, window_length),
+        st.plotly_chart(cached_figure("cc_win_margins", render_key + (window_length,),
+                                      lambda: create_win_margins_figure(margin_mask, window_length)),
                         use_container_width=True, key="win_margins_chart")
 
         margin_original = margin_mask[margin_mask["Date"].dt.time == pd.Timestamp("00:00:00").time()].copy().reset_index(drop=True)
-        st.markdown(create_momentum_timeline(margin_original, window_length), unsafe_allow_html=True)
+        st.markdown(cached_html("cc_momentum_timeline", render_key + (window_length,),
+                                lambda: create_momentum_timeline(margin_original, window_length)),
+                    unsafe_allow_html=True)
         st.markdown("---")
         col1, col2 = st.columns(2)
         with col1:
             st.markdown("### Win Summary")
-            st.markdown(create_win_summary_table(margin_original, win_categories), unsafe_allow_html=True)
+            st.markdown(cached_html("cc_win_summary", render_key,
+                                    lambda: create_win_summary_table(margin_original, win_categories)),
+                        unsafe_allow_html=True)
         with col2:
             st.markdown("### Streaks")
-            st.markdown(create_win_streaks_table(margin_original), unsafe_allow_html=True)
+            st.markdown(cached_html("cc_win_streaks", render_key, lambda: create_win_streaks_table(margin_original)),
+                        unsafe_allow_html=True)
 
 else:
     # --- Self Comparison ---
@@ -2612,11 +2517,12 @@ else:
 
     if view_mode == "Scores":
         st.subheader("Time vs Geography Scores")
-        st.plotly_chart(self_create_plotly_figure(player_data_filtered, window_length, player,
-                                                  solo_dates=solo_dates),
-                        use_container_width=True, key="self_main_chart")
-        st.markdown(self_create_scores_momentum_html(player_data_filtered, player, window_length, streak_ceiling),
-                    unsafe_allow_html=True)
+        st.plotly_chart(cached_figure("self_scores", render_key + (window_length,), lambda: self_create_plotly_figure(
+            player_data_filtered, window_length, player, solo_dates=solo_dates
+        )), use_container_width=True, key="self_main_chart")
+        st.markdown(cached_html("self_momentum", render_key + (window_length,), lambda: self_create_scores_momentum_html(
+            player_data_filtered, player, window_length, streak_ceiling
+        )), unsafe_allow_html=True)
         st.divider()
 
         # Extract per-metric aligned scores and dates (handles NaN from single-score days)
@@ -2630,24 +2536,24 @@ else:
         col1, col2 = st.columns(2)
         with col1:
             st.subheader("Summary Statistics")
-            st.markdown(self_create_scores_stats_table(
+            st.markdown(cached_html("self_stats_table", render_key + (bin_size,), lambda: self_create_scores_stats_table(
                 time_scores_clean, geo_scores_clean, time_dates_clean, geo_dates_clean,
                 bin_size=bin_size, ceiling=streak_ceiling
-            ), unsafe_allow_html=True)
-            st.plotly_chart(create_cumulative_histogram(
+            )), unsafe_allow_html=True)
+            st.plotly_chart(cached_figure("self_cumulative_histogram", render_key, lambda: create_cumulative_histogram(
                 [(time_scores_clean, 'Time', COLORS['time']), (geo_scores_clean, 'Geography', COLORS['geography'])],
                 streak_ceiling
-            ), use_container_width=True, key="self_cumulative_histogram_chart")
+            )), use_container_width=True, key="self_cumulative_histogram_chart")
             st.subheader("Score Distribution")
-            st.plotly_chart(self_create_density_plot(
+            st.plotly_chart(cached_figure("self_density", render_key, lambda: self_create_density_plot(
                 time_scores_clean, geo_scores_clean, ceiling=streak_ceiling
-            ), use_container_width=True, key="self_density_chart")
+            )), use_container_width=True, key="self_density_chart")
         with col2:
             st.subheader("Score Streaks")
-            st.markdown(self_create_scores_streaks_table(
+            st.markdown(cached_html("self_streaks_table", render_key + (bin_size,), lambda: self_create_scores_streaks_table(
                 time_scores_clean, geo_scores_clean, time_dates_clean, geo_dates_clean,
                 bin_size=bin_size, ceiling=streak_ceiling, change_threshold=change_threshold
-            ), unsafe_allow_html=True)
+            )), unsafe_allow_html=True)
 
     else:
         # Win Margins requires both scores — filter to days where both are present
@@ -2659,9 +2565,14 @@ else:
         margin_data = add_zero_crossing_interpolation(margin_data, window_length)
 
         st.subheader("Score Differential (Time - Geography)")
-        st.plotly_chart(self_create_win_margins_figure(margin_data, window_length, player, solo_dates=solo_dates),
-                        use_container_width=True, key="self_margin_chart")
-        st.markdown(self_create_momentum_timeline(margin_data_original, window_length), unsafe_allow_html=True)
+        st.plotly_chart(cached_figure("self_win_margins", render_key + (window_length,), lambda: self_create_win_margins_figure(
+            margin_data, window_length, player, solo_dates=solo_dates
+        )), use_container_width=True, key="self_margin_chart")
+        st.markdown(cached_html("self_momentum_timeline", render_key + (window_length,),
+                                lambda: self_create_momentum_timeline(margin_data_original, window_length)),
+                    unsafe_allow_html=True)
         st.divider()
         st.subheader("Win Summary")
-        st.markdown(self_create_win_summary_table(margin_data, self_win_categories), unsafe_allow_html=True)
\ No newline at end of file
+        st.markdown(cached_html("self_win_summary", render_key + (window_length,),
+                                lambda: self_create_win_summary_table(margin_data, self_win_categories)),
+                    unsafe_allow_html=True)
\ No newline at end of file
@@ -4,13 +4,15 @@ import plotly.graph_objects as go
 import country_converter as coco
 import numpy as np
 import json
-import os
-import shapely
 import geopandas as gpd
-from shapely.geometry import shape as shp_shape
+from shapely.geometry import mapping, shape as shp_shape
 import math
 from shapely.ops import unary_union
 from background import set_random_sarah_background
+from data_service import get_imputed_stats, stats_version
+from disk_cache import disk_cached
+from map_store import (ISO_LANGUAGE_MAP, MAP_FILE, MAP_TILES_FILE, TERRITORY_PARENT_MAP, background_geometry, decode_geometries,
+                       feature_geometry, load_tiles, merge_by_iso, read_map, safe_union, tile_key)
 
 # --- Configuration & Constants ---
 st.set_page_config(layout="wide", page_title="Map Stats")
@@ -19,6 +21,11 @@ set_random_sarah_background(lightness_level=0.7)
 
 COLORS = {'michael': '#221e8f', 'sarah': '#8a005c', 'neutral': '#696761'}
 
+# Disk-cached map geometry is keyed by the map and tiles files' contents;
+# bump MAP_CACHE_VERSION when the geometry functions' output changes
+MAP_SOURCES = (MAP_FILE, MAP_TILES_FILE)
+MAP_CACHE_VERSION = 1
+
 LANGUAGE_EMOJIS = {
     'English':           '🇬🇧',
     'Spanish':           '🇪🇸',
@@ -41,143 +48,6 @@ LANGUAGE_EMOJIS = {
     'Asian Latin Script':'🇮🇩',
 }
 
-# ISO3 to Primary Language/Script Mapping
-ISO_LANGUAGE_MAP = {
-    # English
-    'USA': 'English', 'GBR': 'English', 'AUS': 'English', 'CAN': 'English', 'NZL': 'English', 
-    'IRL': 'English', 'JAM': 'English', 'BHS': 'English', 
-    'BRB': 'English', 'GUY': 'English', 'TTO': 'English', 'ATG': 'English', 'DMA': 'English', 
-    'GRD': 'English', 'KNA': 'English', 'LCA': 'English', 'VCT': 'English', 'BLZ': 'English',
-    'NGA': 'English', 'GHA': 'English', 'SLE': 'English', 'LBR': 'English', 'GMB': 'English', 
-    'UGA': 'English', 'ZMB': 'English', 'ZWE': 'English', 'BWA': 'English', 'NAM': 'English',
-    
-    # Spanish
-    'ESP': 'Spanish', 'MEX': 'Spanish', 'COL': 'Spanish', 'ARG': 'Spanish', 'PER': 'Spanish', 
-    'VEN': 'Spanish', 'CHL': 'Spanish', 'ECU': 'Spanish', 'GTM': 'Spanish', 'CUB': 'Spanish', 
-    'BOL': 'Spanish', 'DOM': 'Spanish', 'HND': 'Spanish', 'PRY': 'Spanish', 'SLV': 'Spanish', 
-    'NIC': 'Spanish', 'CRI': 'Spanish', 'PAN': 'Spanish', 'URY': 'Spanish', 'GNQ': 'Spanish',
-    'PRI': 'Spanish', # Puerto Rico
-    
-    # Portuguese
-    'BRA': 'Portuguese', 'PRT': 'Portuguese', 'MOZ': 'Portuguese', 'AGO': 'Portuguese', 
-    'GNB': 'Portuguese', 'TLS': 'Portuguese', 'CPV': 'Portuguese', 'STP': 'Portuguese',
-    
-    # French
-    'FRA': 'French', 'COD': 'French', 'MAD': 'French', 'CIV': 'French', 
-    'BFA': 'French', 'NER': 'French', 'SEN': 'French', 'MLI': 'French', 'RWA': 'French', 
-    'GIN': 'French', 'TCD': 'French', 'HTI': 'French', 'MDG': 'French', 
-    'BEN': 'French', 'TGO': 'French', 'CAF': 'French', 'COG': 'French', 'GAB': 'French', 
-    'DJI': 'French', 'MCO': 'French', 'VUT': 'French', 'SYC': 'French', 'BDI': 'French',
-    
-    # Other Romance
-    'ITA': 'Other Romance', 'SMR': 'Other Romance', 'VAT': 'Other Romance', 
-    'AND': 'Other Romance', 'ROU': 'Other Romance', 'MDA': 'Other Romance',
-
-    # Germanic (Excluding English)
-    'DEU': 'Germanic', 'AUT': 'Germanic', 'LIE': 'Germanic', # German
-    'NLD': 'Germanic', 'SUR': 'Germanic', # Dutch
-    'SWE': 'Germanic', 'NOR': 'Germanic', 'DNK': 'Germanic', 'ISL': 'Germanic', # Nordic
-    'LUX': 'Germanic',
-    
-    # Other European (Unique/Isolates/Uralic/Baltic)
-    'ALB': 'Other European', # Albanian
-    'HUN': 'Other European', # Hungarian
-    'MLT': 'Other European', # Maltese
-    'FIN': 'Other European', 'EST': 'Other European', # Finnic
-    'LVA': 'Other European', 'LTU': 'Other European', # Baltic
-
-    # Turkic
-    'TUR': 'Turkic', 'AZE': 'Turkic', 'KAZ': 'Turkic',
-
-    # Slavic (Latin Script)
-    'POL': 'Slavic (Latin)', 'CZE': 'Slavic (Latin)', 'SVK': 'Slavic (Latin)',
-    'SVN': 'Slavic (Latin)', 'HRV': 'Slavic (Latin)',
-    'BIH': 'Slavic (Latin)', 'SRB': 'Slavic (Latin)', 'MNE': 'Slavic (Latin)',
-    'MKD': 'Slavic (Latin)', 
-    
-    # Slavic (Cyrillic Script)
-    'RUS': 'Slavic (Cyrillic)', 'BLR': 'Slavic (Cyrillic)', 'UKR': 'Slavic (Cyrillic)', 
-    'BGR': 'Slavic (Cyrillic)', 'MKD': 'Slavic (Cyrillic)', 
-    
-    # East Asian Scripts
-    'CHN': 'East Asian Scripts', 'TWN': 'East Asian Scripts', 
-    'JPN': 'East Asian Scripts', 'KOR': 'East Asian Scripts', 'PRK': 'East Asian Scripts',
-
-    # Asian Latin Script
-    'VNM': 'Asian Latin Script', 'IDN': 'Asian Latin Script', 'PHL': 'Asian Latin Script',
-    'MYS': 'Asian Latin Script', 'BRN': 'Asian Latin Script',
-
-    # Brahmic Script (Indic family)
-    'IND': 'Brahmic Script', 'BGD': 'Brahmic Script', 'NPL': 'Brahmic Script',
-    'LKA': 'Brahmic Script', 'BTN': 'Brahmic Script', 'THA': 'Brahmic Script',
-    'LAO': 'Brahmic Script', 'KHM': 'Brahmic Script', 'MMR': 'Brahmic Script',
-    
-    # Arabic Script
-    'EGY': 'Arabic Script', 'DZA': 'Arabic Script', 'SDN': 'Arabic Script', 'IRQ': 'Arabic Script', 
-    'MAR': 'Arabic Script', 'SAU': 'Arabic Script', 'YEM': 'Arabic Script', 'SYR': 'Arabic Script', 
-    'TUN': 'Arabic Script', 'SOM': 'Arabic Script', 'JOR': 'Arabic Script', 'LBY': 'Arabic Script', 
-    'PSE': 'Arabic Script', 'LBN': 'Arabic Script', 'OMN': 'Arabic Script', 'KWT': 'Arabic Script', 
-    'MRT': 'Arabic Script', 'QAT': 'Arabic Script', 'BHR': 'Arabic Script', 'ARE': 'Arabic Script',
-    'IRN': 'Arabic Script', 'AFG': 'Arabic Script', 'PAK': 'Arabic Script',
-
-    # Greek Script
-    'GRC': 'Greek Script', 
-
-    # Hebrew Script
-    'ISR': 'Hebrew Script',
-
-    # Georgian Script
-    'GEO': 'Georgian Script',
-
-    # Armenian Script
-    'ARM': 'Armenian Script',
-
-    # --- Overseas Territories & Dependencies ---
-    # UK
-    'GIB': 'English', 'BMU': 'English', 'CYM': 'English', 'VGB': 'English', 'TCA': 'English', 'AIA': 'English', 'MSR': 'English', 'FLK': 'English', 'SHN': 'English', 'IOT': 'English', 'SGS': 'English', 'PCN': 'English', 'IMN': 'English', 'JEY': 'English', 'GGY': 'English',
-    # USA
-    'GUM': 'English', 'VIR': 'English', 'ASM': 'English', 'MNP': 'English',
-    # France
-    'GLP': 'French', 'MTQ': 'French', 'GUF': 'French', 'REU': 'French', 'MYT': 'French', 'PYF': 'French', 'NCL': 'French', 'MAF': 'French', 'BLM': 'French', 'SPM': 'French', 'WLF': 'French',
-    # Netherlands
-    'ABW': 'Germanic', 'CUW': 'Germanic', 'SXM': 'Germanic', 'BES': 'Germanic',
-    # Denmark
-    'GRL': 'Germanic', 'FRO': 'Germanic',
-    # Australia
-    'CXR': 'English', 'CCK': 'English', 'NFK': 'English',
-    # Norway
-    'SJM': 'Germanic',
-    # China
-    'HKG': 'East Asian Scripts', 'MAC': 'East Asian Scripts',
-    # New Zealand
-    'COK': 'English', 'NIU': 'English', 'TKL': 'English'
-}
-
-# --- Universal Territory to Parent Map ---
-TERRITORY_PARENT_MAP = {
-    # United Kingdom
-    'JEY': 'GBR', 'GGY': 'GBR', 'IMN': 'GBR', 'GIB': 'GBR', 'AIA': 'GBR', 'BMU': 'GBR',
-    'CYM': 'GBR', 'FLK': 'GBR', 'IOT': 'GBR', 'MSR': 'GBR', 'PCN': 'GBR', 'SGS': 'GBR',
-    'SHN': 'GBR', 'TCA': 'GBR', 'VGB': 'GBR',
-    # France
-    'GLP': 'FRA', 'MTQ': 'FRA', 'GUF': 'FRA', 'REU': 'FRA', 'MYT': 'FRA', 'PYF': 'FRA',
-    'NCL': 'FRA', 'MAF': 'FRA', 'BLM': 'FRA', 'SPM': 'FRA', 'WLF': 'FRA',
-    # United States
-    'PRI': 'USA', 'GUM': 'USA', 'VIR': 'USA', 'ASM': 'USA', 'MNP': 'USA',
-    # Netherlands
-    'ABW': 'NLD', 'CUW': 'NLD', 'SXM': 'NLD', 'BES': 'NLD',
-    # Denmark
-    'GRL': 'DNK', 'FRO': 'DNK',
-    # Australia
-    'CXR': 'AUS', 'CCK': 'AUS', 'NFK': 'AUS',
-    # Norway
-    'SJM': 'NOR',
-    # China
-    'HKG': 'CHN', 'MAC': 'CHN',
-    # New Zealand
-    'COK': 'NZL', 'NIU': 'NZL', 'TKL': 'NZL',
-}
-
 # --- Territories missing from the map's own subdivision NAME list ---
 # TERRITORY_PARENT_MAP's dependents are mostly already represented in the map's
 # per-country subdivision list (e.g. FRA's "Guadeloupe", USA's "Puerto Rico") —
@@ -288,40 +158,9 @@ st.markdown("""
 @st.cache_data
 def load_data(mtime):
     try:
-        df = pd.read_csv("./Data/Timeguessr_Stats.csv")
-        df["Date"] = pd.to_datetime(df["Date"], errors='coerce')
-        
-        # --- SCORE IMPUTATION LOGIC (UPDATED) ---
-        def fill_missing_scores(prefix, round_col_name):
-            geo_col = f"{prefix} Geography Score"
-            time_col = f"{prefix} Time Score"
-            geo_min, geo_max = f"{geo_col} (Min)", f"{geo_col} (Max)"
-            time_min, time_max = f"{time_col} (Min)", f"{time_col} (Max)"
-            
-            if not {geo_min, geo_max, time_min, time_max}.issubset(df.columns):
-                return
-
-            # 1. Impute Geo
-            mask_geo_missing = df[geo_col].isna() & df[geo_min].notna() & df[geo_max].notna()
-            if mask_geo_missing.any():
-                df.loc[mask_geo_missing, geo_col] = (df.loc[mask_geo_missing, geo_min] + df.loc[mask_geo_missing, geo_max]) / 2
-
-            # 2. Impute Time
-            mask_time_missing = df[time_col].isna() & df[time_min].notna() & df[time_max].notna()
-            if mask_time_missing.any():
-                df.loc[mask_time_missing, time_col] = (df.loc[mask_time_missing, time_min] + df.loc[mask_time_missing, time_max]) / 2
-            
-            # 3. Recalculate Round Score if missing (Round Score = Geo + Time)
-            if round_col_name and round_col_name in df.columns:
-                mask_round_missing = df[round_col_name].isna() & df[geo_col].notna() & df[time_col].notna()
-                if mask_round_missing.any():
-                    df.loc[mask_round_missing, round_col_name] = df.loc[mask_round_missing, geo_col] + df.loc[mask_round_missing, time_col]
-
-        m_col = 'Michael Round Score' if 'Michael Round Score' in df.columns else ('Michael Total Score' if 'Michael Total Score' in df.columns else None)
-        s_col = 'Sarah Round Score' if 'Sarah Round Score' in df.columns else ('Sarah Total Score' if 'Sarah Total Score' in df.columns else None)
-
-        fill_missing_scores('Michael', m_col)
-        fill_missing_scores('Sarah', s_col)
+        df = get_imputed_stats().copy()
+        # Country gets rewritten and remapped below, so work on plain strings
+        df["Country"] = df["Country"].astype(object)
 
         # --- TAIWAN DATA FIX ---
         mask_tw_data = (df['Country'] == 'China') & (df['Subdivision'] == 'Taiwan')
@@ -377,125 +216,35 @@ def load_data(mtime):
 
 @st.cache_resource
 def load_map():
-    target_file = "./Data/Custom_World_Map_New.json"
-    if not os.path.exists(target_file): return None, set()
     try:
-        gdf = gpd.read_file(target_file)
-        # make_valid(structure) preserves coordinates of already-valid geometries unlike
-        # buffer(0) which rebuilds and perturbs shared edge coordinates even for valid polygons.
-        # The structure method also always returns Polygon/MultiPolygon (no GeometryCollections).
-        try:
-            gdf['geometry'] = gpd.GeoSeries(
-                shapely.make_valid(gdf['geometry'].values, method='structure'), crs=gdf.crs)
-        except TypeError:
-            # GEOS < 3.10: fall back to selective buffer(0) on invalid geometries only
-            invalid_mask = ~gdf['geometry'].is_valid
-            if invalid_mask.any():
-                gdf.loc[invalid_mask, 'geometry'] = gdf.loc[invalid_mask, 'geometry'].buffer(0)
-        
-        # --- TAIWAN MAP FIX ---
-        mask_tw = gdf['NAME'] == 'Taiwan'
-        if 'ISO_SUB' in gdf.columns:
-            mask_tw = mask_tw | (gdf['ISO_SUB'] == 'TW')
-            
-        iso_cols = [c for c in ['ISO3', 'iso3', 'adm0_a3'] if c in gdf.columns]
-        if iso_cols:
-            for col in iso_cols:
-                gdf.loc[mask_tw, col] = 'TWN'
-        else:
-            gdf.loc[mask_tw, 'ISO3'] = 'TWN'
-        
-        gdf.loc[mask_tw, 'NAME'] = 'Taiwan'
-
-        # Standardize
-        iso_col = next((c for c in ['ISO3', 'iso3', 'adm0_a3'] if c in gdf.columns), None)
-        if iso_col:
-            gdf['ISO3'] = cc.convert(names=gdf[iso_col].tolist(), to='ISO3', not_found='UNK')
-        else: gdf['ISO3'] = 'UNK'
-        
-        name_col = next((c for c in ['NAME', 'name', 'NAME_1', 'COUNTRY'] if c in gdf.columns), 'NAME')
-        gdf['NAME'] = gdf[name_col].astype(str).str.strip()
-        
-        # Clean up territory suffixes to ensure they match standard subdivision/country names
-        suffixes_to_remove = [' (UK)', ' (France)', ' (US)', ' (Netherlands)', ' (Denmark)', ' (Australia)', ' (New Zealand)', ' (China)']
-        for suffix in suffixes_to_remove:
-            gdf['NAME'] = gdf['NAME'].str.replace(suffix, '', regex=False)
-        
-        # Enrich Map Data
-        clean_isos = [x for x in gdf['ISO3'].unique() if x != 'UNK']
-        gdf['Continent'] = gdf['ISO3'].map(dict(zip(clean_isos, cc.convert(names=clean_isos, to="continent")))).fillna("Unknown")
-        gdf['UN_Region'] = gdf['ISO3'].map(dict(zip(clean_isos, cc.convert(names=clean_isos, to="UNregion")))).fillna("Unknown")
-        gdf['Language'] = gdf['ISO3'].map(ISO_LANGUAGE_MAP).fillna("Other")
-        
-        # Special Map Logic for Quebec
-        gdf.loc[(gdf['ISO3'] == 'CAN') & (gdf['NAME'] == 'Quebec'), 'Language'] = 'French'
-        
-        # Special Map Logic for Puerto Rico
-        gdf.loc[(gdf['ISO3'] == 'USA') & (gdf['NAME'] == 'Puerto Rico'), 'Language'] = 'Spanish'
-        
-        # Special Map Logic for China Subdivisions -> "Other"
-        chn_map_names = ['Hong Kong', 'Macau', 'Tibet', 'Xinjiang']
-        gdf.loc[(gdf['ISO3'] == 'CHN') & (gdf['NAME'].isin(chn_map_names)), 'Language'] = 'Other'
-
-        # Special Map Logic for Belgium
-        gdf.loc[(gdf['ISO3'] == 'BEL') & (gdf['NAME'] == 'Flanders'), 'Language'] = 'Germanic'
-        gdf.loc[(gdf['ISO3'] == 'BEL') & (gdf['NAME'] == 'Wallonia'), 'Language'] = 'French'
-        gdf.loc[(gdf['ISO3'] == 'BEL') & (gdf['NAME'] == 'Brussels Capital Region'), 'Language'] = 'French'
-
-        # Special Map Logic for Switzerland (cantons dissolved into 7 macroregions in Build_Map.py)
-        _che_map_french   = ['Lake Geneva Region']
-        _che_map_italian_romansch  = ['Ticino']
-        _che_map_germanic = [
-            'Espace Mittelland', 'Northwestern Switzerland', 'Zurich',
-            'Eastern Switzerland', 'Central Switzerland'
-        ]
-        gdf.loc[(gdf['ISO3'] == 'CHE') & (gdf['NAME'].isin(_che_map_french)),   'Language'] = 'French'
-        gdf.loc[(gdf['ISO3'] == 'CHE') & (gdf['NAME'].isin(_che_map_italian_romansch)),  'Language'] = 'Other Romance'
-        gdf.loc[(gdf['ISO3'] == 'CHE') & (gdf['NAME'].isin(_che_map_germanic)), 'Language'] = 'Germanic'
-
-        # Brussels is geographically enclosed by Flanders — subtract it so Brussels remains visible
-        bru_rows = gdf[(gdf['ISO3'] == 'BEL') & (gdf['NAME'] == 'Brussels Capital Region')]
-        fla_rows = gdf[(gdf['ISO3'] == 'BEL') & (gdf['NAME'] == 'Flanders')]
-        if not bru_rows.empty and not fla_rows.empty:
-            bru_geom = unary_union(bru_rows['geometry'].tolist())
-            gdf.loc[fla_rows.index, 'geometry'] = gdf.loc[fla_rows.index, 'geometry'].apply(
-                lambda g: g.difference(bru_geom).buffer(0)
-            )
-
+        tiles = load_map_tiles()
+        gdf = tiles['map'] if tiles else read_map(MAP_FILE, cc)
+        if gdf is None: return None, set()
         return gdf, set(gdf['NAME'].unique())
     except Exception as e:
         st.error(f"Map error: {e}"); return None, set()
 
-def _safe_union(geoms):
-    """Merge geometries using unary_union with guaranteed crash protection.
-    make_valid(structure) in load_map() ensures inputs are valid; this handles any edge cases."""
-    arr = geoms.values if hasattr(geoms, 'values') else np.asarray(list(geoms))
-    if len(arr) == 0:
-        return None
-    if len(arr) == 1:
-        return arr[0]
-    try:
-        result = unary_union(arr.tolist())
-        return result if result.is_valid else result.buffer(0)
-    except Exception:
-        # Last resort: fix each geometry individually then retry
-        return unary_union([g.buffer(0) for g in arr])
-
 @st.cache_resource
 def precompute_iso_merged(_gdf):
-    """Pre-merge each country's subdivision polygons into one shape per ISO3 (runs once at startup).
-    Uses coverage_union_all for crack-free merging of topologically-consistent mapshaper output."""
+    """Pre-merge each country's subdivision polygons into one shape per ISO3 (runs once per map, kept on disk)."""
     if _gdf is None: return None
-    cols = [c for c in ['ISO3', 'Continent', 'UN_Region', 'Language', 'geometry'] if c in _gdf.columns]
-    sub = _gdf[cols].copy()
-    attrs = sub.drop(columns='geometry').groupby('ISO3', as_index=False).first()
-    geoms = sub.groupby('ISO3')['geometry'].agg(_safe_union).reset_index()
-    iso_gdf = gpd.GeoDataFrame(attrs.merge(geoms, on='ISO3'), geometry='geometry', crs=_gdf.crs)
-    iso_gdf['NAME'] = iso_gdf['ISO3']
-    return iso_gdf
-
-_stats_mtime = os.path.getmtime("./Data/Timeguessr_Stats.csv") if os.path.exists("./Data/Timeguessr_Stats.csv") else 0
-data = load_data(_stats_mtime)
+    return disk_cached("iso_merged", MAP_CACHE_VERSION, (), lambda: merge_by_iso(_gdf), MAP_SOURCES)
+
+@st.cache_resource
+def load_map_tiles():
+    """The prepared map and the GeoJSON geometry of every prebuilt tile (see
+    map_store.build_tiles), or None if Build_Map.py hasn't built tiles for the
+    current map file."""
+    tiles = load_tiles()
+    if tiles is None: return None
+    stored = tiles['map']
+    return {
+        'map': gpd.GeoDataFrame(stored['attrs'], geometry=decode_geometries(stored['geometry']), crs=stored['crs']),
+        'units': dict(zip(tiles['keys'], map(mapping, decode_geometries(tiles['units'])))),
+        'background': mapping(decode_geometries(tiles['background'])[0]),
+    }
+
+data = load_data(stats_version())
 base_gdf, valid_map_names = load_map()
 iso_gdf = precompute_iso_merged(base_gdf)
 
@@ -528,16 +277,35 @@ for _iso in sorted(_splittable_isos - set(SPLIT_CONFIG.keys())):
 
 # --- Geometry Functions ---
 
-@st.cache_data
+@st.cache_resource
 def get_background_layer(_gdf):
     """Creates a single unified shape for the whole world."""
     if _gdf is None: return None
-    _gdf['World_Group'] = 1
-    bg_gdf = _gdf.dissolve(by='World_Group', as_index=False)
-    return json.loads(bg_gdf.to_json())
+    tiles = load_map_tiles()
+    geometry = tiles['background'] if tiles else mapping(background_geometry(_gdf))
+    return {'type': 'FeatureCollection', 'features': [
+        {'id': '0', 'type': 'Feature', 'properties': {'World_Group': 1}, 'geometry': geometry}]}
+
+@st.cache_data(max_entries=256)
+def dissolve_units(_gdf, _iso_gdf, units):
+    """Simplified GeoJSON geometry of the union of several tile units (ISO3 codes
+    for whole countries, (ISO3, NAME) pairs for subdivisions)."""
+    isos = {u for u in units if isinstance(u, str)}
+    subs = set(units) - isos
+    geoms = list(_iso_gdf.loc[_iso_gdf['ISO3'].isin(isos), 'geometry'])
+    if subs:
+        geoms += list(_gdf.loc[[key in subs for key in zip(_gdf['ISO3'], _gdf['NAME'])], 'geometry'])
+    return mapping(feature_geometry(safe_union(geoms)))
 
 @st.cache_data
 def generate_dynamic_map_layer(_gdf, _iso_gdf, active_iso_tuple, active_splits, active_subdivs_tuple, view_mode):
+    """`build_map_layer`, kept on disk per map and arguments."""
+    if _gdf is None: return None
+    return disk_cached("map_layer", MAP_CACHE_VERSION, (active_iso_tuple, active_splits, active_subdivs_tuple, view_mode),
+                       lambda: build_map_layer(_gdf, _iso_gdf, active_iso_tuple, active_splits, active_subdivs_tuple, view_mode),
+                       MAP_SOURCES)
+
+def build_map_layer(_gdf, _iso_gdf, active_iso_tuple, active_splits, active_subdivs_tuple, view_mode):
     """
     Generates map geometry only for active locations.
     Non-split countries use pre-merged ISO-level geometries (seam-free).
@@ -566,9 +334,13 @@ def generate_dynamic_map_layer(_gdf, _iso_gdf, active_iso_tuple, active_splits,
 
     parts = []
     if non_split_non_territory and _iso_gdf is not None:
-        parts.append(_iso_gdf[_iso_gdf['ISO3'].isin(non_split_non_territory)].copy())
+        part = _iso_gdf[_iso_gdf['ISO3'].isin(non_split_non_territory)].copy()
+        part['Tile'] = part['ISO3']
+        parts.append(part)
     if split_isos_active or territory_isos:
-        parts.append(_gdf[_gdf['ISO3'].isin(split_isos_active | territory_isos)].copy())
+        part = _gdf[_gdf['ISO3'].isin(split_isos_active | territory_isos)].copy()
+        part['Tile'] = list(zip(part['ISO3'], part['NAME']))
+        parts.append(part)
 
     if not parts: return None
     work_gdf = gpd.GeoDataFrame(pd.concat(parts, ignore_index=True), geometry='geometry')
@@ -620,10 +392,15 @@ def generate_dynamic_map_layer(_gdf, _iso_gdf, active_iso_tuple, active_splits,
                                       work_gdf.loc[split_mask, attr_col].fillna('').astype(str))
 
     work_gdf['Dissolve_Key'] = key_series
-    geom_groups = work_gdf.groupby('Dissolve_Key')['geometry'].agg(_safe_union).reset_index()
-    dissolved = gpd.GeoDataFrame(geom_groups, geometry='geometry', crs=work_gdf.crs)
-    dissolved['geometry'] = dissolved['geometry'].simplify(tolerance=0.005, preserve_topology=True)
-    return json.loads(dissolved.to_json())
+
+    # 6. Take prebuilt features from the tiles; dissolve only the combinations they don't have
+    tile_geoms = (load_map_tiles() or {}).get('units', {})
+    features = []
+    for i, (key, units) in enumerate(work_gdf.groupby('Dissolve_Key')['Tile']):
+        units = tile_key(units)
+        geometry = tile_geoms[units] if units in tile_geoms else dissolve_units(_gdf, _iso_gdf, units)
+        features.append({'id': str(i), 'type': 'Feature', 'properties': {'Dissolve_Key': key}, 'geometry': geometry})
+    return {'type': 'FeatureCollection', 'features': features}
 
 # --- Stats Calculation ---
 
@@ -822,6 +599,73 @@ def calculate_stats(df, active_splits, view_mode, metric, score_mode):
 
     return grouped
 
+def date_range(df):
+    """The date slider's full range: the first date with a location to the last date played."""
+    return df[df['Country'].notna()]["Date"].min().date(), df["Date"].max().date()
+
+def filter_dates(df, sel_dates):
+    return df[(df["Date"].dt.date >= sel_dates[0]) & (df["Date"].dt.date <= sel_dates[1])].copy()
+
+def build_map_data(filtered_data, active_splits, view_mode, map_metric):
+    """`filtered_data` with the map `Join_Key` for `view_mode` and only the rounds `map_metric` counts."""
+    map_data = filtered_data.copy()
+    map_data['Join_Key'] = map_data['ISO3']
+
+    if active_splits:
+        if view_mode == "Countries":
+            mask_split = map_data['ISO3'].isin(active_splits) & map_data['Subdivision'].notna()
+            map_data.loc[mask_split, 'Join_Key'] = map_data.loc[mask_split, 'Subdivision']
+
+    if view_mode != "Countries":
+        mask_not_split = ~map_data['ISO3'].isin(active_splits)
+
+        attr_col = None
+        if view_mode == "Continents": attr_col = "Continent"
+        elif view_mode == "UN Regions": attr_col = "UN_Region"
+        elif view_mode == "Languages": attr_col = "Language"
+
+        if attr_col:
+            map_data.loc[mask_not_split, 'Join_Key'] = map_data.loc[mask_not_split, attr_col]
+
+            if active_splits:
+                mask_split = map_data['ISO3'].isin(active_splits)
+                if mask_split.any():
+                    map_data.loc[mask_split, 'Join_Key'] = map_data.loc[mask_split, 'ISO3'] + "___" + map_data.loc[mask_split, attr_col].astype(str)
+
+    if 'Michael Round Score' in map_data.columns:
+        m_played = map_data['Michael Round Score'].notna()
+    else:
+        m_played = map_data['Michael Geography Score'].notna()
+
+    if 'Sarah Round Score' in map_data.columns:
+        s_played = map_data['Sarah Round Score'].notna()
+    else:
+        s_played = map_data['Sarah Geography Score'].notna()
+
+    if map_metric == "Michael":
+        map_data = map_data[m_played]
+    elif map_metric == "Sarah":
+        map_data = map_data[s_played]
+    elif map_metric == "Comparison":
+        map_data = map_data[m_played & s_played]
+    elif map_metric == "Count":
+        map_data = map_data[m_played | s_played]
+    return map_data
+
+def active_map_keys(map_data, stats, active_splits):
+    """(ISO3s with stats, (ISO3, subdivisions) of the split countries) for `generate_dynamic_map_layer`."""
+    active_keys = set(stats['Join_Key'].unique())
+    active_iso_tuple = tuple(map_data[map_data['Join_Key'].isin(active_keys)]['ISO3'].unique()) if not stats.empty else ()
+
+    active_subdivs = {}
+    if active_splits:
+        for iso in active_splits:
+            subs = map_data[(map_data['ISO3'] == iso) & map_data['Subdivision'].notna()]['Subdivision'].astype(str).str.strip().unique()
+            active_subdivs[iso] = tuple(subs)
+
+    active_subdivs_tuple = tuple(active_subdivs.items())
+    return active_iso_tuple, active_subdivs_tuple
+
 def create_styled_table(df):
     header_style = "background-color: #d9d7cc; border-bottom: 2px solid #8f8d85; padding: 10px; text-align: left; color: #696761; font-weight: 600;"
     header_center = "background-color: #d9d7cc; border-bottom: 2px solid #8f8d85; padding: 10px; text-align: center; color: #696761; font-weight: 600;"
@@ -905,10 +749,9 @@ with st.sidebar:
     sel_splits = st.multiselect("Split Countries:", sorted(split_options.keys()), default=[])
     
     if "Date" in data.columns:
-        min_d = data[data['Country'].notna()]["Date"].min().date()
-        max_d = data["Date"].max().date()
+        min_d, max_d = date_range(data)
         sel_dates = st.slider("Select Date Range:", min_d, max_d, (min_d, max_d), format="MM/DD/YY")
-        filtered_data = data[(data["Date"].dt.date >= sel_dates[0]) & (data["Date"].dt.date <= sel_dates[1])].copy()
+        filtered_data = filter_dates(data, sel_dates)
     else: filtered_data = data.copy()
 
     active_splits = set()
@@ -958,60 +801,8 @@ if tbd_display_list:
 
 # --- Map Generation ---
 
-if not filtered_data.empty:
-    map_data = filtered_data.copy()
-    map_data['Join_Key'] = map_data['ISO3'] 
-    
-    if active_splits:
-         if view_mode == "Countries":
-            mask_split = map_data['ISO3'].isin(active_splits) & map_data['Subdivision'].notna()
-            map_data.loc[mask_split, 'Join_Key'] = map_data.loc[mask_split, 'Subdivision']
-    
-    if view_mode != "Countries":
-        mask_not_split = ~map_data['ISO3'].isin(active_splits)
-        
-        attr_col = None
-        if view_mode == "Continents": attr_col = "Continent"
-        elif view_mode == "UN Regions": attr_col = "UN_Region"
-        elif view_mode == "Languages": attr_col = "Language"
-        
-        if attr_col:
-            map_data.loc[mask_not_split, 'Join_Key'] = map_data.loc[mask_not_split, attr_col]
-            
-            if active_splits:
-                mask_split = map_data['ISO3'].isin(active_splits)
-                if mask_split.any():
-                    map_data.loc[mask_split, 'Join_Key'] = map_data.loc[mask_split, 'ISO3'] + "___" + map_data.loc[mask_split, attr_col].astype(str)
-
-    if 'Michael Round Score' in map_data.columns:
-        m_played = map_data['Michael Round Score'].notna()
-    else:
-        m_played = map_data['Michael Geography Score'].notna() 
-
-    if 'Sarah Round Score' in map_data.columns:
-        s_played = map_data['Sarah Round Score'].notna()
-    else:
-        s_played = map_data['Sarah Geography Score'].notna()
-
-    if map_metric == "Michael":
-        map_data = map_data[m_played]
-    elif map_metric == "Sarah":
-        map_data = map_data[s_played]
-    elif map_metric == "Comparison":
-        map_data = map_data[m_played & s_played]
-    elif map_metric == "Count":
-        map_data = map_data[m_played | s_played]
-
-active_keys = set(stats['Join_Key'].unique())
-active_iso_tuple = tuple(map_data[map_data['Join_Key'].isin(active_keys)]['ISO3'].unique()) if not stats.empty else ()
-
-active_subdivs = {}
-if active_splits:
-    for iso in active_splits:
-        subs = map_data[(map_data['ISO3'] == iso) & map_data['Subdivision'].notna()]['Subdivision'].astype(str).str.strip().unique()
-        active_subdivs[iso] = tuple(subs)
-
-active_subdivs_tuple = tuple(active_subdivs.items())
+map_data = build_map_data(filtered_data, active_splits, view_mode, map_metric)
+active_iso_tuple, active_subdivs_tuple = active_map_keys(map_data, stats, active_splits)
 
 map_geojson = generate_dynamic_map_layer(base_gdf, iso_gdf, active_iso_tuple, active_splits_frozen, active_subdivs_tuple, view_mode)
 bg_geojson = get_background_layer(base_gdf)
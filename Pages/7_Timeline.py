@@ -4,11 +4,12 @@ import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 import math
-import os
 
 # --- Page Config ---
 st.set_page_config(page_title="Timeline Analysis", layout="wide")
 from background import set_random_sarah_background
+from data_service import get_stats
+from render_cache import cached_figure
 set_random_sarah_background(lightness_level=0.7)
 
 # --- Load External CSS ---
@@ -64,13 +65,7 @@ COLOR_M = "#221e8f"
 COLOR_S = "#8a005c"
 COLOR_ACTUAL = "#7f8c8d"
 
-@st.cache_data
-def load_timeline_data(mtime=0):
-    data = pd.read_csv("./Data/Timeguessr_Stats.csv")
-    return data
-
-stats_mtime = os.path.getmtime("./Data/Timeguessr_Stats.csv") if os.path.exists("./Data/Timeguessr_Stats.csv") else 0
-data = load_timeline_data(stats_mtime)
+data = get_stats()
 
 col_year = "Year"
 col_michael = "Michael Time Guessed"
@@ -91,24 +86,27 @@ max_y = int(max(year_vals))
 all_years = np.arange(min_y, max_y + 1)
 counts_single, _ = np.histogram(year_vals, bins=np.arange(min_y, max_y + 2))
 
-fig_single = go.Figure()
-fig_single.add_trace(go.Bar(
-    x=all_years, 
-    y=counts_single, 
-    marker_color=COLOR_ACTUAL,
-    name="Actual Year Frequency",
-    hovertemplate="<b>Year:</b> %{x}<br><b>Count:</b> %{y}<extra></extra>"
-))
-
-fig_single.update_layout(**PLOT_THEME)
-fig_single.update_layout(
-    title="Appearance Count per Individual Year (Bucket size = 1)",
-    xaxis_title="Year",
-    yaxis_title="Frequency",
-    bargap=0, # Continuous look for single years
-    xaxis=dict(tickmode='linear', dtick=10) # Show labels every 10 years
-)
-st.plotly_chart(fig_single, use_container_width=True, theme=None)
+def single_year_figure():
+    fig_single = go.Figure()
+    fig_single.add_trace(go.Bar(
+        x=all_years, 
+        y=counts_single, 
+        marker_color=COLOR_ACTUAL,
+        name="Actual Year Frequency",
+        hovertemplate="<b>Year:</b> %{x}<br><b>Count:</b> %{y}<extra></extra>"
+    ))
+
+    fig_single.update_layout(**PLOT_THEME)
+    fig_single.update_layout(
+        title="Appearance Count per Individual Year (Bucket size = 1)",
+        xaxis_title="Year",
+        yaxis_title="Frequency",
+        bargap=0, # Continuous look for single years
+        xaxis=dict(tickmode='linear', dtick=10) # Show labels every 10 years
+    )
+    return fig_single
+
+st.plotly_chart(cached_figure("timeline_single_year", (), single_year_figure), use_container_width=True, theme=None)
 
 # --- Bin edges: 10-year bins from 1900 to 2025 ---
 bin_edges = list(range(1900, 2026, 10))
@@ -143,22 +141,25 @@ y_dtick = 1 if max_count <= 10 else math.ceil(max_count / 10)
 # ==========================================
 st.markdown('<div class="section-heading">Frequency Distribution by Era</div>', unsafe_allow_html=True)
 
-fig_hist = go.Figure()
-fig_hist.add_trace(go.Bar(x=bin_labels, y=counts_year, name="Actual Year", marker_color=COLOR_ACTUAL, marker_line=dict(width=1, color="white")))
-fig_hist.add_trace(go.Bar(x=bin_labels, y=counts_michael, name="Michael's Guesses", marker_color=COLOR_M, marker_line=dict(width=1, color="white")))
-fig_hist.add_trace(go.Bar(x=bin_labels, y=counts_sarah, name="Sarah's Guesses", marker_color=COLOR_S, marker_line=dict(width=1, color="white")))
-
-fig_hist.update_layout(**PLOT_THEME)
-fig_hist.update_layout(
-    title="Volume of Photos vs. Guesses per Decade",
-    barmode='group',
-    bargap=0.15,
-    bargroupgap=0.05,
-    xaxis_title="Decade",
-    yaxis_title="Count",
-    yaxis=dict(range=[0, max_count * 1.05], tick0=0, dtick=y_dtick)
-)
-st.plotly_chart(fig_hist, use_container_width=True, theme=None)
+def era_histogram_figure():
+    fig_hist = go.Figure()
+    fig_hist.add_trace(go.Bar(x=bin_labels, y=counts_year, name="Actual Year", marker_color=COLOR_ACTUAL, marker_line=dict(width=1, color="white")))
+    fig_hist.add_trace(go.Bar(x=bin_labels, y=counts_michael, name="Michael's Guesses", marker_color=COLOR_M, marker_line=dict(width=1, color="white")))
+    fig_hist.add_trace(go.Bar(x=bin_labels, y=counts_sarah, name="Sarah's Guesses", marker_color=COLOR_S, marker_line=dict(width=1, color="white")))
+
+    fig_hist.update_layout(**PLOT_THEME)
+    fig_hist.update_layout(
+        title="Volume of Photos vs. Guesses per Decade",
+        barmode='group',
+        bargap=0.15,
+        bargroupgap=0.05,
+        xaxis_title="Decade",
+        yaxis_title="Count",
+        yaxis=dict(range=[0, max_count * 1.05], tick0=0, dtick=y_dtick)
+    )
+    return fig_hist
+
+st.plotly_chart(cached_figure("timeline_era_histogram", (), era_histogram_figure), use_container_width=True, theme=None)
 
 # ==========================================
 # YEAR-BY-YEAR OUTCOME SPLIT
@@ -193,43 +194,46 @@ _hover_prefix = "Year" if _bucket == 1 else f"Years"
 _hover_x = "%{x}" if _bucket == 1 else f"%{{x}}–%{{customdata}}"
 _end_years = [b + _bucket - 1 for b in _bins]
 
-fig_area = go.Figure()
-fig_area.add_trace(go.Scatter(
-    x=_bins, y=(_by["michael"] / _by["_n"] * 100).round(1),
-    customdata=_end_years,
-    mode="lines", name="Michael",
-    stackgroup="one",
-    line=dict(width=0.5, color=COLOR_M),
-    fillcolor="rgba(34,30,143,0.75)",
-    hovertemplate=f"{_hover_x}<br>Michael: %{{y:.1f}}%<extra></extra>"
-))
-fig_area.add_trace(go.Scatter(
-    x=_bins, y=(_by["tie"] / _by["_n"] * 100).round(1),
-    customdata=_end_years,
-    mode="lines", name="Tie",
-    stackgroup="one",
-    line=dict(width=0.5, color="#8f8d85"),
-    fillcolor="rgba(143,141,133,0.45)",
-    hovertemplate=f"{_hover_x}<br>Tie: %{{y:.1f}}%<extra></extra>"
-))
-fig_area.add_trace(go.Scatter(
-    x=_bins, y=(_by["sarah"] / _by["_n"] * 100).round(1),
-    customdata=_end_years,
-    mode="lines", name="Sarah",
-    stackgroup="one",
-    line=dict(width=0.5, color=COLOR_S),
-    fillcolor="rgba(138,0,92,0.75)",
-    hovertemplate=f"{_hover_x}<br>Sarah: %{{y:.1f}}%<extra></extra>"
-))
-fig_area.add_hline(y=50, line=dict(color="#555", width=1, dash="dot"))
-fig_area.update_layout(**PLOT_THEME)
-fig_area.update_layout(
-    title="Share of Rounds Won by Actual Year (Time Guessing)",
-    xaxis_title=_x_label,
-    yaxis=dict(range=[0, 100], ticksuffix="%", title="% of Rounds"),
-    height=420,
-)
-st.plotly_chart(fig_area, use_container_width=True, theme=None)
+def outcome_area_figure():
+    fig_area = go.Figure()
+    fig_area.add_trace(go.Scatter(
+        x=_bins, y=(_by["michael"] / _by["_n"] * 100).round(1),
+        customdata=_end_years,
+        mode="lines", name="Michael",
+        stackgroup="one",
+        line=dict(width=0.5, color=COLOR_M),
+        fillcolor="rgba(34,30,143,0.75)",
+        hovertemplate=f"{_hover_x}<br>Michael: %{{y:.1f}}%<extra></extra>"
+    ))
+    fig_area.add_trace(go.Scatter(
+        x=_bins, y=(_by["tie"] / _by["_n"] * 100).round(1),
+        customdata=_end_years,
+        mode="lines", name="Tie",
+        stackgroup="one",
+        line=dict(width=0.5, color="#8f8d85"),
+        fillcolor="rgba(143,141,133,0.45)",
+        hovertemplate=f"{_hover_x}<br>Tie: %{{y:.1f}}%<extra></extra>"
+    ))
+    fig_area.add_trace(go.Scatter(
+        x=_bins, y=(_by["sarah"] / _by["_n"] * 100).round(1),
+        customdata=_end_years,
+        mode="lines", name="Sarah",
+        stackgroup="one",
+        line=dict(width=0.5, color=COLOR_S),
+        fillcolor="rgba(138,0,92,0.75)",
+        hovertemplate=f"{_hover_x}<br>Sarah: %{{y:.1f}}%<extra></extra>"
+    ))
+    fig_area.add_hline(y=50, line=dict(color="#555", width=1, dash="dot"))
+    fig_area.update_layout(**PLOT_THEME)
+    fig_area.update_layout(
+        title="Share of Rounds Won by Actual Year (Time Guessing)",
+        xaxis_title=_x_label,
+        yaxis=dict(range=[0, 100], ticksuffix="%", title="% of Rounds"),
+        height=420,
+    )
+    return fig_area
+
+st.plotly_chart(cached_figure("timeline_outcome_area", (_bucket,), outcome_area_figure), use_container_width=True, theme=None)
 
 st.markdown('<div class="section-heading">Guess Accuracy Matrix</div>', unsafe_allow_html=True)
 
@@ -247,31 +251,34 @@ min_val = min(x_year.min(), y_michael.min(), y_sarah.min()) - 5
 max_val = max(x_year.max(), y_michael.max(), y_sarah.max()) + 5
 line_x = np.linspace(min_val, max_val, 200)
 
-fig_scatter = go.Figure()
-fig_scatter.add_trace(go.Scatter(
-    x=line_x, y=line_x, mode="lines", name="Perfect Guess (y = x)",
-    line=dict(color="#7f8c8d", width=2, dash="dash"),
-    hoverinfo="skip"
-))
-fig_scatter.add_trace(go.Scatter(
-    x=x_year, y=y_michael, mode="markers", name="Michael",
-    marker=dict(size=8, color=COLOR_M, opacity=0.8, line=dict(width=1, color="white")),
-    hovertemplate="<b>Actual:</b> %{x}<br><b>Guessed:</b> %{y}<extra>Michael</extra>"
-))
-fig_scatter.add_trace(go.Scatter(
-    x=x_year, y=y_sarah, mode="markers", name="Sarah",
-    marker=dict(size=8, color=COLOR_S, opacity=0.8, line=dict(width=1, color="white")),
-    hovertemplate="<b>Actual:</b> %{x}<br><b>Guessed:</b> %{y}<extra>Sarah</extra>"
-))
-
-fig_scatter.update_layout(**PLOT_THEME)
-fig_scatter.update_layout(
-    title="Time Guessed vs Actual Year",
-    xaxis_title="Actual Year",
-    yaxis_title="Guessed Year",
-    height=600,
-)
-st.plotly_chart(fig_scatter, use_container_width=True, theme=None)
+def accuracy_scatter_figure():
+    fig_scatter = go.Figure()
+    fig_scatter.add_trace(go.Scatter(
+        x=line_x, y=line_x, mode="lines", name="Perfect Guess (y = x)",
+        line=dict(color="#7f8c8d", width=2, dash="dash"),
+        hoverinfo="skip"
+    ))
+    fig_scatter.add_trace(go.Scatter(
+        x=x_year, y=y_michael, mode="markers", name="Michael",
+        marker=dict(size=8, color=COLOR_M, opacity=0.8, line=dict(width=1, color="white")),
+        hovertemplate="<b>Actual:</b> %{x}<br><b>Guessed:</b> %{y}<extra>Michael</extra>"
+    ))
+    fig_scatter.add_trace(go.Scatter(
+        x=x_year, y=y_sarah, mode="markers", name="Sarah",
+        marker=dict(size=8, color=COLOR_S, opacity=0.8, line=dict(width=1, color="white")),
+        hovertemplate="<b>Actual:</b> %{x}<br><b>Guessed:</b> %{y}<extra>Sarah</extra>"
+    ))
+
+    fig_scatter.update_layout(**PLOT_THEME)
+    fig_scatter.update_layout(
+        title="Time Guessed vs Actual Year",
+        xaxis_title="Actual Year",
+        yaxis_title="Guessed Year",
+        height=600,
+    )
+    return fig_scatter
+
+st.plotly_chart(cached_figure("timeline_accuracy_scatter", (), accuracy_scatter_figure), use_container_width=True, theme=None)
 
 st.markdown('<div class="section-heading">Directional Bias by Decade</div>', unsafe_allow_html=True)
 
@@ -282,49 +289,52 @@ df_box["sarah_err"] = df_box[col_sarah] - df_box[col_year]
 
 decades = sorted(df_box["decade"].unique())
 
-fig_box = go.Figure()
-
-for d in decades:
-    is_first = bool(d == decades[0])
-    fig_box.add_trace(go.Box(
-        y=df_box.loc[df_box["decade"] == d, "michael_err"],
-        x=[f"{d}s"] * len(df_box.loc[df_box["decade"] == d]),
-        name="Michael",
-        marker_color=COLOR_M,
-        boxmean="sd",
-        legendgroup="Michael",
-        showlegend=is_first
-    ))
-    fig_box.add_trace(go.Box(
-        y=df_box.loc[df_box["decade"] == d, "sarah_err"],
-        x=[f"{d}s"] * len(df_box.loc[df_box["decade"] == d]),
-        name="Sarah",
-        marker_color=COLOR_S,
-        boxmean="sd",
-        legendgroup="Sarah",
-        showlegend=is_first
-    ))
+def decade_bias_figure():
+    fig_box = go.Figure()
+
+    for d in decades:
+        is_first = bool(d == decades[0])
+        fig_box.add_trace(go.Box(
+            y=df_box.loc[df_box["decade"] == d, "michael_err"],
+            x=[f"{d}s"] * len(df_box.loc[df_box["decade"] == d]),
+            name="Michael",
+            marker_color=COLOR_M,
+            boxmean="sd",
+            legendgroup="Michael",
+            showlegend=is_first
+        ))
+        fig_box.add_trace(go.Box(
+            y=df_box.loc[df_box["decade"] == d, "sarah_err"],
+            x=[f"{d}s"] * len(df_box.loc[df_box["decade"] == d]),
+            name="Sarah",
+            marker_color=COLOR_S,
+            boxmean="sd",
+            legendgroup="Sarah",
+            showlegend=is_first
+        ))
+
+    all_errors = pd.concat([df_box["michael_err"], df_box["sarah_err"]])
+    max_abs = max(abs(all_errors.min()), abs(all_errors.max())) + 5
+
+    fig_box.update_layout(**PLOT_THEME)
+    fig_box.update_layout(
+        title="Signed Error Distribution (+ Overestimated / - Underestimated)",
+        xaxis_title="Actual Decade",
+        yaxis_title="Error (Years)",
+        boxmode="group",
+        boxgap=0.05,
+        boxgroupgap=0.2,
+        yaxis=dict(
+            range=[-max_abs, max_abs],
+            zeroline=True,
+            zerolinewidth=2,
+            zerolinecolor="#c0392b"
+        ),
+        height=500
+    )
+    return fig_box
 
-all_errors = pd.concat([df_box["michael_err"], df_box["sarah_err"]])
-max_abs = max(abs(all_errors.min()), abs(all_errors.max())) + 5
-
-fig_box.update_layout(**PLOT_THEME)
-fig_box.update_layout(
-    title="Signed Error Distribution (+ Overestimated / - Underestimated)",
-    xaxis_title="Actual Decade",
-    yaxis_title="Error (Years)",
-    boxmode="group",
-    boxgap=0.05,
-    boxgroupgap=0.2,
-    yaxis=dict(
-        range=[-max_abs, max_abs],
-        zeroline=True,
-        zerolinewidth=2,
-        zerolinecolor="#c0392b"
-    ),
-    height=500
-)
-st.plotly_chart(fig_box, use_container_width=True, theme=None)
+st.plotly_chart(cached_figure("timeline_decade_bias", (), decade_bias_figure), use_container_width=True, theme=None)
 
 st.markdown('<div class="section-heading">Decade Confusion Matrices</div>', unsafe_allow_html=True)
 
@@ -391,7 +401,7 @@ def heatmap_fig(table, title, colorscale):
 col1, col2 = st.columns(2)
 
 with col1:
-    st.plotly_chart(heatmap_fig(michael_counts, "Michael's Guesses", colorscale="Blues"), use_container_width=True, theme=None)
+    st.plotly_chart(cached_figure("timeline_heatmap_michael", (), lambda: heatmap_fig(michael_counts, "Michael's Guesses", colorscale="Blues")), use_container_width=True, theme=None)
 
 with col2:
-    st.plotly_chart(heatmap_fig(sarah_counts, "Sarah's Guesses", colorscale="PuRd"), use_container_width=True, theme=None)
\ No newline at end of file
+    st.plotly_chart(cached_figure("timeline_heatmap_sarah", (), lambda: heatmap_fig(sarah_counts, "Sarah's Guesses", colorscale="PuRd")), use_container_width=True, theme=None)
\ No newline at end of file
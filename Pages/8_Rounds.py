@@ -1,15 +1,16 @@
-import os
 import streamlit as st
 import pandas as pd
 import numpy as np
 import pycountry
 import datetime
 from streamlit.components.v1 import html as components_html
-from collections import Counter
 
 # --- Page Config ---
 st.set_page_config(page_title="All Rounds", layout="wide")
 from background import set_random_sarah_background
+from data_service import get_stats, stats_version
+from render_cache import cached_html
+from scoring import GEO_PATTERN_RANGES, TIME_PATTERN_RANGES
 set_random_sarah_background(lightness_level=0.7)
 
 # --- CSS Loading ---
@@ -73,24 +74,31 @@ COUNTRY_ALIASES = {
     "Bosnia & Herzegovina": "Bosnia and Herzegovina",
 }
 
-GEOGRAPHY_RANGES = {
-    "OOO": (5000, 5000), "OO%": (4750, 4999), "OOX": (4500, 4749),
-    "O%X": (4250, 4499), "OXX": (3500, 4249), "%XX": (2500, 3499),
-    "XXX": (0, 2499)
+GEOGRAPHY_RANGES = GEO_PATTERN_RANGES
+TIME_RANGES = TIME_PATTERN_RANGES
+GEOGRAPHY_MIDPOINTS = {pat: (low + high) / 2 for pat, (low, high) in GEOGRAPHY_RANGES.items()}
+TIME_MIDPOINTS = {pat: (low + high) / 2 for pat, (low, high) in TIME_RANGES.items()}
+
+# Score column each sidebar slider filters on: (player, category)
+FILTER_COLUMNS = {
+    "_M_Geo_Filter": ("Michael", "Geography"),
+    "_S_Geo_Filter": ("Sarah", "Geography"),
+    "_M_Time_Filter": ("Michael", "Time"),
+    "_S_Time_Filter": ("Sarah", "Time"),
 }
 
-TIME_RANGES = {
-    "OOO": (5000, 5000), "OO%": (4800, 4950), "OOX": (4300, 4600),
-    "O%X": (3400, 3900), "OXX": (2000, 2500), "%XX": (1000, 1000),
-    "XXX": (0, 0)
-}
+# Days shown per page of the round list
+ROUNDS_PAGE_DAYS = 20
 
 # --- Helper Functions ---
 @st.cache_data
-def load_data(filepath, mtime=0):
+def load_data(mtime=0):
     try:
-        df = pd.read_csv(filepath)
-        df["Date"] = pd.to_datetime(df["Date"], errors='coerce').dt.date
+        df = get_stats().copy()
+        df["Date"] = df["Date"].dt.date
+        for col, (player, category) in FILTER_COLUMNS.items():
+            df[col] = filter_scores(df, player, category)
+        df["_Base_Location"] = base_location_names(df)
         return df
     except FileNotFoundError:
         return None
@@ -129,24 +137,13 @@ def get_midpoint_score(row, player, category):
         return (low + high) / 2
     return 0
 
-def get_filter_score(row, player, category):
-    """Returns a float score for filtering purposes."""
-    col_score = f"{player} {category} Score"
-    col_pattern = f"{player} {category}"
-    ranges = GEOGRAPHY_RANGES if category == "Geography" else TIME_RANGES
-    
-    val = row.get(col_score)
-    if pd.notna(val) and str(val).strip() != "": 
-        try:
-            return float(val)
-        except ValueError:
-            pass
-    
-    pat = row.get(col_pattern)
-    if pat in ranges:
-        return (ranges[pat][0] + ranges[pat][1]) / 2
-    
-    return np.nan
+def filter_scores(df, player, category):
+    """float64 score column for filtering: the explicit score, else the
+    pattern midpoint, else NaN."""
+    midpoints = GEOGRAPHY_MIDPOINTS if category == "Geography" else TIME_MIDPOINTS
+    pattern_mid = df[f"{player} {category}"].astype(object).map(midpoints)
+    score = pd.to_numeric(df[f"{player} {category} Score"], errors="coerce")
+    return score.fillna(pattern_mid).astype(np.float64)
 
 def get_bar_html(score, pattern, ranges):
     """Generates the progress bar HTML."""
@@ -168,28 +165,22 @@ def get_bar_html(score, pattern, ranges):
         return f'<div class="tg-bar-bg" style="position:relative;"><div style="position:absolute; left:0; width:{min_pct:.2f}%; height:100%; background:#db5049;"></div><div style="position:absolute; left:{min_pct:.2f}%; width:{max_pct - min_pct:.2f}%; height:100%; background:#d1d647;"></div><div style="position:absolute; left:{max_pct:.2f}%; width:{100 - max_pct:.2f}%; height:100%; background:#b0afaa;"></div></div>'
     return '<div class="tg-bar-bg"><div class="tg-bar-fill" style="width:0%;"></div></div>'
 
-def get_base_location_name(row):
-    """Returns the base location name safely."""
-    country = str(row.get("Country", "")).strip()
-    subdivision = str(row.get("Subdivision", "")).strip()
-    
-    if subdivision and subdivision.lower() != "nan":
-        return f"{subdivision}, {country}" if country else subdivision
-    return country if country and country.lower() != "nan" else "Unknown"
+def base_location_names(df):
+    """"Subdivision, Country" (or whichever of the two is known, else
+    "Unknown") for every row."""
+    country = df["Country"].astype(object).map(str).str.strip()
+    subdivision = df["Subdivision"].astype(object).map(str).str.strip()
+    has_subdivision = (subdivision != "") & (subdivision.str.lower() != "nan")
+    with_subdivision = subdivision.where(country == "", subdivision + ", " + country)
+    country_only = country.where((country != "") & (country.str.lower() != "nan"), "Unknown")
+    return with_subdivision.where(has_subdivision, country_only)
 
 # --- Main Page Logic ---
 st.title("All Rounds")
 
-stats_mtime = os.path.getmtime("./Data/Timeguessr_Stats.csv") if os.path.exists("./Data/Timeguessr_Stats.csv") else 0
-df = load_data("./Data/Timeguessr_Stats.csv", stats_mtime)
+df = load_data(stats_version())
 
 if df is not None and not df.empty:
-    # Pre-calculate score columns for filtering
-    df["_M_Geo_Filter"] = df.apply(lambda r: get_filter_score(r, "Michael", "Geography"), axis=1)
-    df["_S_Geo_Filter"] = df.apply(lambda r: get_filter_score(r, "Sarah", "Geography"), axis=1)
-    df["_M_Time_Filter"] = df.apply(lambda r: get_filter_score(r, "Michael", "Time"), axis=1)
-    df["_S_Time_Filter"] = df.apply(lambda r: get_filter_score(r, "Sarah", "Time"), axis=1)
-
     # --- Sidebar Filters ---
     with st.sidebar:
         st.header("Filter Settings")
@@ -255,210 +246,214 @@ if df is not None and not df.empty:
         st.stop()
     
     df = df_filtered
+    filter_key = (date_range, both_players_only, tuple(selected_countries), enable_year_filter, year_range,
+                  m_geo_range, s_geo_range, m_time_range, s_time_range)
     
-    # 1. Calculate Grand Totals and Matrix Data
-    totals = {
-        "Michael": {"Total": 0, "Geo": 0, "Time": 0, "Days": set(), "Rounds": 0, "Perfect_Geo": 0, "Perfect_Time": 0, "Perfect_Round": 0, "Horrible_Round": 0, "Horrible_Geo": 0, "Horrible_Time": 0}, 
-        "Sarah": {"Total": 0, "Geo": 0, "Time": 0, "Days": set(), "Rounds": 0, "Perfect_Geo": 0, "Perfect_Time": 0, "Perfect_Round": 0, "Horrible_Round": 0, "Horrible_Geo": 0, "Horrible_Time": 0}
-    }
+    def build_top_banner(df):
+        # 1. Calculate Grand Totals and Matrix Data
+        totals = {
+            "Michael": {"Total": 0, "Geo": 0, "Time": 0, "Days": set(), "Rounds": 0, "Perfect_Geo": 0, "Perfect_Time": 0, "Perfect_Round": 0, "Horrible_Round": 0, "Horrible_Geo": 0, "Horrible_Time": 0}, 
+            "Sarah": {"Total": 0, "Geo": 0, "Time": 0, "Days": set(), "Rounds": 0, "Perfect_Geo": 0, "Perfect_Time": 0, "Perfect_Round": 0, "Horrible_Round": 0, "Horrible_Geo": 0, "Horrible_Time": 0}
+        }
     
-    matrix = {
-        'M_geo': {'M_time': 0, 'T_time': 0, 'S_time': 0},
-        'T_geo': {'M_time': 0, 'T_time': 0, 'S_time': 0},
-        'S_geo': {'M_time': 0, 'T_time': 0, 'S_time': 0},
-    }
-    total_h2h_rounds = 0
-
-    for _, row in df.iterrows():
-        day_num = row["Timeguessr Day"]
+        matrix = {
+            'M_geo': {'M_time': 0, 'T_time': 0, 'S_time': 0},
+            'T_geo': {'M_time': 0, 'T_time': 0, 'S_time': 0},
+            'S_geo': {'M_time': 0, 'T_time': 0, 'S_time': 0},
+        }
+        total_h2h_rounds = 0
+
+        for _, row in df.iterrows():
+            day_num = row["Timeguessr Day"]
         
-        has_m = pd.notna(row.get("Michael Geography Score")) or pd.notna(row.get("Michael Geography")) or pd.notna(row.get("Michael Time Score")) or pd.notna(row.get("Michael Time"))
-        has_s = pd.notna(row.get("Sarah Geography Score")) or pd.notna(row.get("Sarah Geography")) or pd.notna(row.get("Sarah Time Score")) or pd.notna(row.get("Sarah Time"))
+            has_m = pd.notna(row.get("Michael Geography Score")) or pd.notna(row.get("Michael Geography")) or pd.notna(row.get("Michael Time Score")) or pd.notna(row.get("Michael Time"))
+            has_s = pd.notna(row.get("Sarah Geography Score")) or pd.notna(row.get("Sarah Geography")) or pd.notna(row.get("Sarah Time Score")) or pd.notna(row.get("Sarah Time"))
         
-        if has_m and has_s:
-            m_g, s_g = get_midpoint_score(row, "Michael", "Geography"), get_midpoint_score(row, "Sarah", "Geography")
-            m_t, s_t = get_midpoint_score(row, "Michael", "Time"), get_midpoint_score(row, "Sarah", "Time")
+            if has_m and has_s:
+                m_g, s_g = get_midpoint_score(row, "Michael", "Geography"), get_midpoint_score(row, "Sarah", "Geography")
+                m_t, s_t = get_midpoint_score(row, "Michael", "Time"), get_midpoint_score(row, "Sarah", "Time")
             
-            geo_win = 'M_geo' if m_g > s_g else ('S_geo' if s_g > m_g else 'T_geo')
-            time_win = 'M_time' if m_t > s_t else ('S_time' if s_t > m_t else 'T_time')
+                geo_win = 'M_geo' if m_g > s_g else ('S_geo' if s_g > m_g else 'T_geo')
+                time_win = 'M_time' if m_t > s_t else ('S_time' if s_t > m_t else 'T_time')
             
-            matrix[geo_win][time_win] += 1
-            total_h2h_rounds += 1
+                matrix[geo_win][time_win] += 1
+                total_h2h_rounds += 1
             
-        for p in ["Michael", "Sarah"]:
-            has_data = pd.notna(row.get(f"{p} Geography Score")) or pd.notna(row.get(f"{p} Geography")) or pd.notna(row.get(f"{p} Time Score")) or pd.notna(row.get(f"{p} Time"))
-            if has_data:
-                g_score, t_score = get_midpoint_score(row, p, "Geography"), get_midpoint_score(row, p, "Time")
+            for p in ["Michael", "Sarah"]:
+                has_data = pd.notna(row.get(f"{p} Geography Score")) or pd.notna(row.get(f"{p} Geography")) or pd.notna(row.get(f"{p} Time Score")) or pd.notna(row.get(f"{p} Time"))
+                if has_data:
+                    g_score, t_score = get_midpoint_score(row, p, "Geography"), get_midpoint_score(row, p, "Time")
                 
-                totals[p]["Rounds"] += 1
-                totals[p]["Days"].add(day_num)
-                totals[p]["Geo"] += g_score
-                totals[p]["Time"] += t_score
-                totals[p]["Total"] += (g_score + t_score)
+                    totals[p]["Rounds"] += 1
+                    totals[p]["Days"].add(day_num)
+                    totals[p]["Geo"] += g_score
+                    totals[p]["Time"] += t_score
+                    totals[p]["Total"] += (g_score + t_score)
                 
-                if g_score == 5000: totals[p]["Perfect_Geo"] += 1
-                if t_score == 5000: totals[p]["Perfect_Time"] += 1
-                if g_score == 5000 and t_score == 5000: totals[p]["Perfect_Round"] += 1
+                    if g_score == 5000: totals[p]["Perfect_Geo"] += 1
+                    if t_score == 5000: totals[p]["Perfect_Time"] += 1
+                    if g_score == 5000 and t_score == 5000: totals[p]["Perfect_Round"] += 1
                 
-                if g_score < 2500: totals[p]["Horrible_Geo"] += 1
-                if t_score == 0: totals[p]["Horrible_Time"] += 1
-                if t_score == 0 and g_score < 2500: totals[p]["Horrible_Round"] += 1
+                    if g_score < 2500: totals[p]["Horrible_Geo"] += 1
+                    if t_score == 0: totals[p]["Horrible_Time"] += 1
+                    if t_score == 0 and g_score < 2500: totals[p]["Horrible_Round"] += 1
 
-    totals["Michael"]["Days"] = len(totals["Michael"]["Days"])
-    totals["Sarah"]["Days"] = len(totals["Sarah"]["Days"])
+        totals["Michael"]["Days"] = len(totals["Michael"]["Days"])
+        totals["Sarah"]["Days"] = len(totals["Sarah"]["Days"])
     
-    # 2. Render Top Section: Stats Cards and Confusion Matrix (Secure Iframe)
-    max_matrix_val = max([matrix[r][c] for r in matrix for c in matrix[r]]) if total_h2h_rounds > 0 else 1
-
-    def format_cell(count):
-        pct = (count / total_h2h_rounds * 100) if total_h2h_rounds > 0 else 0
-        alpha = 0.05 + (0.45 * (count / max_matrix_val)) if max_matrix_val > 0 else 0.05
-        bg = f"rgba(219, 80, 73, {alpha})"
-        return f'<td style="background-color: {bg};"><span class="m-val">{count}</span><span class="m-pct">{pct:.1f}%</span></td>'
-
-    def generate_stats_card(player, bg_color, header_col):
-        player_rounds = totals[player]["Rounds"]
-        max_total = player_rounds * 10000 
-        max_sub = player_rounds * 5000
+        # 2. Render Top Section: Stats Cards and Confusion Matrix (Secure Iframe)
+        max_matrix_val = max([matrix[r][c] for r in matrix for c in matrix[r]]) if total_h2h_rounds > 0 else 1
+
+        def format_cell(count):
+            pct = (count / total_h2h_rounds * 100) if total_h2h_rounds > 0 else 0
+            alpha = 0.05 + (0.45 * (count / max_matrix_val)) if max_matrix_val > 0 else 0.05
+            bg = f"rgba(219, 80, 73, {alpha})"
+            return f'<td style="background-color: {bg};"><span class="m-val">{count}</span><span class="m-pct">{pct:.1f}%</span></td>'
+
+        def generate_stats_card(player, bg_color, header_col):
+            player_rounds = totals[player]["Rounds"]
+            max_total = player_rounds * 10000 
+            max_sub = player_rounds * 5000
         
-        t_val = int(totals[player]["Total"])
-        g_val = int(totals[player]["Geo"])
-        tm_val = int(totals[player]["Time"])
+            t_val = int(totals[player]["Total"])
+            g_val = int(totals[player]["Geo"])
+            tm_val = int(totals[player]["Time"])
         
-        total_pct = (t_val / max_total * 100) if max_total > 0 else 0
-        geo_pct = (g_val / max_sub * 100) if max_sub > 0 else 0
-        time_pct = (tm_val / max_sub * 100) if max_sub > 0 else 0
+            total_pct = (t_val / max_total * 100) if max_total > 0 else 0
+            geo_pct = (g_val / max_sub * 100) if max_sub > 0 else 0
+            time_pct = (tm_val / max_sub * 100) if max_sub > 0 else 0
         
-        avg_total = (t_val / player_rounds) if player_rounds > 0 else 0
-        avg_geo = (g_val / player_rounds) if player_rounds > 0 else 0
-        avg_time = (tm_val / player_rounds) if player_rounds > 0 else 0
+            avg_total = (t_val / player_rounds) if player_rounds > 0 else 0
+            avg_geo = (g_val / player_rounds) if player_rounds > 0 else 0
+            avg_time = (tm_val / player_rounds) if player_rounds > 0 else 0
         
-        perf_geo = totals[player]["Perfect_Geo"]
-        perf_time = totals[player]["Perfect_Time"]
-        perf_round = totals[player]["Perfect_Round"]
-        horrible_round = totals[player]["Horrible_Round"]
-        horrible_geo = totals[player]["Horrible_Geo"]
-        horrible_time = totals[player]["Horrible_Time"]
+            perf_geo = totals[player]["Perfect_Geo"]
+            perf_time = totals[player]["Perfect_Time"]
+            perf_round = totals[player]["Perfect_Round"]
+            horrible_round = totals[player]["Horrible_Round"]
+            horrible_geo = totals[player]["Horrible_Geo"]
+            horrible_time = totals[player]["Horrible_Time"]
         
-        return f"""
-        <div class="stat-card" style="background-color: {bg_color};">
-            <div class="stat-title" style="color: {header_col};">{player}'s Overall Stats</div>
-            <div class="stat-grid">
-                <div class="stat-label">Total</div>
-                <div class="stat-val"><b>{t_val:,}</b></div>
-                <div class="stat-metric" title="Average Total Score">🎯 {avg_total:,.0f}</div>
-                <div class="stat-metric" title="Perfect 10k Rounds">🟩🟩🟩 {perf_round}</div>
-                <div class="stat-metric" title="0 Time AND <2500 Geo">⬛⬛⬛ {horrible_round}</div>
-
-                <div class="stat-label">🌎 Geo</div>
-                <div class="stat-val"><b>{g_val:,}</b></div>
-                <div class="stat-metric" title="Average Geo Score">🎯 {avg_geo:,.0f}</div>
-                <div class="stat-metric" title="Perfect 5k Geo">🟩🟩🟩 {perf_geo}</div>
-                <div class="stat-metric" title="<2500 Geo">⬛⬛⬛ {horrible_geo}</div>
-
-                <div class="stat-label">📅 Time</div>
-                <div class="stat-val"><b>{tm_val:,}</b></div>
-                <div class="stat-metric" title="Average Time Score">🎯 {avg_time:,.0f}</div>
-                <div class="stat-metric" title="Perfect 5k Time">🟩🟩🟩 {perf_time}</div>
-                <div class="stat-metric" title="0 Time">⬛⬛⬛ {horrible_time}</div>
+            return f"""
+            <div class="stat-card" style="background-color: {bg_color};">
+                <div class="stat-title" style="color: {header_col};">{player}'s Overall Stats</div>
+                <div class="stat-grid">
+                    <div class="stat-label">Total</div>
+                    <div class="stat-val"><b>{t_val:,}</b></div>
+                    <div class="stat-metric" title="Average Total Score">🎯 {avg_total:,.0f}</div>
+                    <div class="stat-metric" title="Perfect 10k Rounds">🟩🟩🟩 {perf_round}</div>
+                    <div class="stat-metric" title="0 Time AND <2500 Geo">⬛⬛⬛ {horrible_round}</div>
+
+                    <div class="stat-label">🌎 Geo</div>
+                    <div class="stat-val"><b>{g_val:,}</b></div>
+                    <div class="stat-metric" title="Average Geo Score">🎯 {avg_geo:,.0f}</div>
+                    <div class="stat-metric" title="Perfect 5k Geo">🟩🟩🟩 {perf_geo}</div>
+                    <div class="stat-metric" title="<2500 Geo">⬛⬛⬛ {horrible_geo}</div>
+
+                    <div class="stat-label">📅 Time</div>
+                    <div class="stat-val"><b>{tm_val:,}</b></div>
+                    <div class="stat-metric" title="Average Time Score">🎯 {avg_time:,.0f}</div>
+                    <div class="stat-metric" title="Perfect 5k Time">🟩🟩🟩 {perf_time}</div>
+                    <div class="stat-metric" title="0 Time">⬛⬛⬛ {horrible_time}</div>
+                </div>
             </div>
-        </div>
-        """
+            """
 
-    top_css = """
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@400;600;700;800&display=swap');
-        body { margin: 0; font-family: 'Poppins', sans-serif; background: transparent; padding: 5px; box-sizing: border-box; }
-        .top-container { display: flex; gap: 25px; align-items: stretch; width: 100%; justify-content: center; }
-        .stats-wrapper { flex: 1.1; max-width: 700px; display: flex; flex-direction: column; gap: 15px; justify-content: center; }
-        .matrix-wrapper { flex: 0.9; max-width: 550px; display: flex; flex-direction: column; align-items: center; justify-content: center; }
+        top_css = """
+        <style>
+            @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@400;600;700;800&display=swap');
+            body { margin: 0; font-family: 'Poppins', sans-serif; background: transparent; padding: 5px; box-sizing: border-box; }
+            .top-container { display: flex; gap: 25px; align-items: stretch; width: 100%; justify-content: center; }
+            .stats-wrapper { flex: 1.1; max-width: 700px; display: flex; flex-direction: column; gap: 15px; justify-content: center; }
+            .matrix-wrapper { flex: 0.9; max-width: 550px; display: flex; flex-direction: column; align-items: center; justify-content: center; }
         
-        .stat-card { padding: 15px 18px; border-radius: 12px; border: 1px solid rgba(0,0,0,0.05); }
-        .stat-title { font-weight: 800; font-size: 1.25rem; margin-bottom: 12px; line-height: 1; }
-        .stat-grid { display: grid; grid-template-columns: 60px 105px minmax(0, 1fr) minmax(0, 1fr) minmax(0, 1fr); gap: 8px 10px; align-items: center; background: rgba(255,255,255,0.4); padding: 12px; border-radius: 8px; font-size: 0.85rem; }
-        .stat-label { font-weight: 800; color: #444; }
-        .stat-val { color: #222; }
-        .stat-sub { color: #666; font-size: 0.75rem; font-weight: 600; }
-        .stat-metric { color: #555; font-weight: 600; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }
+            .stat-card { padding: 15px 18px; border-radius: 12px; border: 1px solid rgba(0,0,0,0.05); }
+            .stat-title { font-weight: 800; font-size: 1.25rem; margin-bottom: 12px; line-height: 1; }
+            .stat-grid { display: grid; grid-template-columns: 60px 105px minmax(0, 1fr) minmax(0, 1fr) minmax(0, 1fr); gap: 8px 10px; align-items: center; background: rgba(255,255,255,0.4); padding: 12px; border-radius: 8px; font-size: 0.85rem; }
+            .stat-label { font-weight: 800; color: #444; }
+            .stat-val { color: #222; }
+            .stat-sub { color: #666; font-size: 0.75rem; font-weight: 600; }
+            .stat-metric { color: #555; font-weight: 600; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }
         
-        .matrix-title { font-weight: 800; color: #db5049; font-size: 1.4rem; margin-bottom: 20px; text-align: center; }
-        table.matrix { border-collapse: separate; border-spacing: 6px; margin: 0 auto; }
-        table.matrix th, table.matrix td { border: none; }
-        table.matrix th { padding: 8px; font-weight: 800; font-size: 1rem; }
-        table.matrix td { padding: 12px; text-align: center; border-radius: 8px; box-shadow: inset 0 0 0 1px rgba(0,0,0,0.05); width: 80px; }
-        .m-val { font-size: 1.3rem; font-weight: 800; color: #111; display: block; margin-bottom: 2px; }
-        .m-pct { font-size: 0.8rem; color: #555; font-weight: 600; }
+            .matrix-title { font-weight: 800; color: #db5049; font-size: 1.4rem; margin-bottom: 20px; text-align: center; }
+            table.matrix { border-collapse: separate; border-spacing: 6px; margin: 0 auto; }
+            table.matrix th, table.matrix td { border: none; }
+            table.matrix th { padding: 8px; font-weight: 800; font-size: 1rem; }
+            table.matrix td { padding: 12px; text-align: center; border-radius: 8px; box-shadow: inset 0 0 0 1px rgba(0,0,0,0.05); width: 80px; }
+            .m-val { font-size: 1.3rem; font-weight: 800; color: #111; display: block; margin-bottom: 2px; }
+            .m-pct { font-size: 0.8rem; color: #555; font-weight: 600; }
         
-        /* Headers formatting */
-        .th-time { color: #db5049; border-bottom: 2px solid #db5049; }
-        .th-m { color: #221e8f; text-align: center; }
-        .th-t { color: #696761; text-align: center; }
-        .th-s { color: #8a005c; text-align: center; }
-        .th-geo { color: #db5049; border-right: 2px solid #db5049; vertical-align: middle; padding-right: 12px; text-align: center; }
-        .geo-text { writing-mode: vertical-rl; transform: rotate(180deg); letter-spacing: 1px; display: inline-block; margin-right: 5px; }
-        .th-row-m { color: #221e8f; text-align: right; padding-right: 10px; }
-        .th-row-t { color: #696761; text-align: right; padding-right: 10px; }
-        .th-row-s { color: #8a005c; text-align: right; padding-right: 10px; }
-    </style>
-    """
+            /* Headers formatting */
+            .th-time { color: #db5049; border-bottom: 2px solid #db5049; }
+            .th-m { color: #221e8f; text-align: center; }
+            .th-t { color: #696761; text-align: center; }
+            .th-s { color: #8a005c; text-align: center; }
+            .th-geo { color: #db5049; border-right: 2px solid #db5049; vertical-align: middle; padding-right: 12px; text-align: center; }
+            .geo-text { writing-mode: vertical-rl; transform: rotate(180deg); letter-spacing: 1px; display: inline-block; margin-right: 5px; }
+            .th-row-m { color: #221e8f; text-align: right; padding-right: 10px; }
+            .th-row-t { color: #696761; text-align: right; padding-right: 10px; }
+            .th-row-s { color: #8a005c; text-align: right; padding-right: 10px; }
+        </style>
+        """
 
-    matrix_html_table = f"""
-    <table class="matrix">
-        <tr>
-            <td colspan="2" rowspan="2" style="background:transparent; box-shadow:none;"></td>
-            <th colspan="3" class="th-time">Time Result</th>
-        </tr>
-        <tr>
-            <th class="th-m">Michael</th>
-            <th class="th-t">Tie</th>
-            <th class="th-s">Sarah</th>
-        </tr>
-        <tr>
-            <th rowspan="3" class="th-geo">
-                <span class="geo-text">Geography</span>
-            </th>
-            <th class="th-row-m">Michael</th>
-            {format_cell(matrix['M_geo']['M_time'])}
-            {format_cell(matrix['M_geo']['T_time'])}
-            {format_cell(matrix['M_geo']['S_time'])}
-        </tr>
-        <tr>
-            <th class="th-row-t">Tie</th>
-            {format_cell(matrix['T_geo']['M_time'])}
-            {format_cell(matrix['T_geo']['T_time'])}
-            {format_cell(matrix['T_geo']['S_time'])}
-        </tr>
-        <tr>
-            <th class="th-row-s">Sarah</th>
-            {format_cell(matrix['S_geo']['M_time'])}
-            {format_cell(matrix['S_geo']['T_time'])}
-            {format_cell(matrix['S_geo']['S_time'])}
-        </tr>
-    </table>
-    """
+        matrix_html_table = f"""
+        <table class="matrix">
+            <tr>
+                <td colspan="2" rowspan="2" style="background:transparent; box-shadow:none;"></td>
+                <th colspan="3" class="th-time">Time Result</th>
+            </tr>
+            <tr>
+                <th class="th-m">Michael</th>
+                <th class="th-t">Tie</th>
+                <th class="th-s">Sarah</th>
+            </tr>
+            <tr>
+                <th rowspan="3" class="th-geo">
+                    <span class="geo-text">Geography</span>
+                </th>
+                <th class="th-row-m">Michael</th>
+                {format_cell(matrix['M_geo']['M_time'])}
+                {format_cell(matrix['M_geo']['T_time'])}
+                {format_cell(matrix['M_geo']['S_time'])}
+            </tr>
+            <tr>
+                <th class="th-row-t">Tie</th>
+                {format_cell(matrix['T_geo']['M_time'])}
+                {format_cell(matrix['T_geo']['T_time'])}
+                {format_cell(matrix['T_geo']['S_time'])}
+            </tr>
+            <tr>
+                <th class="th-row-s">Sarah</th>
+                {format_cell(matrix['S_geo']['M_time'])}
+                {format_cell(matrix['S_geo']['T_time'])}
+                {format_cell(matrix['S_geo']['S_time'])}
+            </tr>
+        </table>
+        """
 
-    top_banner_html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-    {top_css}
-    </head>
-    <body>
-        <div class="top-container">
-            <div class="stats-wrapper">
-                {generate_stats_card("Michael", "#dde5eb", "#221e8f")}
-                {generate_stats_card("Sarah", "#edd3df", "#8a005c")}
-            </div>
-            <div class="matrix-wrapper">
-                {matrix_html_table}
+        top_banner_html = f"""
+        <!DOCTYPE html>
+        <html>
+        <head>
+        {top_css}
+        </head>
+        <body>
+            <div class="top-container">
+                <div class="stats-wrapper">
+                    {generate_stats_card("Michael", "#dde5eb", "#221e8f")}
+                    {generate_stats_card("Sarah", "#edd3df", "#8a005c")}
+                </div>
+                <div class="matrix-wrapper">
+                    {matrix_html_table}
+                </div>
             </div>
-        </div>
-    </body>
-    </html>
-    """
+        </body>
+        </html>
+        """
+        return top_banner_html
 
     # Injecting the insulated top banner with fixed height
-    components_html(top_banner_html, height=420, scrolling=False)
+    components_html(cached_html("rounds_top_banner", filter_key, lambda: build_top_banner(df)), height=420, scrolling=False)
     st.markdown("<hr style='margin-top: 5px; margin-bottom: 25px;'>", unsafe_allow_html=True)
 
     # 3. Build the Merged Single-Scroll View
@@ -517,7 +512,7 @@ if df is not None and not df.empty:
     </style>
     """
 
-    def build_combined_view(df):
+    def build_combined_view(df, days, location_counts):
         html = f"""
         <div class="tg-outer-container">
             <div class="tg-static-header">
@@ -527,12 +522,8 @@ if df is not None and not df.empty:
             <div class="tg-scrollable-content">
         """
         
-        player_df = df.sort_values(by=["Timeguessr Day", "Timeguessr Round"], ascending=[False, True])
-        
-        location_counts = Counter()
-        for _, row in player_df.iterrows():
-            location_counts[get_base_location_name(row)] += 1
-            
+        player_df = df[df["Timeguessr Day"].isin(days)].sort_values(
+            by=["Timeguessr Day", "Timeguessr Round"], ascending=[False, True])
         current_day = None
         
         for _, row in player_df.iterrows():
@@ -554,7 +545,7 @@ if df is not None and not df.empty:
             country = str(row.get("Country", "")).strip()
             year = row.get("Year")
             
-            base_loc = get_base_location_name(row)
+            base_loc = row["_Base_Location"]
             if location_counts[base_loc] >= 5:
                 city = str(row.get("City", "")).strip()
                 subdivision = str(row.get("Subdivision", "")).strip()
@@ -661,7 +652,19 @@ if df is not None and not df.empty:
         """
         return html
 
-    components_html(css_template + build_combined_view(df), height=viewport_height, scrolling=False)
+    # Only one page of days is rendered; location counts still cover the whole selection
+    all_days = np.sort(df["Timeguessr Day"].unique())[::-1]
+    n_pages = -(-len(all_days) // ROUNDS_PAGE_DAYS)
+    page = 1
+    if n_pages > 1:
+        page = st.number_input(f"Page (of {n_pages}, {ROUNDS_PAGE_DAYS} days each, newest first):",
+                               min_value=1, max_value=n_pages, value=1, step=1)
+    page_days = all_days[(page - 1) * ROUNDS_PAGE_DAYS:page * ROUNDS_PAGE_DAYS]
+    location_counts = df["_Base_Location"].value_counts().to_dict()
+
+    components_html(css_template + cached_html("rounds_combined_view", filter_key + (page,),
+                                               lambda: build_combined_view(df, page_days, location_counts)),
+                    height=viewport_height, scrolling=False)
 
 else:
     st.error("No data found or empty file. Please ensure './Data/Timeguessr_Stats.csv' exists and has valid rows.")
\ No newline at end of file
@@ -1,4 +1,3 @@
-import os
 import streamlit as st
 import pandas as pd
 from PIL import Image
@@ -6,6 +5,8 @@ from PIL import Image
 # --- Configuration ---
 st.set_page_config(page_title="Awards", layout="wide")
 from background import set_random_sarah_background
+from data_service import get_imputed_stats, get_mutual_dates, stats_version
+from disk_cache import disk_cached
 set_random_sarah_background(lightness_level=0.7)
 
 # --- Load Global CSS ---
@@ -221,33 +222,21 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+AWARDS_CACHE_VERSION = 1  # bump when calculate_trophies/calculate_shame output changes
+
 # --- Helper Functions ---
 @st.cache_data
 def load_data(mtime=0):
     try:
-        df = pd.read_csv("./Data/Timeguessr_Stats.csv")
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-        
-        # Helper to clean numeric columns
-        def clean_col(col_name):
-            if col_name in df.columns:
-                return pd.to_numeric(df[col_name], errors='coerce').fillna(0)
-            return pd.Series(0, index=df.index)
-
-        # Totals
-        df['Michael Total Score'] = clean_col('Michael Total Score')
-        df['Sarah Total Score'] = clean_col('Sarah Total Score')
-        
-        # Component Scores (Min/Max)
-        df['Michael Geography Score (Min)'] = clean_col('Michael Geography Score (Min)')
-        df['Michael Geography Score (Max)'] = clean_col('Michael Geography Score (Max)')
-        df['Sarah Geography Score (Min)'] = clean_col('Sarah Geography Score (Min)')
-        df['Sarah Geography Score (Max)'] = clean_col('Sarah Geography Score (Max)')
-        
-        df['Michael Time Score (Min)'] = clean_col('Michael Time Score (Min)')
-        df['Michael Time Score (Max)'] = clean_col('Michael Time Score (Max)')
-        df['Sarah Time Score (Min)'] = clean_col('Sarah Time Score (Min)')
-        df['Sarah Time Score (Max)'] = clean_col('Sarah Time Score (Max)')
+        df = get_imputed_stats().copy()
+        df['Michael Total Score'] = df['Michael Total Score'].fillna(0)
+        df['Sarah Total Score'] = df['Sarah Total Score'].fillna(0)
+
+        # Per-round component scores (exact where known, min/max midpoint otherwise)
+        df['M_Geo_Row'] = df['Michael Geography Score'].fillna(0)
+        df['S_Geo_Row'] = df['Sarah Geography Score'].fillna(0)
+        df['M_Time_Row'] = df['Michael Time Score'].fillna(0)
+        df['S_Time_Row'] = df['Sarah Time Score'].fillna(0)
 
         return df
     except Exception as e:
@@ -480,21 +469,11 @@ def calculate_trophies(df):
     current_month = current_now.to_period('M')
 
     # --- Step 1: Identify Valid Dates (Mutual Participation) ---
-    daily_check = df.groupby('Date')[['Michael Total Score', 'Sarah Total Score']].first()
-    valid_dates = daily_check[
-        (daily_check['Michael Total Score'] > 0) & 
-        (daily_check['Sarah Total Score'] > 0)
-    ].index
-
-    df_valid = df[df['Date'].isin(valid_dates)].copy()
+    df_valid = df[df['Date'].isin(get_mutual_dates())].copy()
     if df_valid.empty:
         return [], [], [], [], [], []
 
     # --- Step 2: Calculate Row-Level & Daily Stats (Base Data) ---
-    df_valid['M_Geo_Row'] = (df_valid['Michael Geography Score (Min)'] + df_valid['Michael Geography Score (Max)']) / 2
-    df_valid['S_Geo_Row'] = (df_valid['Sarah Geography Score (Min)'] + df_valid['Sarah Geography Score (Max)']) / 2
-    df_valid['M_Time_Row'] = (df_valid['Michael Time Score (Min)'] + df_valid['Michael Time Score (Max)']) / 2
-    df_valid['S_Time_Row'] = (df_valid['Sarah Time Score (Min)'] + df_valid['Sarah Time Score (Max)']) / 2
 
     # Calculate Perfect Rounds at Row Level
     df_valid['M_Geo_Perf'] = (df_valid['M_Geo_Row'] == 5000).astype(int)
@@ -658,6 +637,12 @@ def calculate_trophies(df):
 
     return yearly_m, quarterly_m, monthly_m, yearly_s, quarterly_s, monthly_s
 
+def load_awards(df, mode):
+    """`calculate_trophies` ('fame') or `calculate_shame` ('shame') of `df`, kept on disk.
+    Trophies only depend on the stats and, through "ongoing" periods, the current month."""
+    calculate = calculate_trophies if mode == 'fame' else calculate_shame
+    return disk_cached(f"awards_{mode}", AWARDS_CACHE_VERSION, (str(pd.Timestamp.now().to_period('M')),), lambda: calculate(df))
+
 def create_trophy_html(icon, title, desc, is_tie=False, is_gold=False, is_yearly=False, is_ongoing=False):
     tie_class = " tie" if is_tie else ""
     gold_class = " gold-rim" if is_gold else ""
@@ -843,16 +828,10 @@ def calculate_shame(df):
     current_quarter = current_now.to_period('Q')
     current_month = current_now.to_period('M')
 
-    daily_check = df.groupby('Date')[['Michael Total Score', 'Sarah Total Score']].first()
-    valid_dates = daily_check[(daily_check['Michael Total Score'] > 0) & (daily_check['Sarah Total Score'] > 0)].index
-    df_valid = df[df['Date'].isin(valid_dates)].copy()
+    df_valid = df[df['Date'].isin(get_mutual_dates())].copy()
     if df_valid.empty:
         return [], [], [], [], [], []
 
-    df_valid['M_Geo_Row'] = (df_valid['Michael Geography Score (Min)'] + df_valid['Michael Geography Score (Max)']) / 2
-    df_valid['S_Geo_Row'] = (df_valid['Sarah Geography Score (Min)'] + df_valid['Sarah Geography Score (Max)']) / 2
-    df_valid['M_Time_Row'] = (df_valid['Michael Time Score (Min)'] + df_valid['Michael Time Score (Max)']) / 2
-    df_valid['S_Time_Row'] = (df_valid['Sarah Time Score (Min)'] + df_valid['Sarah Time Score (Max)']) / 2
     df_valid['M_Geo_Fail'] = (df_valid['M_Geo_Row'] < 2500).astype(int)
     df_valid['S_Geo_Fail'] = (df_valid['S_Geo_Row'] < 2500).astype(int)
     df_valid['M_Time_Fail'] = (df_valid['M_Time_Row'] == 0).astype(int)
@@ -944,13 +923,9 @@ with st.sidebar:
 st.title("Awards")
 
 # --- Data Loading & Processing ---
-stats_mtime = os.path.getmtime("./Data/Timeguessr_Stats.csv") if os.path.exists("./Data/Timeguessr_Stats.csv") else 0
-df = load_data(stats_mtime)
+df = load_data(stats_version())
 
-if mode == 'fame':
-    yearly_m, quarterly_m, monthly_m, yearly_s, quarterly_s, monthly_s = calculate_trophies(df)
-else:
-    yearly_m, quarterly_m, monthly_m, yearly_s, quarterly_s, monthly_s = calculate_shame(df)
+yearly_m, quarterly_m, monthly_m, yearly_s, quarterly_s, monthly_s = load_awards(df, mode)
 
 col1, col2 = st.columns(2, gap="large")
 with col1:
@@ -1,9 +1,13 @@
-import math
+import hashlib
+import json
 import os
 import re
 import numpy as np
 import pandas as pd
 
+from block_store import edit_day_block
+from scoring import geo_pattern_range, geo_score
+
 try:
     pd.set_option("future.infer_string", False)
 except Exception:
@@ -13,18 +17,57 @@ MICHAEL_TXT   = "Data/TimeGuessr_Michael.txt"
 SARAH_TXT     = "Data/TimeGuessr_Sarah.txt"
 ACTUALS_TXT   = "Data/TimeGuessr_Actuals.txt"
 AVERAGES_TXT  = "Data/TimeGuessr_Averages.txt"
-STATS_CSV     = "Data/Timeguessr_Stats.csv"
-
 
-def _needs_update():
-    if not os.path.exists(STATS_CSV):
-        return True
-    stats_mtime = os.path.getmtime(STATS_CSV)
-    return any(
-        os.path.getmtime(p) > stats_mtime
-        for p in (MICHAEL_TXT, SARAH_TXT, ACTUALS_TXT, AVERAGES_TXT)
-        if os.path.exists(p)
-    )
+MICHAEL_PARSED_CSV  = "Data/Timeguessr_Michael_Parsed.csv"
+SARAH_PARSED_CSV    = "Data/Timeguessr_Sarah_Parsed.csv"
+ACTUALS_PARSED_CSV  = "Data/Timeguessr_Actuals_Parsed.csv"
+AVERAGES_PARSED_CSV = "Data/Timeguessr_Averages_Parsed.csv"
+PARSE_STATE_JSON    = "Data/Timeguessr_Parse_State.json"
+
+_PARSE_STATE_VERSION = 1
+_BLOCK_HEADER_RE = re.compile(r"^TimeGuessr #(\d+)")
+
+
+_DISTANCE_NUM_RE = re.compile(r"([\d.,]+)")
+_DISTANCE_UNITS = (("km", 1000), ("mi", 1609.344), ("ft", 0.3048), ("m", 1))
+
+# --- Share-text tokenizer ---
+# A day block is a header line plus its round lines, in one of four formats
+# classified from the first round line. Runs of canonical blocks (header and
+# five well-formed round lines) are matched with one block pattern each over
+# the joined text; any other block falls back to line-by-line matching. Both
+# paths produce the same per-round groups.
+_PATTERN = r"[🟩🟨⬛️]*"
+_WS = r"[^\S\n]"            # \s that can't cross into the next line
+_EOL = r"(?:\n|\Z)"
+
+_USER_HEADER_RE    = re.compile(r"TimeGuessr #(\d+)\s+[—-]?\s*([\d,]+)/50,000")
+_KEYCAP_RE         = re.compile(r"[1-5]️⃣")
+_KEYCAP_ROUND_RE   = re.compile(r"🏆(\d+)\s*-\s*📅(\d+)y\s*-\s*🌍([\d.]+)\s*(\w+)")
+_DETAILED_ROUND_RE = re.compile(
+    rf"🌎({_PATTERN})\s*📅({_PATTERN})\s+(?:([^,]+),\s*)?(\d{{3,4}}),\s*([\d.]+)\s*(\w+)\.\s*Year:\s*(\d+)\.\s*Location:\s*(\d+)"
+)
+_SIMPLE_CHECK_RE   = re.compile(r"\d{3,4},\s*[\d.]+\s*\w+")
+_SIMPLE_ROUND_RE   = re.compile(rf"🌎({_PATTERN})\s*📅({_PATTERN})\s+(?:([^,]+),\s*)?(\d{{3,4}}),\s*([\d.]+)\s*(\w+)")
+_PATTERN_ROUND_RE  = re.compile(rf"🌎({_PATTERN})\s+📅({_PATTERN})")
+
+# Canonical round lines, strict enough that the first one also implies the
+# block's classification (see `_classify_user_block`).
+_BLOCK_HEADER = rf"TimeGuessr #(\d+){_WS}+[—-]?{_WS}*([\d,]+)/50,000[^\n]*{_EOL}"
+_BLOCK_LINES = {
+    "patterns": rf"🌎({_PATTERN}) 📅({_PATTERN}){_EOL}",
+    "keycap":   rf"[1-5]️⃣[^🏆\n]*🏆(\d+){_WS}*-{_WS}*📅(\d+)y{_WS}*-{_WS}*🌍([\d.]+){_WS}*(\w+)[^\n]*{_EOL}",
+    "detailed": (rf"(?![^\n]*🏆)🌎({_PATTERN}){_WS}*📅({_PATTERN}){_WS}+(?:([^,\n]+),{_WS}*)?(\d{{3,4}}),{_WS}*"
+                 rf"([\d.]+){_WS}*(\w+)\.{_WS}*Year:{_WS}*(\d+)\.{_WS}*Location:{_WS}*(\d+)[^\n]*{_EOL}"),
+    "simple":   (rf"(?![^\n]*(?:🏆|Year:))🌎({_PATTERN}){_WS}*📅({_PATTERN}){_WS}+(?:([^,\n]+),{_WS}*)?"
+                 rf"(\d{{3,4}}),{_WS}*([\d.]+){_WS}*(\w+)[^\n]*{_EOL}"),
+}
+_BLOCK_RES = {fmt: re.compile(_BLOCK_HEADER + line * 5) for fmt, line in _BLOCK_LINES.items()}
+
+_PATTERN_TRANSLATION = str.maketrans({
+    "🟩": "O", "🟨": "%", "⬛": "X",
+    "️": None, "‍": None, "ï": None, "¸": None, "⃣": None,
+})
 
 
 def _parse_distance_to_meters(value):
@@ -35,232 +78,208 @@ def _parse_distance_to_meters(value):
     if not isinstance(value, str):
         return np.nan
     v = value.strip().lower()
-    m = re.search(r"([\d.,]+)", v)
+    m = _DISTANCE_NUM_RE.search(v)
     if not m:
         return np.nan
     try:
         num = float(m.group(1).replace(",", ""))
     except Exception:
         return np.nan
-    if "km" in v:
-        return num * 1000
-    if "mi" in v:
-        return num * 1609.344
-    if "ft" in v:
-        return num * 0.3048
-    if "m" in v:
-        return num
+    for unit, factor in _DISTANCE_UNITS:
+        if unit in v:
+            return num * factor
     return np.nan
 
 
-def parse_user_blocks(lines, user):
-    user_data = []
-    i = 0
+def _format_distance(value):
+    """`value` as plain digits (no exponent, no separators) that the round
+    regexes read back as the same float."""
+    return np.format_float_positional(float(value), trim="-")
 
-    while i < len(lines):
+
+def _float_or_nan(value):
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def _distances_to_meters(values, units):
+    """Vector form of `_parse_distance_to_meters` for distances already
+    split into number and unit strings."""
+    factors = {u: next((f for unit, f in _DISTANCE_UNITS if unit in u.lower()), np.nan) for u in set(units)}
+    try:
+        nums = values.astype(np.float64)
+    except ValueError:  # e.g. "1.2.3"; convert one by one, NaN where invalid
+        nums = np.array([_float_or_nan(v) for v in values], dtype=np.float64)
+    return nums * np.array([factors[u] for u in units], dtype=np.float64)
+
+
+def _classify_user_block(line):
+    """Share-text format of a day block, judged from its first line after
+    the header: "keycap", "detailed", "simple", "patterns" or None."""
+    if "🏆" in line and _KEYCAP_RE.search(line):
+        return "keycap"
+    if "Year:" in line and "Location:" in line:
+        return "detailed"
+    if line.startswith("🌎"):
+        if "Year:" not in line and _SIMPLE_CHECK_RE.search(line):
+            return "simple"
+        return "patterns"
+    return None
+
+
+def _iter_user_blocks(lines):
+    """Yield `(fmt, n_rounds, blocks)` over share-text `lines`, in file
+    order. `blocks` lists one tuple per day block of that format and round
+    count: day, total score, then each round's match groups in turn."""
+    text = "\n".join(lines)
+    n = len(lines)
+    i = pos = 0
+    while i < n:
         line = lines[i]
+        if not line.startswith("TimeGuessr"):
+            pos += len(line) + 1
+            i += 1
+            continue
 
-        if line.startswith("TimeGuessr"):
-            m = re.search(r"TimeGuessr #(\d+)\s+[—-]?\s*([\d,]+)/50,000", line)
-            if m:
-                day = int(m.group(1))
-                total_score = int(m.group(2).replace(",", ""))
-                rounds = []
-                j = i + 1
-
-                # CASE 1: Emoji keycap rounds (1️⃣ … 5️⃣ …)
-                if j < len(lines) and re.search(r"[1-5]️⃣", lines[j]) and "🏆" in lines[j]:
-                    rounds_found = 0
-                    k = j
-                    while k < len(lines) and rounds_found < 5:
-                        line_text = lines[k]
-                        if re.search(r"[1-5]️⃣", line_text) and "🏆" in line_text:
-                            match = re.search(
-                                r"🏆(\d+)\s*-\s*📅(\d+)y\s*-\s*🌍([\d.]+\s*\w+)",
-                                line_text
-                            )
-                            if match:
-                                rounds.append({
-                                    "Round Score": int(match.group(1)),
-                                    "Time Distance": int(match.group(2)),
-                                    "Geography Distance": match.group(3).strip(),
-                                    "Time Guessed": np.nan,
-                                    "Time Score": np.nan,
-                                    "Geography Score": np.nan,
-                                    "Geography": np.nan,
-                                    "Time": np.nan,
-                                })
-                                rounds_found += 1
-                        k += 1
-                    i = k
-
-                # CASE 2: Detailed format with scores (Year: X. Location: Y)
-                elif j < len(lines) and "Year:" in lines[j] and "Location:" in lines[j]:
-                    for k in range(j, j + 5):
-                        if k >= len(lines):
-                            break
-                        detailed_match = re.search(
-                            r"🌎([🟩🟨⬛️]*)\s*📅([🟩🟨⬛️]*)\s+(?:([^,]+),\s*)?(\d{3,4}),\s*([\d.]+\s*\w+)\.\s*Year:\s*(\d+)\.\s*Location:\s*(\d+)",
-                            lines[k]
-                        )
-                        if detailed_match:
-                            time_score = int(detailed_match.group(6))
-                            geography_score = int(detailed_match.group(7))
-                            rounds.append({
-                                "Round Score": time_score + geography_score,
-                                "Geography Distance": detailed_match.group(5).strip(),
-                                "Time Distance": np.nan,
-                                "Time Guessed": int(detailed_match.group(4)),
-                                "Time Score": time_score,
-                                "Geography Score": geography_score,
-                                "Geography": detailed_match.group(1),
-                                "Time": detailed_match.group(2),
-                            })
-                    i += 6
-
-                # CASE 3: Ultra-simplified format (year, distance only — no scores)
-                elif j < len(lines) and lines[j].startswith("🌎"):
-                    test_line = lines[j]
-                    # Modified to check for any word characters (\w+) instead of just k?m
-                    if re.search(r"\d{3,4},\s*[\d.]+\s*\w+", test_line) and "Year:" not in test_line:
-                        for k in range(j, j + 5):
-                            if k >= len(lines):
-                                break
-                            simple_match = re.search(
-                                r"🌎([🟩🟨⬛️]*)\s*📅([🟩🟨⬛️]*)\s+(?:([^,]+),\s*)?(\d{3,4}),\s*([\d.]+)\s*(\w+)",
-                                lines[k]
-                            )
-                            if simple_match:
-                                rounds.append({
-                                    "Round Score": np.nan,
-                                    "Geography Distance": f"{simple_match.group(5)} {simple_match.group(6)}",
-                                    "Time Distance": np.nan,
-                                    "Time Guessed": int(simple_match.group(4)),
-                                    "Time Score": np.nan,
-                                    "Geography Score": np.nan,
-                                    "Geography": simple_match.group(1),
-                                    "Time": simple_match.group(2),
-                                })
-                            else:
-                                print(f"Failed to match line {k}: {lines[k]}")
-                        i += 6
-                    else:
-                        for k in range(i + 1, i + 6):
-                            if k < len(lines) and lines[k].startswith("🌎"):
-                                r = re.search(r"🌎([🟩🟨⬛️]*)\s+📅([🟩🟨⬛️]*)", lines[k])
-                                if r:
-                                    rounds.append({
-                                        "Round Score": np.nan,
-                                        "Geography": r.group(1),
-                                        "Geography Distance": np.nan,
-                                        "Time": r.group(2),
-                                        "Time Distance": np.nan,
-                                        "Time Guessed": np.nan,
-                                        "Time Score": np.nan,
-                                        "Geography Score": np.nan,
-                                    })
-                        i += 6
-
-                for rnum, rd in enumerate(rounds, start=1):
-                    user_data.append({
-                        "Timeguessr Day": day,
-                        "Timeguessr Round": rnum,
-                        "Total Score": total_score,
-                        "Round Score": rd.get("Round Score", np.nan),
-                        "Geography": rd.get("Geography", np.nan),
-                        "Geography Distance": rd.get("Geography Distance", np.nan),
-                        "Time": rd.get("Time", np.nan),
-                        "Time Distance": rd.get("Time Distance", np.nan),
-                        "Time Guessed": rd.get("Time Guessed", np.nan),
-                        "Time Score": rd.get("Time Score", np.nan),
-                        "Geography Score": rd.get("Geography Score", np.nan),
-                    })
-            else:
-                i += 1
+        fmt = _classify_user_block(lines[i + 1]) if i + 1 < n else None
+        block_re = _BLOCK_RES.get(fmt)
+        m = block_re.match(text, pos) if block_re else None
+        if m:
+            run = []
+            while m:
+                run.append(m.groups())
+                pos = m.end()
+                m = block_re.match(text, pos)
+            i += 6 * len(run)
+            yield fmt, 5, run
         else:
-            i += 1
+            start = i
+            i, fmt, block, rnum = _parse_user_block_lines(lines, i)
+            pos += sum(map(len, lines[start:i])) + (min(i, n) - start)
+            if fmt is not None:
+                yield fmt, rnum, [block]
+
+
+def _parse_user_block_lines(lines, i):
+    """Line-by-line fallback for the block whose header is `lines[i]`.
+    Returns the next line index, the block's format (None if `lines[i]`
+    isn't a usable header), its group tuple and its round count."""
+    m = _USER_HEADER_RE.search(lines[i])
+    n = len(lines)
+    j = i + 1
+    fmt = _classify_user_block(lines[j]) if m and j < n else None
+    if fmt is None:
+        return i + 1, None, None, 0
+
+    groups, rnum = [m.group(1), m.group(2)], 0
+    if fmt == "keycap":
+        k = j
+        while k < n and rnum < 5:
+            text = lines[k]
+            if "🏆" in text and _KEYCAP_RE.search(text):
+                r = _KEYCAP_ROUND_RE.search(text)
+                if r:
+                    rnum += 1
+                    groups.extend(r.groups())
+            k += 1
+        return k, fmt, tuple(groups), rnum
+
+    for k in range(j, min(j + 5, n)):
+        if fmt == "patterns":
+            r = _PATTERN_ROUND_RE.search(lines[k]) if lines[k].startswith("🌎") else None
+        elif fmt == "detailed":
+            r = _DETAILED_ROUND_RE.search(lines[k])
+        else:
+            r = _SIMPLE_ROUND_RE.search(lines[k])
+            if not r:
+                print(f"Failed to match line {k}: {lines[k]}")
+        if r:
+            rnum += 1
+            groups.extend(r.groups())
+    return i + 6, fmt, tuple(groups), rnum
+
+
+def _user_round_columns(fmt, n, blocks):
+    """Columnar arrays, one row per round, for blocks from `_iter_user_blocks`."""
+    b = np.array(blocks, dtype=object).reshape(len(blocks), -1)
+    r = b[:, 2:].reshape(len(blocks) * n, -1)
+    nan = np.full(len(r), np.nan)
+    blank = np.full(len(r), "", dtype=object)
+    cols = {
+        "Timeguessr Day":   np.repeat(b[:, 0].astype(np.int64), n),
+        "Timeguessr Round": np.tile(np.arange(1, n + 1, dtype=np.int64), len(blocks)),
+        "Total Score":      np.repeat(np.array([int(t.replace(",", "")) for t in b[:, 1]], dtype=np.int64), n),
+    }
+    if fmt == "keycap":
+        cols.update({"Round Score": r[:, 0].astype(np.float64), "Geography": blank,
+                     "Geography Distance": _distances_to_meters(r[:, 2], r[:, 3]), "Time": blank,
+                     "Time Distance": r[:, 1].astype(np.float64), "Time Guessed": nan,
+                     "Time Score": nan, "Geography Score": nan})
+    elif fmt == "detailed":
+        t_score, g_score = r[:, 6].astype(np.float64), r[:, 7].astype(np.float64)
+        cols.update({"Round Score": t_score + g_score, "Geography": r[:, 0],
+                     "Geography Distance": _distances_to_meters(r[:, 4], r[:, 5]), "Time": r[:, 1],
+                     "Time Distance": nan, "Time Guessed": r[:, 3].astype(np.float64),
+                     "Time Score": t_score, "Geography Score": g_score})
+    elif fmt == "simple":
+        cols.update({"Round Score": nan, "Geography": r[:, 0],
+                     "Geography Distance": _distances_to_meters(r[:, 4], r[:, 5]), "Time": r[:, 1],
+                     "Time Distance": nan, "Time Guessed": r[:, 3].astype(np.float64),
+                     "Time Score": nan, "Geography Score": nan})
+    else:
+        cols.update({"Round Score": nan, "Geography": r[:, 0],
+                     "Geography Distance": nan, "Time": r[:, 1],
+                     "Time Distance": nan, "Time Guessed": nan,
+                     "Time Score": nan, "Geography Score": nan})
+    return cols
 
-    _STRIP_CHARS = ('️', '‍', 'ï', '¸', '⃣')
 
-    for _rd in user_data:
-        for _field in ("Geography", "Time"):
-            _v = _rd.get(_field)
-            if _v is None or (isinstance(_v, float) and _v != _v):
-                _rd[_field] = ''
-            else:
-                _s = str(_v).replace("🟩", "O").replace("🟨", "%").replace("⬛", "X")
-                for _ch in _STRIP_CHARS:
-                    _s = _s.replace(_ch, '')
-                _rd[_field] = _s.strip()
-
-        _rd["Geography Distance"] = _parse_distance_to_meters(_rd.get("Geography Distance"))
-
-    _cols = [
-        "Timeguessr Day", "Timeguessr Round", "Total Score", "Round Score",
-        "Geography", "Geography Distance", "Time", "Time Distance",
-        "Time Guessed", "Time Score", "Geography Score",
-    ]
-    _float_cols = {"Round Score", "Geography Distance", "Time Distance",
-                   "Time Guessed", "Time Score", "Geography Score"}
-    _int_cols   = {"Timeguessr Day", "Timeguessr Round", "Total Score"}
-    _str_cols   = {"Geography", "Time"}
-    _col_data   = {c: [_rd.get(c, np.nan) for _rd in user_data] for c in _cols}
-    df_user = pd.DataFrame({
-        c: (np.array(_col_data[c], dtype=object) if c in _str_cols else
-            np.array(_col_data[c], dtype=np.float64) if c in _float_cols else
-            np.array(_col_data[c], dtype=np.int64))
-        for c in _cols
-    })
+_USER_COLS = [
+    "Timeguessr Day", "Timeguessr Round", "Total Score", "Round Score",
+    "Geography", "Geography Distance", "Time", "Time Distance",
+    "Time Guessed", "Time Score", "Geography Score",
+]
+_USER_DTYPES = {"Timeguessr Day": np.int64, "Timeguessr Round": np.int64, "Total Score": np.int64,
+                "Geography": object, "Time": object}
 
-    mask = df_user["Geography Score"].isna() & (df_user["Geography"] == "OOO")
-    df_user.loc[mask, "Geography Score"] = 5000
-
-    mask = df_user["Geography Score"].isna() & df_user["Geography Distance"].notna()
-    dist = df_user.loc[mask, "Geography Distance"]
-    conditions = [
-        (dist <= 50),
-        (dist > 50) & (dist <= 1000),
-        (dist > 1000) & (dist <= 5000),
-        (dist > 5000) & (dist <= 100000),
-        (dist > 100000) & (dist <= 1000000),
-        (dist > 1000000) & (dist <= 2000000),
-        (dist > 2000000) & (dist <= 3000000),
-        (dist > 3000000) & (dist <= 6000000),
-        (dist > 6000000),
-    ]
-    scores = [
-        5000,
-        5000 - (dist * 0.02),
-        4980 - (dist * 0.016),
-        4900 - (dist * 0.004),
-        4500 - (dist * 0.001),
-        3500 - (dist * 0.0005),
-        2500 - (dist * 0.0003333),
-        1500 - (dist * 0.0002),
-        12,
-    ]
-    df_user.loc[mask, "Geography Score"] = np.select(conditions, scores, default=np.nan)
-    df_user["Geography Score"] = df_user["Geography Score"].clip(lower=12)
-
-    if "Geography Score" in df_user.columns:
-        df_user["Geography Score (Min)"] = np.nan
-        df_user["Geography Score (Max)"] = np.nan
-        mask = df_user["Geography Score"].notna()
-        df_user.loc[mask, "Geography Score (Min)"] = df_user.loc[mask, "Geography Score"]
-        df_user.loc[mask, "Geography Score (Max)"] = df_user.loc[mask, "Geography Score"]
-
-        if "Geography" in df_user.columns:
-            for pattern, lo, hi in [
-                ("OO%", 4750, 4999),
-                ("OOX", 4500, 4749),
-                ("O%X", 4250, 4499),
-                ("OXX", 3500, 4249),
-                ("%XX", 2500, 3499),
-                ("XXX", 12,   2499),
-            ]:
-                mask = df_user["Geography Score"].isna() & (df_user["Geography"] == pattern)
-                df_user.loc[mask, "Geography Score (Min)"] = lo
-                df_user.loc[mask, "Geography Score (Max)"] = hi
+
+def parse_user_blocks(lines, user):
+    # Build columns once per (format, round count) group, then restore file order
+    groups = {}
+    for seq, (fmt, n, blocks) in enumerate(_iter_user_blocks(lines)):
+        if n:
+            order, group_blocks = groups.setdefault((fmt, n), ([], []))
+            order.extend([seq] * len(blocks))
+            group_blocks.extend(blocks)
+    chunks = [_user_round_columns(fmt, n, blocks) for (fmt, n), (_, blocks) in groups.items()]
+    cols = {
+        c: np.concatenate([ch[c] for ch in chunks]) if chunks else np.array([], dtype=_USER_DTYPES.get(c, np.float64))
+        for c in _USER_COLS
+    }
+    if chunks:
+        seq = np.concatenate([np.repeat(order, n) for (_, n), (order, _) in groups.items()])
+        idx = np.argsort(seq, kind="stable")
+        cols = {c: v[idx] for c, v in cols.items()}
+    # Translate and look up each distinct pattern once; code -1 (missing) picks the trailing NaN
+    for c in ("Geography", "Time"):
+        codes, raw = pd.factorize(cols[c])
+        patterns = np.array([p.translate(_PATTERN_TRANSLATION).strip() for p in raw] + [np.nan], dtype=object)
+        cols[c] = patterns[codes]
+        if c == "Geography":
+            geo_lo, geo_hi = (np.append(r, np.nan)[codes] for r in geo_pattern_range(patterns[:-1]))
+    df_user = pd.DataFrame(cols)
+
+    df_user["Geography Score"] = (
+        df_user["Geography Score"]
+        .fillna(pd.Series(np.where(geo_lo == geo_hi, geo_lo, np.nan), index=df_user.index))
+        .fillna(pd.Series(geo_score(df_user["Geography Distance"].to_numpy()), index=df_user.index))
+        .clip(lower=12)
+    )
+    known = df_user["Geography Score"].notna()
+    df_user["Geography Score (Min)"] = np.where(known, df_user["Geography Score"], geo_lo)
+    df_user["Geography Score (Max)"] = np.where(known, df_user["Geography Score"], geo_hi)
 
     df_user = df_user.rename(columns={
         "Total Score":              f"{user} Total Score",
@@ -413,45 +432,28 @@ _AVERAGES_BLOCK_LABELS = (
 
 def _update_averages_block(day, updates):
     """Update (or create) the Data/TimeGuessr_Averages.txt block for `day`,
-    setting each `label -> value` in `updates` while leaving every other
-    line in the block untouched."""
+    setting each `label -> value` in `updates` in a single write while
+    leaving every other line in the block untouched."""
     if not updates:
         return
 
-    if os.path.exists(AVERAGES_TXT):
-        with open(AVERAGES_TXT, "r", encoding="utf-8") as f:
-            raw_lines = f.read().splitlines()
-    else:
-        raw_lines = []
-
-    header = f"TimeGuessr #{day}"
-    start = next((idx for idx, line in enumerate(raw_lines) if line.strip() == header), None)
-
-    if start is None:
-        block = [header] + [f"{label} - " for label in _AVERAGES_BLOCK_LABELS]
-        for idx, label in enumerate(_AVERAGES_BLOCK_LABELS, start=1):
-            if label in updates:
-                block[idx] = f"{label} - {updates[label]}"
-        if raw_lines and raw_lines[-1].strip() != "":
-            raw_lines.append("")
-        raw_lines.extend(block)
-        raw_lines.append("")
-    else:
-        end = next(
-            (idx for idx in range(start + 1, len(raw_lines)) if re.match(r"^TimeGuessr #\d+$", raw_lines[idx].strip())),
-            len(raw_lines),
-        )
+    def edit(lines):
+        if lines is None:
+            block = [f"TimeGuessr #{day}"] + [f"{label} - " for label in _AVERAGES_BLOCK_LABELS]
+            for idx, label in enumerate(_AVERAGES_BLOCK_LABELS, start=1):
+                if label in updates:
+                    block[idx] = f"{label} - {updates[label]}"
+            return block
         for label, val in updates.items():
-            for idx in range(start + 1, end):
-                if re.match(rf"^{re.escape(label)}\s*-", raw_lines[idx]):
-                    raw_lines[idx] = f"{label} - {val}"
+            for idx in range(1, len(lines)):
+                if re.match(rf"^{re.escape(label)}\s*-", lines[idx]):
+                    lines[idx] = f"{label} - {val}"
                     break
             else:
-                raw_lines.insert(end, f"{label} - {val}")
-                end += 1
+                lines.append(f"{label} - {val}")
+        return lines
 
-    with open(AVERAGES_TXT, "w", encoding="utf-8") as f:
-        f.write("\n".join(raw_lines).rstrip("\n") + "\n")
+    edit_day_block(AVERAGES_TXT, day, edit)
 
 
 def update_averages_entry(day, player, percentile=None, years=None, location=None):
@@ -491,37 +493,17 @@ def update_community_averages_entry(day, average=None, years_average=None, locat
     _update_averages_block(day, updates)
 
 
-def _replace_txt_block(path, day, new_block_lines, header_regex):
+def _replace_txt_block(path, day, new_block_lines):
     """Replace (or append) the block for `day` in a TimeGuessr raw-text `path`
-    file, where blocks are delimited by lines matching `header_regex` (must
-    capture the day number in group 1) and end at the next blank line or the
-    next header line."""
-    if os.path.exists(path):
-        with open(path, "r", encoding="utf-8") as f:
-            raw_lines = f.read().splitlines()
-    else:
-        raw_lines = []
-
-    start = None
-    for idx, line in enumerate(raw_lines):
-        m = re.match(header_regex, line.strip())
-        if m and int(m.group(1)) == day:
-            start = idx
-            break
-
-    if start is None:
-        if raw_lines and raw_lines[-1].strip() != "":
-            raw_lines.append("")
-        raw_lines.extend(new_block_lines)
-        raw_lines.append("")
-    else:
-        end = start + 1
-        while end < len(raw_lines) and raw_lines[end].strip() != "" and not re.match(header_regex, raw_lines[end].strip()):
-            end += 1
-        raw_lines[start:end] = new_block_lines
+    file. The old block ends at its first blank line; anything between that
+    and the next header is kept."""
+    def edit(lines):
+        if lines is None:
+            return new_block_lines
+        end = next((idx for idx in range(1, len(lines)) if not lines[idx].strip()), len(lines))
+        return new_block_lines + lines[end:]
 
-    with open(path, "w", encoding="utf-8") as f:
-        f.write("\n".join(raw_lines).rstrip("\n") + "\n")
+    edit_day_block(path, day, edit)
 
 
 def update_actuals_txt_entry(day, rounds):
@@ -536,7 +518,7 @@ def update_actuals_txt_entry(day, rounds):
         year = v.get("year")
         city_part = f"{city} ({sub})" if sub else city
         block.append(f"{r}. {city_part}, {country}, {year}")
-    _replace_txt_block(ACTUALS_TXT, day, block, header_regex=r"^TimeGuessr #(\d+)")
+    _replace_txt_block(ACTUALS_TXT, day, block)
 
 
 def update_player_txt_entry(player, day, total_score, rounds):
@@ -545,147 +527,190 @@ def update_player_txt_entry(player, day, total_score, rounds):
     year-guessed + exact distance per round). Scores are always re-derivable
     from these plus the actual answer once merged, so nothing is lost even
     though the actual may not be known yet at submission time.
-    `rounds` is a dict of {round_num(1-5): {'geo_emoji', 'time_emoji', 'year', 'dist_value', 'unit'}}."""
+    `rounds` is a dict of {round_num(1-5): {'geo_emoji', 'time_emoji', 'year', 'dist_value', 'unit'}}.
+    Raises ValueError, leaving the file untouched, if the block wouldn't
+    parse back to the same distances."""
     path = MICHAEL_TXT if player == "Michael" else SARAH_TXT
     block = [f"TimeGuessr #{day} {total_score:,}/50,000"]
     for r in range(1, 6):
         v = rounds.get(r, {})
-        block.append(f"🌎{v.get('geo_emoji', '')} 📅{v.get('time_emoji', '')} {v.get('year')}, {v.get('dist_value'):g} {v.get('unit')}")
-    _replace_txt_block(path, day, block, header_regex=r"^TimeGuessr #(\d+)")
+        block.append(f"🌎{v.get('geo_emoji', '')} 📅{v.get('time_emoji', '')} {v.get('year')}, {_format_distance(v.get('dist_value'))} {v.get('unit')}")
 
+    # The TXT is the only record of the save, so it must read back as exactly what was entered
+    expected = _distances_to_meters(
+        np.array([rounds[r]["dist_value"] for r in range(1, 6)], dtype=np.float64),
+        [rounds[r]["unit"] for r in range(1, 6)],
+    )
+    parsed = parse_user_blocks(block, player)[f"{player} Geography Distance"].to_numpy()
+    if len(parsed) != 5 or not np.array_equal(parsed, expected):
+        raise ValueError(f"TimeGuessr #{day} would not read back from {path}: {block[1:]}")
+    _replace_txt_block(path, day, block)
+
+
+def _split_day_blocks(data, start=0):
+    """Split the raw bytes `data[start:]` of a TimeGuessr TXT file into
+    `(day, byte_offset, lines)` blocks, one per `TimeGuessr #<day>` header.
+    `lines` are the stripped, non-empty lines the parsers expect; anything
+    before the first header belongs to no day and is dropped."""
+    blocks = []
+    offset = start
+    for raw in data[start:].splitlines(keepends=True):
+        line = raw.decode("utf-8").strip()
+        if line:
+            m = _BLOCK_HEADER_RE.match(line)
+            if m:
+                blocks.append((int(m.group(1)), offset, [line]))
+            elif blocks:
+                blocks[-1][2].append(line)
+        offset += len(raw)
+    return blocks
+
+
+def _day_digests(blocks):
+    """Hash every day's block text. A day repeated in the file hashes all of
+    its blocks in file order, so it still maps to a single digest."""
+    hashers = {}
+    for day, _, lines in blocks:
+        hashers.setdefault(day, hashlib.sha1()).update(("\n".join(lines) + "\n\0").encode("utf-8"))
+    return {str(day): h.hexdigest() for day, h in hashers.items()}
+
+
+def _file_fingerprint(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
 
-def run_aggregation():
-    if not _needs_update():
-        return
 
-    with open(MICHAEL_TXT, "r", encoding="utf-8") as f:
-        michael_lines = [line.strip() for line in f if line.strip()]
-    with open(SARAH_TXT, "r", encoding="utf-8") as f:
-        sarah_lines = [line.strip() for line in f if line.strip()]
-    with open(ACTUALS_TXT, "r", encoding="utf-8") as f:
-        actuals_lines = [line.strip() for line in f if line.strip()]
-    if os.path.exists(AVERAGES_TXT):
-        with open(AVERAGES_TXT, "r", encoding="utf-8") as f:
-            averages_lines = [line.strip() for line in f if line.strip()]
+def _load_parse_state():
+    try:
+        with open(PARSE_STATE_JSON, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if state.get("version") != _PARSE_STATE_VERSION:
+        return {}
+    return state.get("files", {})
+
+
+def _save_parse_state(files):
+    tmp = PARSE_STATE_JSON + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": _PARSE_STATE_VERSION, "files": files}, f)
+    os.replace(tmp, PARSE_STATE_JSON)
+
+
+def _incremental_parse(txt_path, csv_path, parse_fn, prev, str_cols=()):
+    """Bring `csv_path` up to date with `txt_path`, re-parsing only the day
+    blocks that were added or edited since `prev` (this file's entry from the
+    parse state) was recorded, and splicing their (Day, Round) rows into the
+    existing parsed frame. Falls back to a full parse whenever the previous
+    state or parsed CSV can't be trusted.
+
+    When the file has only grown since last time (its old contents are an
+    unchanged prefix), only the bytes from the start of the previous last
+    block onward are split and hashed. Otherwise every block is re-hashed,
+    which is cheap next to parsing, and only changed days are parsed.
+
+    Returns `(df, state)` where `state` is the entry to record for next run."""
+    if os.path.exists(txt_path):
+        with open(txt_path, "rb") as f:
+            data = f.read()
+    else:
+        data = b""
+
+    old_df = None
+    if prev and os.path.exists(csv_path) and prev.get("parsed") == _file_fingerprint(csv_path):
+        old_df = pd.read_csv(csv_path)
+        for c in str_cols:
+            old_df[c] = old_df[c].fillna("")
+    old_days = prev.get("days", {}) if old_df is not None else {}
+
+    blocks = None
+    days = None
+    if old_df is not None and prev.get("tail_offset") is not None and len(data) >= prev["size"] \
+            and hashlib.sha1(data[:prev["size"]]).hexdigest() == prev["digest"]:
+        blocks = _split_day_blocks(data, prev["tail_offset"])
+        tail_days = _day_digests(blocks)
+        if all(d not in old_days or d == prev.get("tail_day") for d in tail_days):
+            days = {**old_days, **tail_days}
+            last = blocks[-1] if blocks else None
+            tail_unique = last is None or (
+                sum(1 for b in blocks if b[0] == last[0]) == 1
+                and (str(last[0]) not in old_days or str(last[0]) == prev.get("tail_day"))
+            )
+    if days is None:
+        blocks = _split_day_blocks(data)
+        days = _day_digests(blocks)
+        last = blocks[-1] if blocks else None
+        tail_unique = last is None or sum(1 for b in blocks if b[0] == last[0]) == 1
+
+    changed = {d for d, h in days.items() if old_days.get(d) != h}
+    removed = set(old_days) - set(days)
+    lines = [line for day, _, block_lines in blocks if str(day) in changed for line in block_lines]
+
+    if old_df is None:
+        df = parse_fn(lines)
+    elif changed or removed:
+        stale = {int(d) for d in changed | removed}
+        df = old_df[~old_df["Timeguessr Day"].isin(stale)]
+        if lines:
+            df = pd.concat([df, parse_fn(lines)], ignore_index=True)
     else:
-        averages_lines = []
+        df = old_df
 
-    df_michael = parse_user_blocks(michael_lines, "Michael")
-    df_michael.to_csv("Data/Timeguessr_Michael_Parsed.csv", index=False)
+    if df is not old_df:
+        df = df.sort_values(["Timeguessr Day", "Timeguessr Round"], kind="stable").reset_index(drop=True)
+        df.to_csv(csv_path, index=False)
 
-    df_sarah = parse_user_blocks(sarah_lines, "Sarah")
-    df_sarah.to_csv("Data/Timeguessr_Sarah_Parsed.csv", index=False)
+    state = {
+        "size": len(data),
+        "digest": hashlib.sha1(data).hexdigest(),
+        "tail_offset": (last[1] if last else 0) if tail_unique else None,
+        "tail_day": str(last[0]) if last else None,
+        "days": days,
+        "parsed": _file_fingerprint(csv_path),
+    }
+    return df, state
 
-    df_actuals = parse_actuals(actuals_lines)
-    df_actuals.to_csv("Data/Timeguessr_Actuals_Parsed.csv", index=False)
 
-    df_avg_daily, df_avg_rounds = parse_averages(averages_lines)
+def _parse_averages_frame(lines):
+    df_avg_daily, df_avg_rounds = parse_averages(lines)
     df_avg_parsed = pd.merge(df_avg_rounds, df_avg_daily, on="Timeguessr Day", how="left")
-    df_avg_parsed = df_avg_parsed.sort_values(["Timeguessr Day", "Timeguessr Round"]).reset_index(drop=True)
-    df_avg_parsed.to_csv("Data/Timeguessr_Averages_Parsed.csv", index=False)
-
-    df_all = pd.merge(df_michael, df_sarah, on=["Timeguessr Day", "Timeguessr Round"], how="outer")
-    df_all = pd.merge(df_all, df_actuals, on=["Timeguessr Day", "Timeguessr Round"], how="left")
-    df_all = pd.merge(df_all, df_avg_daily, on="Timeguessr Day", how="left")
-    df_all = pd.merge(df_all, df_avg_rounds, on=["Timeguessr Day", "Timeguessr Round"], how="left")
+    return df_avg_parsed.sort_values(["Timeguessr Day", "Timeguessr Round"]).reset_index(drop=True)
 
-    if "Michael Time Distance" in df_all.columns and "Michael Time Guessed" in df_all.columns:
-        mask = df_all["Michael Time Distance"].isna() & df_all["Michael Time Guessed"].notna() & df_all["Year"].notna()
-        df_all.loc[mask, "Michael Time Distance"] = abs(df_all.loc[mask, "Year"] - df_all.loc[mask, "Michael Time Guessed"])
 
-    if "Sarah Time Distance" in df_all.columns and "Sarah Time Guessed" in df_all.columns:
-        mask = df_all["Sarah Time Distance"].isna() & df_all["Sarah Time Guessed"].notna() & df_all["Year"].notna()
-        df_all.loc[mask, "Sarah Time Distance"] = abs(df_all.loc[mask, "Year"] - df_all.loc[mask, "Sarah Time Guessed"])
+def parse_raw_files(incremental=True):
+    """Bring the parsed CSVs up to date with the raw TXT files and return
+    their frames as a dict: "Michael", "Sarah", "actuals", and the averages
+    split into "averages_daily" (one row per day) and "averages_rounds".
 
-    start_date = pd.Timestamp("2025-03-20")
-    df_all["Date"] = start_date + pd.to_timedelta(df_all["Timeguessr Day"] - df_all["Timeguessr Day"].min(), unit="D")
+    With `incremental` (the default) only the day blocks added or edited
+    since the last run are re-parsed; pass `incremental=False` to force a
+    full re-parse of every file."""
+    prev_state = _load_parse_state() if incremental else {}
+    state = {}
 
-    cols = (
-        ["Date", "Timeguessr Day", "Timeguessr Round", "City", "Subdivision", "Country", "Year"]
-        + [c for c in df_all.columns if c not in ["Date", "Timeguessr Day", "Timeguessr Round", "City", "Subdivision", "Country", "Year"]]
+    df_michael, state[MICHAEL_TXT] = _incremental_parse(
+        MICHAEL_TXT, MICHAEL_PARSED_CSV, lambda lines: parse_user_blocks(lines, "Michael"),
+        prev_state.get(MICHAEL_TXT), str_cols=("Michael Geography", "Michael Time"),
+    )
+    df_sarah, state[SARAH_TXT] = _incremental_parse(
+        SARAH_TXT, SARAH_PARSED_CSV, lambda lines: parse_user_blocks(lines, "Sarah"),
+        prev_state.get(SARAH_TXT), str_cols=("Sarah Geography", "Sarah Time"),
+    )
+    df_actuals, state[ACTUALS_TXT] = _incremental_parse(
+        ACTUALS_TXT, ACTUALS_PARSED_CSV, parse_actuals,
+        prev_state.get(ACTUALS_TXT), str_cols=("Subdivision",),
+    )
+    df_avg_parsed, state[AVERAGES_TXT] = _incremental_parse(
+        AVERAGES_TXT, AVERAGES_PARSED_CSV, _parse_averages_frame,
+        prev_state.get(AVERAGES_TXT),
     )
-    df_all = df_all[cols]
-    df_all = df_all.sort_values(["Timeguessr Day", "Timeguessr Round"]).reset_index(drop=True)
-
-    def calc_time_score(years_off):
-        if years_off is None:
-            return None
-        try:
-            if math.isnan(years_off):
-                return None
-        except (TypeError, ValueError):
-            pass
-        y = float(years_off)
-        if y == 0:   return 5000
-        if y == 1:   return 4950
-        if y == 2:   return 4800
-        if y == 3:   return 4600
-        if y == 4:   return 4300
-        if y == 5:   return 3900
-        if y <= 7:   return 3400
-        if y <= 10:  return 2500
-        if y < 16:   return 2000
-        if y < 21:   return 1000
-        return 0
-
-    for player in ["Michael", "Sarah"]:
-        time_col       = f"{player} Time"
-        time_score_col = f"{player} Time Score"
-        time_dist_col  = f"{player} Time Distance"
-
-        mask = df_all[time_score_col].isna() & (df_all[time_col] == "OOO")
-        df_all.loc[mask, time_score_col] = 5000
-        mask = df_all[time_score_col].isna() & (df_all[time_col] == "%XX")
-        df_all.loc[mask, time_score_col] = 1000
-        mask = df_all[time_score_col].isna() & (df_all[time_col] == "XXX")
-        df_all.loc[mask, time_score_col] = 0
-
-        mask = df_all[time_score_col].isna()
-        _dist_vals = df_all.loc[mask, time_dist_col]
-        df_all.loc[mask, time_score_col] = pd.Series(
-            [calc_time_score(v) for v in list(_dist_vals)],
-            index=_dist_vals.index,
-        )
-
-    for player in ["Michael", "Sarah"]:
-        time_score_col = f"{player} Time Score"
-        time_col       = f"{player} Time"
-        time_min_col   = f"{player} Time Score (Min)"
-        time_max_col   = f"{player} Time Score (Max)"
-
-        if time_score_col in df_all.columns:
-            df_all[time_min_col] = np.nan
-            df_all[time_max_col] = np.nan
-
-            mask = df_all[time_score_col].notna()
-            df_all.loc[mask, time_min_col] = df_all.loc[mask, time_score_col]
-            df_all.loc[mask, time_max_col] = df_all.loc[mask, time_score_col]
-
-            if time_col in df_all.columns:
-                for pattern, lo, hi in [
-                    ("OO%", 4800, 4950),
-                    ("OOX", 4300, 4600),
-                    ("O%X", 3400, 3900),
-                    ("OXX", 2000, 2500),
-                ]:
-                    mask = df_all[time_score_col].isna() & (df_all[time_col] == pattern)
-                    df_all.loc[mask, time_min_col] = lo
-                    df_all.loc[mask, time_max_col] = hi
-
-    for player in ["Michael", "Sarah"]:
-        time_col  = f"{player} Time Score"
-        geo_col   = f"{player} Geography Score"
-        round_col = f"{player} Round Score"
-        if all(c in df_all.columns for c in [time_col, geo_col, round_col]):
-            mask = df_all[round_col].isna() & df_all[time_col].notna() & df_all[geo_col].notna()
-            df_all.loc[mask, round_col] = df_all.loc[mask, time_col] + df_all.loc[mask, geo_col]
-
-    for player in ["Michael", "Sarah"]:
-        for component in ["Time", "Geography"]:
-            min_col  = f"{player} {component} Score (Min)"
-            max_col  = f"{player} {component} Score (Max)"
-            mean_col = f"{player} {component} Score (Mean)"
-            if min_col in df_all.columns and max_col in df_all.columns:
-                df_all[mean_col] = (df_all[min_col] + df_all[max_col]) / 2
-
-    df_all.to_csv(STATS_CSV, index=False)
\ No newline at end of file
+    _save_parse_state(state)
+
+    return {
+        "Michael": df_michael,
+        "Sarah": df_sarah,
+        "actuals": df_actuals,
+        "averages_daily": df_avg_parsed[_DAILY_COLS].drop_duplicates().reset_index(drop=True),
+        "averages_rounds": df_avg_parsed[_ROUND_COLS],
+    }
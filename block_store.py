@@ -0,0 +1,94 @@
+import bisect
+import json
+import os
+import re
+
+BLOCK_INDEX_JSON = "Data/Timeguessr_Block_Index.json"
+
+_HEADER_RE = re.compile(rb"^[ \t]*TimeGuessr #(\d+)", re.MULTILINE)
+
+
+def _fingerprint(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _scan(data):
+    """Byte offsets of every `TimeGuessr #<day>` header line in `data`, and
+    the offset of each day's first header."""
+    offsets, days = [], {}
+    for m in _HEADER_RE.finditer(data):
+        offsets.append(m.start())
+        days.setdefault(m.group(1).decode(), m.start())
+    return {"offsets": offsets, "days": days}
+
+
+def _load_indexes():
+    try:
+        with open(BLOCK_INDEX_JSON, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _atomic_write(path, data):
+    """Write `data` to `path` via a synced temp file and a rename, so a crash
+    leaves either the old file or the new one, never a partial write."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def edit_day_block(path, day, edit):
+    """Rewrite the block for `day` in the TimeGuessr raw-text file `path`.
+
+    The block runs from the day's first header line up to the next header
+    (or end of file). `edit(lines)` gets the block's lines, or None if the
+    day has no block yet, and returns its replacement lines; a new block is
+    appended after a blank line. The header is found through a sidecar
+    offset index that is rebuilt only when the file changed outside this
+    function, and the file is replaced atomically in a single write."""
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            data = f.read()
+    else:
+        data = b""
+
+    indexes = _load_indexes()
+    index = indexes.get(path)
+    if not index or not os.path.exists(path) or index.get("fingerprint") != _fingerprint(path):
+        index = _scan(data)
+    start = index["days"].get(str(day))
+    if start is not None and not _HEADER_RE.match(data, start):
+        index = _scan(data)
+        start = index["days"].get(str(day))
+
+    if start is None:
+        head = data.rstrip(b"\n")
+        head += b"\n\n" if head else b""
+        block = "\n".join(edit(None)).encode("utf-8") + b"\n"
+        new_data = head + block
+        index["offsets"].append(len(head))
+        index["days"][str(day)] = len(head)
+    else:
+        offsets = index["offsets"]
+        i = bisect.bisect_right(offsets, start)
+        end = offsets[i] if i < len(offsets) else len(data)
+        lines = data[start:end].decode("utf-8").splitlines()
+        block = "\n".join(edit(lines)).encode("utf-8") + b"\n"
+        new_data = (data[:start] + block + data[end:]).rstrip(b"\n") + b"\n"
+        delta = len(block) - (end - start)
+        if delta:
+            index["offsets"] = offsets[:i] + [o + delta for o in offsets[i:]]
+            index["days"] = {d: o + delta if o >= end else o for d, o in index["days"].items()}
+
+    _atomic_write(path, new_data)
+    index["fingerprint"] = _fingerprint(path)
+    indexes[path] = index
+    tmp = BLOCK_INDEX_JSON + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(json.dumps(indexes))
+    os.replace(tmp, BLOCK_INDEX_JSON)
@@ -0,0 +1,85 @@
+import os
+import pandas as pd
+import streamlit as st
+
+from stats_store import STATS_CSV, PLAYERS, load_stats, upcast_scores
+
+
+def stats_version():
+    """The stats CSV mtime, used to key every cache built from it."""
+    return os.path.getmtime(STATS_CSV) if os.path.exists(STATS_CSV) else 0
+
+
+def _impute_scores(df):
+    """Fill missing per-round Geography/Time scores with the midpoint of
+    their pattern's (Min, Max) range, then fill a missing Round Score with
+    Geography + Time where both are now known."""
+    out = {}
+    for p in PLAYERS:
+        for comp in ("Geography", "Time"):
+            col = f"{p} {comp} Score"
+            out[col] = df[col].fillna((df[f"{col} (Min)"] + df[f"{col} (Max)"]) / 2)
+        round_col = f"{p} Round Score"
+        out[round_col] = df[round_col].fillna(out[f"{p} Geography Score"] + out[f"{p} Time Score"])
+    return out
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _views(version):
+    """Load the stats once per `version` and derive every shared view from
+    it. Held as a resource so all pages and sessions share one copy; callers
+    must treat the returned frames as read-only and `.copy()` before
+    mutating."""
+    stats = load_stats().sort_values(["Timeguessr Day", "Timeguessr Round"]).reset_index(drop=True)
+    imputed = upcast_scores(stats)
+    imputed = imputed.assign(**_impute_scores(imputed))
+
+    agg = {"Timeguessr Day": "first"}
+    for p in PLAYERS:
+        agg[f"{p} Total Score"] = "first"
+        agg[f"{p} Geography Score"] = "sum"
+        agg[f"{p} Time Score"] = "sum"
+    daily = imputed.groupby("Date", as_index=False).agg(agg)
+    for p in PLAYERS:
+        daily[f"{p} Played"] = daily[f"{p} Total Score"].notna()
+
+    mutual = daily.loc[daily["Michael Played"] & daily["Sarah Played"], "Date"]
+    margins = daily[daily["Date"].isin(mutual)].reset_index(drop=True)
+    for comp in ("Total", "Geography", "Time"):
+        margins[f"{comp} Margin"] = margins[f"Michael {comp} Score"] - margins[f"Sarah {comp} Score"]
+
+    return {
+        "stats": stats,
+        "imputed": imputed,
+        "daily": daily,
+        "mutual_dates": pd.DatetimeIndex(mutual),
+        "margins": margins,
+    }
+
+
+def get_stats():
+    """The typed stats frame, one row per (Day, Round), sorted."""
+    return _views(stats_version())["stats"]
+
+
+def get_imputed_stats():
+    """`get_stats()` with float64 scores and missing Geography/Time/Round
+    scores imputed from the pattern min/max midpoints."""
+    return _views(stats_version())["imputed"]
+
+
+def get_daily_totals():
+    """One row per date: each player's daily total, summed imputed
+    Geography/Time scores and whether they played."""
+    return _views(stats_version())["daily"]
+
+
+def get_mutual_dates():
+    """Sorted `DatetimeIndex` of the dates both players played."""
+    return _views(stats_version())["mutual_dates"]
+
+
+def get_margins():
+    """`get_daily_totals()` restricted to mutual dates, with Michael − Sarah
+    `Total/Geography/Time Margin` columns."""
+    return _views(stats_version())["margins"]
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+
+import pandas as pd
+
+from stats_store import STATS_CSV, feather
+
+DISK_CACHE_DIR = "Data/Cache"
+DISK_CACHE_BYTES = 256 * 1024 * 1024
+
+_FORMATS = (".feather", ".json", ".html", ".pkl")
+_digests = {}
+
+
+def file_digest(path):
+    """Content hash of `path` ("" if it doesn't exist), re-read only when the
+    file's size or mtime changes."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return ""
+    stamp = (st.st_size, st.st_mtime_ns)
+    cached = _digests.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    _digests[path] = (stamp, h.hexdigest())
+    return _digests[path][1]
+
+
+def _canonical(value):
+    """`value` as nested lists of reprs, with sets sorted so the key doesn't
+    depend on the process's hash seed."""
+    if isinstance(value, (set, frozenset)):
+        return sorted(map(repr, map(_canonical, value)))
+    if isinstance(value, (tuple, list)):
+        return [_canonical(v) for v in value]
+    return repr(value)
+
+
+def _write(path, value):
+    """Write `value` to `path` + the extension for its type and return that path:
+    plain frames as Feather, GeoJSON as JSON, HTML strings as text, anything
+    else pickled."""
+    if (feather is not None and type(value) is pd.DataFrame
+            and all(isinstance(c, str) for c in value.columns)):
+        ext, write = ".feather", lambda f: feather.write_feather(value, f, compression="uncompressed")
+    elif isinstance(value, str):
+        ext, write = ".html", lambda f: f.write(value.encode("utf-8"))
+    else:
+        ext, data = ".pkl", None
+        if isinstance(value, dict) and value.get("type") in ("FeatureCollection", "Feature"):
+            try:
+                ext, data = ".json", json.dumps(value).encode("utf-8")
+            except (TypeError, ValueError):
+                pass
+        data = data if data is not None else pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        write = lambda f: f.write(data)
+    tmp = f"{path}{ext}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path + ext)
+    return path + ext
+
+
+def _read(path):
+    if path.endswith(".feather"):
+        return feather.read_feather(path)
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.endswith(".html"):
+        return data.decode("utf-8")
+    if path.endswith(".json"):
+        return json.loads(data)
+    return pickle.loads(data)
+
+
+def _evict(max_bytes):
+    """Delete the least recently used entries until the cache fits `max_bytes`."""
+    entries = []
+    with os.scandir(DISK_CACHE_DIR) as it:
+        for e in it:
+            if e.is_file() and e.name.endswith(_FORMATS):
+                st = e.stat()
+                entries.append((st.st_mtime_ns, st.st_size, e.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+
+def disk_cached(name, version, params, build, sources=(STATS_CSV,)):
+    """`build()`'s result, persisted under DISK_CACHE_DIR so it survives
+    restarts. Keyed by `name`, `version` (bump it when `build`'s output
+    changes), `params` (everything `build` depends on besides `sources`) and
+    the content hashes of the `sources` files.
+
+    A hit refreshes the entry's mtime; after each write the least recently
+    used entries are evicted once the directory passes DISK_CACHE_BYTES."""
+    key = repr((version, _canonical(params), [file_digest(p) for p in sources]))
+    base = os.path.join(DISK_CACHE_DIR, f"{name}-{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}")
+    for ext in _FORMATS:
+        path = base + ext
+        if os.path.exists(path) and (ext != ".feather" or feather is not None):
+            try:
+                value = _read(path)
+                os.utime(path)
+                return value
+            except Exception:
+                break
+    value = build()
+    try:
+        os.makedirs(DISK_CACHE_DIR, exist_ok=True)
+        _write(base, value)
+        _evict(DISK_CACHE_BYTES)
+    except OSError:
+        pass
+    return value
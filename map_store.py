@@ -0,0 +1,401 @@
+import hashlib
+import os
+import pickle
+import zlib
+
+import country_converter as coco
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from shapely.ops import unary_union
+
+MAP_FILE = "./Data/Custom_World_Map_New.json"
+MAP_TILES_FILE = "./Data/Custom_World_Map_Tiles.pkl"
+MAP_TILES_FORMAT = 2
+
+# Tolerance (degrees) the Locations page simplifies dissolved map features with
+SIMPLIFY_TOLERANCE = 0.005
+
+# Grids (degrees) coordinates are snapped to: the stored map (about 1 m) and the
+# features sent to the browser (about 10 m, well under SIMPLIFY_TOLERANCE)
+MAP_GRID = 1e-5
+FEATURE_GRID = 1e-4
+
+# ISO3 to Primary Language/Script Mapping
+ISO_LANGUAGE_MAP = {
+    # English
+    'USA': 'English', 'GBR': 'English', 'AUS': 'English', 'CAN': 'English', 'NZL': 'English', 
+    'IRL': 'English', 'JAM': 'English', 'BHS': 'English', 
+    'BRB': 'English', 'GUY': 'English', 'TTO': 'English', 'ATG': 'English', 'DMA': 'English', 
+    'GRD': 'English', 'KNA': 'English', 'LCA': 'English', 'VCT': 'English', 'BLZ': 'English',
+    'NGA': 'English', 'GHA': 'English', 'SLE': 'English', 'LBR': 'English', 'GMB': 'English', 
+    'UGA': 'English', 'ZMB': 'English', 'ZWE': 'English', 'BWA': 'English', 'NAM': 'English',
+    
+    # Spanish
+    'ESP': 'Spanish', 'MEX': 'Spanish', 'COL': 'Spanish', 'ARG': 'Spanish', 'PER': 'Spanish', 
+    'VEN': 'Spanish', 'CHL': 'Spanish', 'ECU': 'Spanish', 'GTM': 'Spanish', 'CUB': 'Spanish', 
+    'BOL': 'Spanish', 'DOM': 'Spanish', 'HND': 'Spanish', 'PRY': 'Spanish', 'SLV': 'Spanish', 
+    'NIC': 'Spanish', 'CRI': 'Spanish', 'PAN': 'Spanish', 'URY': 'Spanish', 'GNQ': 'Spanish',
+    'PRI': 'Spanish', # Puerto Rico
+    
+    # Portuguese
+    'BRA': 'Portuguese', 'PRT': 'Portuguese', 'MOZ': 'Portuguese', 'AGO': 'Portuguese', 
+    'GNB': 'Portuguese', 'TLS': 'Portuguese', 'CPV': 'Portuguese', 'STP': 'Portuguese',
+    
+    # French
+    'FRA': 'French', 'COD': 'French', 'MAD': 'French', 'CIV': 'French', 
+    'BFA': 'French', 'NER': 'French', 'SEN': 'French', 'MLI': 'French', 'RWA': 'French', 
+    'GIN': 'French', 'TCD': 'French', 'HTI': 'French', 'MDG': 'French', 
+    'BEN': 'French', 'TGO': 'French', 'CAF': 'French', 'COG': 'French', 'GAB': 'French', 
+    'DJI': 'French', 'MCO': 'French', 'VUT': 'French', 'SYC': 'French', 'BDI': 'French',
+    
+    # Other Romance
+    'ITA': 'Other Romance', 'SMR': 'Other Romance', 'VAT': 'Other Romance', 
+    'AND': 'Other Romance', 'ROU': 'Other Romance', 'MDA': 'Other Romance',
+
+    # Germanic (Excluding English)
+    'DEU': 'Germanic', 'AUT': 'Germanic', 'LIE': 'Germanic', # German
+    'NLD': 'Germanic', 'SUR': 'Germanic', # Dutch
+    'SWE': 'Germanic', 'NOR': 'Germanic', 'DNK': 'Germanic', 'ISL': 'Germanic', # Nordic
+    'LUX': 'Germanic',
+    
+    # Other European (Unique/Isolates/Uralic/Baltic)
+    'ALB': 'Other European', # Albanian
+    'HUN': 'Other European', # Hungarian
+    'MLT': 'Other European', # Maltese
+    'FIN': 'Other European', 'EST': 'Other European', # Finnic
+    'LVA': 'Other European', 'LTU': 'Other European', # Baltic
+
+    # Turkic
+    'TUR': 'Turkic', 'AZE': 'Turkic', 'KAZ': 'Turkic',
+
+    # Slavic (Latin Script)
+    'POL': 'Slavic (Latin)', 'CZE': 'Slavic (Latin)', 'SVK': 'Slavic (Latin)',
+    'SVN': 'Slavic (Latin)', 'HRV': 'Slavic (Latin)',
+    'BIH': 'Slavic (Latin)', 'SRB': 'Slavic (Latin)', 'MNE': 'Slavic (Latin)',
+    'MKD': 'Slavic (Latin)', 
+    
+    # Slavic (Cyrillic Script)
+    'RUS': 'Slavic (Cyrillic)', 'BLR': 'Slavic (Cyrillic)', 'UKR': 'Slavic (Cyrillic)', 
+    'BGR': 'Slavic (Cyrillic)', 'MKD': 'Slavic (Cyrillic)', 
+    
+    # East Asian Scripts
+    'CHN': 'East Asian Scripts', 'TWN': 'East Asian Scripts', 
+    'JPN': 'East Asian Scripts', 'KOR': 'East Asian Scripts', 'PRK': 'East Asian Scripts',
+
+    # Asian Latin Script
+    'VNM': 'Asian Latin Script', 'IDN': 'Asian Latin Script', 'PHL': 'Asian Latin Script',
+    'MYS': 'Asian Latin Script', 'BRN': 'Asian Latin Script',
+
+    # Brahmic Script (Indic family)
+    'IND': 'Brahmic Script', 'BGD': 'Brahmic Script', 'NPL': 'Brahmic Script',
+    'LKA': 'Brahmic Script', 'BTN': 'Brahmic Script', 'THA': 'Brahmic Script',
+    'LAO': 'Brahmic Script', 'KHM': 'Brahmic Script', 'MMR': 'Brahmic Script',
+    
+    # Arabic Script
+    'EGY': 'Arabic Script', 'DZA': 'Arabic Script', 'SDN': 'Arabic Script', 'IRQ': 'Arabic Script', 
+    'MAR': 'Arabic Script', 'SAU': 'Arabic Script', 'YEM': 'Arabic Script', 'SYR': 'Arabic Script', 
+    'TUN': 'Arabic Script', 'SOM': 'Arabic Script', 'JOR': 'Arabic Script', 'LBY': 'Arabic Script', 
+    'PSE': 'Arabic Script', 'LBN': 'Arabic Script', 'OMN': 'Arabic Script', 'KWT': 'Arabic Script', 
+    'MRT': 'Arabic Script', 'QAT': 'Arabic Script', 'BHR': 'Arabic Script', 'ARE': 'Arabic Script',
+    'IRN': 'Arabic Script', 'AFG': 'Arabic Script', 'PAK': 'Arabic Script',
+
+    # Greek Script
+    'GRC': 'Greek Script', 
+
+    # Hebrew Script
+    'ISR': 'Hebrew Script',
+
+    # Georgian Script
+    'GEO': 'Georgian Script',
+
+    # Armenian Script
+    'ARM': 'Armenian Script',
+
+    # --- Overseas Territories & Dependencies ---
+    # UK
+    'GIB': 'English', 'BMU': 'English', 'CYM': 'English', 'VGB': 'English', 'TCA': 'English', 'AIA': 'English', 'MSR': 'English', 'FLK': 'English', 'SHN': 'English', 'IOT': 'English', 'SGS': 'English', 'PCN': 'English', 'IMN': 'English', 'JEY': 'English', 'GGY': 'English',
+    # USA
+    'GUM': 'English', 'VIR': 'English', 'ASM': 'English', 'MNP': 'English',
+    # France
+    'GLP': 'French', 'MTQ': 'French', 'GUF': 'French', 'REU': 'French', 'MYT': 'French', 'PYF': 'French', 'NCL': 'French', 'MAF': 'French', 'BLM': 'French', 'SPM': 'French', 'WLF': 'French',
+    # Netherlands
+    'ABW': 'Germanic', 'CUW': 'Germanic', 'SXM': 'Germanic', 'BES': 'Germanic',
+    # Denmark
+    'GRL': 'Germanic', 'FRO': 'Germanic',
+    # Australia
+    'CXR': 'English', 'CCK': 'English', 'NFK': 'English',
+    # Norway
+    'SJM': 'Germanic',
+    # China
+    'HKG': 'East Asian Scripts', 'MAC': 'East Asian Scripts',
+    # New Zealand
+    'COK': 'English', 'NIU': 'English', 'TKL': 'English'
+}
+
+
+# Overseas territories drawn as part of their parent country
+TERRITORY_PARENT_MAP = {
+    # United Kingdom
+    'JEY': 'GBR', 'GGY': 'GBR', 'IMN': 'GBR', 'GIB': 'GBR', 'AIA': 'GBR', 'BMU': 'GBR',
+    'CYM': 'GBR', 'FLK': 'GBR', 'IOT': 'GBR', 'MSR': 'GBR', 'PCN': 'GBR', 'SGS': 'GBR',
+    'SHN': 'GBR', 'TCA': 'GBR', 'VGB': 'GBR',
+    # France
+    'GLP': 'FRA', 'MTQ': 'FRA', 'GUF': 'FRA', 'REU': 'FRA', 'MYT': 'FRA', 'PYF': 'FRA',
+    'NCL': 'FRA', 'MAF': 'FRA', 'BLM': 'FRA', 'SPM': 'FRA', 'WLF': 'FRA',
+    # United States
+    'PRI': 'USA', 'GUM': 'USA', 'VIR': 'USA', 'ASM': 'USA', 'MNP': 'USA',
+    # Netherlands
+    'ABW': 'NLD', 'CUW': 'NLD', 'SXM': 'NLD', 'BES': 'NLD',
+    # Denmark
+    'GRL': 'DNK', 'FRO': 'DNK',
+    # Australia
+    'CXR': 'AUS', 'CCK': 'AUS', 'NFK': 'AUS',
+    # Norway
+    'SJM': 'NOR',
+    # China
+    'HKG': 'CHN', 'MAC': 'CHN',
+    # New Zealand
+    'COK': 'NZL', 'NIU': 'NZL', 'TKL': 'NZL',
+}
+
+def prepare_map(gdf, cc=None):
+    """Validate and standardize the raw map layer: repair geometries, fix
+    Taiwan, normalize ISO3 codes and names, and add the Continent,
+    UN_Region and Language columns the Locations page groups by. `cc` is a
+    `coco.CountryConverter`, built here when not given."""
+    cc = cc or coco.CountryConverter()
+    # make_valid(structure) preserves coordinates of already-valid geometries unlike
+    # buffer(0) which rebuilds and perturbs shared edge coordinates even for valid polygons.
+    # The structure method also always returns Polygon/MultiPolygon (no GeometryCollections).
+    try:
+        gdf['geometry'] = gpd.GeoSeries(
+            shapely.make_valid(gdf['geometry'].values, method='structure'), crs=gdf.crs)
+    except TypeError:
+        # GEOS < 3.10: fall back to selective buffer(0) on invalid geometries only
+        invalid_mask = ~gdf['geometry'].is_valid
+        if invalid_mask.any():
+            gdf.loc[invalid_mask, 'geometry'] = gdf.loc[invalid_mask, 'geometry'].buffer(0)
+
+    # --- TAIWAN MAP FIX ---
+    mask_tw = gdf['NAME'] == 'Taiwan'
+    if 'ISO_SUB' in gdf.columns:
+        mask_tw = mask_tw | (gdf['ISO_SUB'] == 'TW')
+
+    iso_cols = [c for c in ['ISO3', 'iso3', 'adm0_a3'] if c in gdf.columns]
+    if iso_cols:
+        for col in iso_cols:
+            gdf.loc[mask_tw, col] = 'TWN'
+    else:
+        gdf.loc[mask_tw, 'ISO3'] = 'TWN'
+
+    gdf.loc[mask_tw, 'NAME'] = 'Taiwan'
+
+    # Standardize
+    iso_col = next((c for c in ['ISO3', 'iso3', 'adm0_a3'] if c in gdf.columns), None)
+    if iso_col:
+        gdf['ISO3'] = cc.convert(names=gdf[iso_col].tolist(), to='ISO3', not_found='UNK')
+    else: gdf['ISO3'] = 'UNK'
+
+    name_col = next((c for c in ['NAME', 'name', 'NAME_1', 'COUNTRY'] if c in gdf.columns), 'NAME')
+    gdf['NAME'] = gdf[name_col].astype(str).str.strip()
+
+    # Clean up territory suffixes to ensure they match standard subdivision/country names
+    suffixes_to_remove = [' (UK)', ' (France)', ' (US)', ' (Netherlands)', ' (Denmark)', ' (Australia)', ' (New Zealand)', ' (China)']
+    for suffix in suffixes_to_remove:
+        gdf['NAME'] = gdf['NAME'].str.replace(suffix, '', regex=False)
+
+    # Enrich Map Data
+    clean_isos = [x for x in gdf['ISO3'].unique() if x != 'UNK']
+    gdf['Continent'] = gdf['ISO3'].map(dict(zip(clean_isos, cc.convert(names=clean_isos, to="continent")))).fillna("Unknown")
+    gdf['UN_Region'] = gdf['ISO3'].map(dict(zip(clean_isos, cc.convert(names=clean_isos, to="UNregion")))).fillna("Unknown")
+    gdf['Language'] = gdf['ISO3'].map(ISO_LANGUAGE_MAP).fillna("Other")
+
+    # Special Map Logic for Quebec
+    gdf.loc[(gdf['ISO3'] == 'CAN') & (gdf['NAME'] == 'Quebec'), 'Language'] = 'French'
+
+    # Special Map Logic for Puerto Rico
+    gdf.loc[(gdf['ISO3'] == 'USA') & (gdf['NAME'] == 'Puerto Rico'), 'Language'] = 'Spanish'
+
+    # Special Map Logic for China Subdivisions -> "Other"
+    chn_map_names = ['Hong Kong', 'Macau', 'Tibet', 'Xinjiang']
+    gdf.loc[(gdf['ISO3'] == 'CHN') & (gdf['NAME'].isin(chn_map_names)), 'Language'] = 'Other'
+
+    # Special Map Logic for Belgium
+    gdf.loc[(gdf['ISO3'] == 'BEL') & (gdf['NAME'] == 'Flanders'), 'Language'] = 'Germanic'
+    gdf.loc[(gdf['ISO3'] == 'BEL') & (gdf['NAME'] == 'Wallonia'), 'Language'] = 'French'
+    gdf.loc[(gdf['ISO3'] == 'BEL') & (gdf['NAME'] == 'Brussels Capital Region'), 'Language'] = 'French'
+
+    # Special Map Logic for Switzerland (cantons dissolved into 7 macroregions in Build_Map.py)
+    _che_map_french   = ['Lake Geneva Region']
+    _che_map_italian_romansch  = ['Ticino']
+    _che_map_germanic = [
+        'Espace Mittelland', 'Northwestern Switzerland', 'Zurich',
+        'Eastern Switzerland', 'Central Switzerland'
+    ]
+    gdf.loc[(gdf['ISO3'] == 'CHE') & (gdf['NAME'].isin(_che_map_french)),   'Language'] = 'French'
+    gdf.loc[(gdf['ISO3'] == 'CHE') & (gdf['NAME'].isin(_che_map_italian_romansch)),  'Language'] = 'Other Romance'
+    gdf.loc[(gdf['ISO3'] == 'CHE') & (gdf['NAME'].isin(_che_map_germanic)), 'Language'] = 'Germanic'
+
+    # Brussels is geographically enclosed by Flanders — subtract it so Brussels remains visible
+    bru_rows = gdf[(gdf['ISO3'] == 'BEL') & (gdf['NAME'] == 'Brussels Capital Region')]
+    fla_rows = gdf[(gdf['ISO3'] == 'BEL') & (gdf['NAME'] == 'Flanders')]
+    if not bru_rows.empty and not fla_rows.empty:
+        bru_geom = unary_union(bru_rows['geometry'].tolist())
+        gdf.loc[fla_rows.index, 'geometry'] = gdf.loc[fla_rows.index, 'geometry'].apply(
+            lambda g: g.difference(bru_geom).buffer(0)
+        )
+
+    return gdf
+
+
+def read_map(path=MAP_FILE, cc=None):
+    """The prepared map layer read from `path`, or None if it doesn't exist."""
+    if not os.path.exists(path):
+        return None
+    return prepare_map(gpd.read_file(path), cc)
+
+
+def safe_union(geoms):
+    """Merge geometries using unary_union with guaranteed crash protection.
+    make_valid(structure) in prepare_map() ensures inputs are valid; this handles any edge cases."""
+    arr = geoms.values if hasattr(geoms, 'values') else np.asarray(list(geoms))
+    if len(arr) == 0:
+        return None
+    if len(arr) == 1:
+        return arr[0]
+    try:
+        result = unary_union(arr.tolist())
+        return result if result.is_valid else result.buffer(0)
+    except Exception:
+        # Last resort: fix each geometry individually then retry
+        return unary_union([g.buffer(0) for g in arr])
+
+
+def merge_by_iso(gdf):
+    """One row per ISO3 with every subdivision polygon of the country merged
+    and the country's first Continent/UN_Region/Language."""
+    cols = [c for c in ['ISO3', 'Continent', 'UN_Region', 'Language', 'geometry'] if c in gdf.columns]
+    sub = gdf[cols].copy()
+    attrs = sub.drop(columns='geometry').groupby('ISO3', as_index=False).first()
+    geoms = sub.groupby('ISO3')['geometry'].agg(safe_union).reset_index()
+    iso_gdf = gpd.GeoDataFrame(attrs.merge(geoms, on='ISO3'), geometry='geometry', crs=gdf.crs)
+    iso_gdf['NAME'] = iso_gdf['ISO3']
+    return iso_gdf
+
+
+def world_outline(gdf):
+    """The whole map dissolved into a single geometry."""
+    return safe_union(gdf['geometry'])
+
+
+def simplify(geoms):
+    return shapely.simplify(geoms, SIMPLIFY_TOLERANCE, preserve_topology=True)
+
+
+def feature_geometry(geoms):
+    """`geoms` as drawn on the Locations map: simplified and snapped to FEATURE_GRID."""
+    return shapely.set_precision(simplify(geoms), FEATURE_GRID)
+
+
+def background_geometry(gdf):
+    """The world outline drawn behind the Locations map."""
+    return shapely.set_precision(world_outline(gdf), FEATURE_GRID)
+
+
+def encode_geometries(geoms, grid):
+    """Polygonal `geoms` snapped to `grid` (set_precision keeps them valid and
+    shared edges shared) and packed as zlib-compressed, delta-encoded integer
+    coordinates plus ragged-array offsets. See `decode_geometries`."""
+    geom_type, coords, offsets = shapely.to_ragged_array(shapely.set_precision(np.asarray(geoms, dtype=object), grid))
+    scale = round(1 / grid)
+    ints = np.rint(coords * scale).astype(np.int64)
+    deltas = np.diff(ints, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).astype("<i4")
+    return {"type": int(geom_type), "scale": scale, "coords": zlib.compress(deltas.tobytes()),
+            "offsets": [o.astype(np.int32) for o in offsets]}
+
+
+def decode_geometries(packed):
+    """The geometry array packed by `encode_geometries`, as Polygons or
+    MultiPolygons with exactly the snapped coordinates."""
+    deltas = np.frombuffer(zlib.decompress(packed["coords"]), dtype="<i4").reshape(-1, 2)
+    coords = np.cumsum(deltas, axis=0, dtype=np.int64) / packed["scale"]
+    offsets = tuple(o.astype(np.int64) for o in packed["offsets"])
+    return shapely.from_ragged_array(shapely.GeometryType(packed["type"]), coords, offsets)
+
+
+def _digest(path):
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def tile_key(units):
+    """Key of the tile made of `units`: ISO3 codes for whole countries and
+    (ISO3, NAME) pairs for subdivisions, in any order."""
+    return tuple(sorted(set(units), key=str))
+
+
+def build_tiles(gdf):
+    """The prepared map and prebuilt Locations map features, stored compactly.
+
+    "map" is `gdf` with its geometry snapped to MAP_GRID, so the page loads
+    it without re-reading the GeoJSON or repairing geometries. "units" holds
+    the features the page draws most, keyed by `tile_key` of the units
+    they're dissolved from: every country's merged outline, every
+    subdivision, and every country joined with all of its territories. The
+    page takes those features from here and only dissolves the rest.
+    "background" is the whole world's outline."""
+    packed_map = encode_geometries(gdf['geometry'].values, MAP_GRID)
+    gdf = gdf.set_geometry(decode_geometries(packed_map))
+    iso_gdf = merge_by_iso(gdf)
+    subs = gdf.groupby(['ISO3', 'NAME'])['geometry'].agg(safe_union)
+    iso_geoms = dict(zip(iso_gdf['ISO3'], iso_gdf['geometry']))
+    keys = [tile_key([iso]) for iso in iso_geoms] + [tile_key([unit]) for unit in subs.index]
+    geoms = list(iso_geoms.values()) + list(subs.values)
+    for parent in set(TERRITORY_PARENT_MAP.values()) & set(iso_geoms):
+        deps = [unit for unit in subs.index if TERRITORY_PARENT_MAP.get(unit[0]) == parent]
+        if deps:
+            keys.append(tile_key([parent] + deps))
+            geoms.append(safe_union([iso_geoms[parent]] + [subs[unit] for unit in deps]))
+    return {
+        "map": {"attrs": pd.DataFrame(gdf.drop(columns='geometry')), "crs": gdf.crs, "geometry": packed_map},
+        "keys": keys,
+        "units": encode_geometries(feature_geometry(np.asarray(geoms, dtype=object)), FEATURE_GRID),
+        "background": encode_geometries([background_geometry(gdf)], FEATURE_GRID),
+    }
+
+
+def save_tiles(tiles, path=MAP_TILES_FILE, source=MAP_FILE):
+    tiles = dict(tiles, format=MAP_TILES_FORMAT, tolerance=SIMPLIFY_TOLERANCE, grids=(MAP_GRID, FEATURE_GRID),
+                 source=_digest(source))
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(tiles, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def load_tiles(path=MAP_TILES_FILE, source=MAP_FILE):
+    """Tiles saved by `save_tiles`, or None when there are none or they were
+    built from a different map file or with different settings. A file
+    that can't be unpickled (e.g. written by other pandas/geopandas/pyproj
+    versions) also gives None, so callers fall back to the GeoJSON."""
+    try:
+        with open(path, "rb") as f:
+            tiles = pickle.load(f)
+    except Exception:
+        return None
+    if not isinstance(tiles, dict) or (tiles.get("format") != MAP_TILES_FORMAT or tiles.get("tolerance") != SIMPLIFY_TOLERANCE
+            or tiles.get("grids") != (MAP_GRID, FEATURE_GRID)
+            or not os.path.exists(source) or tiles.get("source") != _digest(source)):
+        return None
+    return tiles
+
+
+def build_map_tiles(path=MAP_FILE, tiles_path=MAP_TILES_FILE):
+    """Prepare the map at `path` and save its tiles to `tiles_path`."""
+    gdf = read_map(path)
+    if gdf is None:
+        return False
+    save_tiles(build_tiles(gdf), tiles_path, path)
+    return True
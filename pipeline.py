@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from aggregation import (
+    ACTUALS_PARSED_CSV, ACTUALS_TXT, AVERAGES_PARSED_CSV, AVERAGES_TXT,
+    MICHAEL_PARSED_CSV, MICHAEL_TXT, SARAH_PARSED_CSV, SARAH_TXT, parse_raw_files,
+)
+from disk_cache import file_digest
+from scoring import time_pattern, time_pattern_range, time_score
+from stats_store import PLAYERS, STATS_CSV, STATS_FEATHER, write_stats
+
+RAW_FILES = (MICHAEL_TXT, SARAH_TXT, ACTUALS_TXT, AVERAGES_TXT)
+PARSED_CSVS = (MICHAEL_PARSED_CSV, SARAH_PARSED_CSV, ACTUALS_PARSED_CSV, AVERAGES_PARSED_CSV)
+PIPELINE_STATE_JSON = "Data/Timeguessr_Pipeline_State.json"
+START_DATE = pd.Timestamp("2025-03-20")  # date of the first day either player played
+
+_PIPELINE_STATE_VERSION = 1
+_LEAD_COLS = ["Date", "Timeguessr Day", "Timeguessr Round", "City", "Subdivision", "Country", "Year"]
+_lock = threading.Lock()
+
+
+def merge_stage(parsed):
+    """Join both players' rounds (outer) with the actuals and the community
+    averages, fill years off from the guess where only the guess was parsed,
+    and add the `Date` column."""
+    df_all = pd.merge(parsed["Michael"], parsed["Sarah"], on=["Timeguessr Day", "Timeguessr Round"], how="outer")
+    df_all = pd.merge(df_all, parsed["actuals"], on=["Timeguessr Day", "Timeguessr Round"], how="left")
+    df_all = pd.merge(df_all, parsed["averages_daily"], on="Timeguessr Day", how="left")
+    df_all = pd.merge(df_all, parsed["averages_rounds"], on=["Timeguessr Day", "Timeguessr Round"], how="left")
+
+    for player in PLAYERS:
+        dist_col, guess_col = f"{player} Time Distance", f"{player} Time Guessed"
+        if dist_col in df_all.columns and guess_col in df_all.columns:
+            mask = df_all[dist_col].isna() & df_all[guess_col].notna() & df_all["Year"].notna()
+            df_all.loc[mask, dist_col] = abs(df_all.loc[mask, "Year"] - df_all.loc[mask, guess_col])
+
+    df_all["Date"] = START_DATE + pd.to_timedelta(df_all["Timeguessr Day"] - df_all["Timeguessr Day"].min(), unit="D")
+    df_all = df_all[_LEAD_COLS + [c for c in df_all.columns if c not in _LEAD_COLS]]
+    return df_all.sort_values(["Timeguessr Day", "Timeguessr Round"]).reset_index(drop=True)
+
+
+def enrich_stage(df):
+    """Fill in the scores the raw text doesn't pin down: time scores, their
+    patterns and (Min, Max, Mean) bounds, and round scores."""
+    df_all = df.copy()
+
+    # Time scores from patterns that pin the score (OOO/%XX/XXX) first, then
+    # years off; then back-fill the pattern and min/max from the score
+    for player in PLAYERS:
+        time_col       = f"{player} Time"
+        time_score_col = f"{player} Time Score"
+        time_dist_col  = f"{player} Time Distance"
+
+        df_all[time_col] = df_all[time_col].mask(df_all[time_col] == "")  # the parser's "" is no pattern
+        time_lo, time_hi = time_pattern_range(df_all[time_col])
+        df_all[time_score_col] = (
+            df_all[time_score_col]
+            .fillna(pd.Series(np.where(time_lo == time_hi, time_lo, np.nan), index=df_all.index))
+            .fillna(pd.Series(time_score(df_all[time_dist_col].to_numpy(dtype=np.float64)), index=df_all.index))
+        )
+        df_all[time_col] = df_all[time_col].fillna(
+            pd.Series(time_pattern(df_all[time_score_col]), index=df_all.index)
+        )
+
+        time_lo, time_hi = time_pattern_range(df_all[time_col])
+        known = df_all[time_score_col].notna()
+        df_all[f"{player} Time Score (Min)"] = np.where(known, df_all[time_score_col], time_lo)
+        df_all[f"{player} Time Score (Max)"] = np.where(known, df_all[time_score_col], time_hi)
+
+    for player in PLAYERS:
+        time_col  = f"{player} Time Score"
+        geo_col   = f"{player} Geography Score"
+        round_col = f"{player} Round Score"
+        if all(c in df_all.columns for c in [time_col, geo_col, round_col]):
+            mask = df_all[round_col].isna() & df_all[time_col].notna() & df_all[geo_col].notna()
+            df_all.loc[mask, round_col] = df_all.loc[mask, time_col] + df_all.loc[mask, geo_col]
+
+    for player in PLAYERS:
+        for component in ["Time", "Geography"]:
+            min_col = f"{player} {component} Score (Min)"
+            max_col = f"{player} {component} Score (Max)"
+            if min_col in df_all.columns and max_col in df_all.columns:
+                df_all[f"{player} {component} Score (Mean)"] = (df_all[min_col] + df_all[max_col]) / 2
+
+    return df_all
+
+
+def write_stage(df):
+    write_stats(df)
+
+
+# name: (version, upstream stages, files read besides the upstream outputs, function of the
+# upstream outputs). Listed in dependency order; bump a stage's version when its output changes.
+STAGES = {
+    "parse":  (1, (), RAW_FILES + PARSED_CSVS, parse_raw_files),
+    "merge":  (1, ("parse",), (), merge_stage),
+    "enrich": (1, ("merge",), (), enrich_stage),
+    "write":  (1, ("enrich",), (STATS_CSV, STATS_FEATHER), write_stage),
+}
+
+
+def _value_digest(value):
+    """Content hash of a stage's output: a frame, a dict of frames, or None."""
+    h = hashlib.blake2b(digest_size=16)
+    frames = value if isinstance(value, dict) else {"": value}
+    for name in sorted(frames):
+        df = frames[name]
+        h.update(repr((name, None if df is None else (list(df.columns), [str(t) for t in df.dtypes]))).encode())
+        if df is not None:
+            h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _stage_key(name, version, upstream, sources):
+    key = repr((name, version, upstream, [file_digest(p) for p in sources]))
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def _load_pipeline_state():
+    try:
+        with open(PIPELINE_STATE_JSON, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if state.get("version") != _PIPELINE_STATE_VERSION:
+        return {}
+    return state.get("stages", {})
+
+
+def _save_pipeline_state(stages):
+    tmp = PIPELINE_STATE_JSON + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": _PIPELINE_STATE_VERSION, "stages": stages}, f)
+    os.replace(tmp, PIPELINE_STATE_JSON)
+
+
+def run_pipeline(force=False):
+    """Bring Data/Timeguessr_Stats.csv up to date with the raw TXT files by
+    running STAGES (parse -> merge -> enrich -> write). This is the one entry
+    point for every rebuild.
+
+    A stage's key hashes its version, the content hashes of its upstream
+    outputs and of the files it reads. A stage whose key matches the last
+    run is skipped. It is only run after all if a downstream stage needs its
+    output. So an edit that doesn't change the parsed rows stops after
+    parse. `force` runs every stage. Calls are serialised across threads.
+
+    Returns {stage: seconds it took, or None if skipped}."""
+    with _lock:
+        prev = {} if force else _load_pipeline_state()
+        state, outputs, timings = {}, {}, {}
+
+        def output(name):
+            if name not in outputs:
+                _, deps, _, build = STAGES[name]
+                args = [output(d) for d in deps]
+                start = time.perf_counter()
+                outputs[name] = build(*args)
+                timings[name] = time.perf_counter() - start
+            return outputs[name]
+
+        for name, (version, deps, sources, _) in STAGES.items():
+            upstream = [state[d]["output"] for d in deps]
+            if prev.get(name, {}).get("key") == _stage_key(name, version, upstream, sources):
+                state[name] = prev[name]
+                continue
+            value = output(name)
+            # Keyed on the files as this stage left them, so its own writes don't re-trigger it
+            state[name] = {"key": _stage_key(name, version, upstream, sources), "output": _value_digest(value)}
+
+        _save_pipeline_state(state)
+        return {name: timings.get(name) for name in STAGES}
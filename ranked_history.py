@@ -0,0 +1,59 @@
+import bisect
+
+
+class RankedHistory:
+    """Values recorded over time, each with optional extra info, answering
+    rank, personal best/worst and "most recent entry at least (or at most) v"
+    queries in O(log n).
+
+    `values` is kept sorted with bisect for the ranks and records. Two
+    monotonic stacks hold the positions of the entries no later entry has
+    matched from above (or below); their values are ordered, so the most
+    recent entry at or beyond any value is found by bisecting them."""
+
+    def __init__(self):
+        self.entries = []
+        self.values = []
+        self._highs = ([], [])  # (-value, position), newest last
+        self._lows = ([], [])   # (value, position), newest last
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, value, *info):
+        """Record `value`; `entries` keeps `(value, *info)` in insertion order."""
+        position = len(self.entries)
+        self.entries.append((value,) + info)
+        bisect.insort(self.values, value)
+        for (keys, positions), key in ((self._highs, -value), (self._lows, value)):
+            while keys and keys[-1] >= key:
+                keys.pop()
+                positions.pop()
+            keys.append(key)
+            positions.append(position)
+
+    def rank_high(self, value):
+        """1 + the number of entries above `value` (its rank among the highest)."""
+        return len(self.values) - bisect.bisect_right(self.values, value) + 1
+
+    def rank_low(self, value):
+        """1 + the number of entries below `value` (its rank among the lowest)."""
+        return bisect.bisect_left(self.values, value) + 1
+
+    def best(self):
+        return self.values[-1] if self.values else None
+
+    def worst(self):
+        return self.values[0] if self.values else None
+
+    def last_at_least(self, value):
+        """Position in `entries` of the most recent entry >= `value`, or None."""
+        keys, positions = self._highs
+        i = bisect.bisect_right(keys, -value) - 1
+        return positions[i] if i >= 0 else None
+
+    def last_at_most(self, value):
+        """Position in `entries` of the most recent entry <= `value`, or None."""
+        keys, positions = self._lows
+        i = bisect.bisect_right(keys, value) - 1
+        return positions[i] if i >= 0 else None
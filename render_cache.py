@@ -0,0 +1,73 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+import streamlit as st
+
+from data_service import stats_version
+
+RENDER_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class RenderCache:
+    """Least-recently-used store of rendered output (figure JSON or HTML
+    strings), evicting the oldest entries once their combined size passes
+    `max_bytes`. Shared by every session, so access is locked."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        size = sys.getsizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                self.size -= sys.getsizeof(self._items.pop(key))
+            self._items[key] = value
+            self.size += size
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= sys.getsizeof(evicted)
+
+
+@st.cache_resource(show_spinner=False)
+def _render_cache():
+    return RenderCache(RENDER_CACHE_BYTES)
+
+
+def cached_html(name, params, build):
+    """`build()`'s HTML string, cached per (`name`, stats version, `params`).
+    `params` must be a hashable tuple of everything `build` depends on
+    besides the stats."""
+    key = (name, stats_version(), params)
+    cache = _render_cache()
+    html = cache.get(key)
+    if html is None:
+        html = build()
+        cache.put(key, html)
+    return html
+
+
+def cached_figure(name, params, build):
+    """`build()`'s Plotly figure, cached as JSON like `cached_html`. A hit
+    returns a fresh figure parsed from the JSON, so callers may mutate it."""
+    key = (name, stats_version(), params)
+    cache = _render_cache()
+    fig_json = cache.get(key)
+    if fig_json is None:
+        fig = build()
+        cache.put(key, fig.to_json())
+        return fig
+    return pio.from_json(fig_json)
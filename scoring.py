@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+# Geography score is piecewise linear in the guess distance (metres): a
+# distance up to GEO_BOUNDS[i] scores GEO_INTERCEPTS[i] - GEO_SLOPES[i] * d.
+GEO_BOUNDS     = np.array([50, 1_000, 5_000, 100_000, 1_000_000, 2_000_000, 3_000_000, 6_000_000], dtype=np.float64)
+GEO_INTERCEPTS = np.array([5000, 5000, 4980, 4900, 4500, 3500, 2500, 1500, 12], dtype=np.float64)
+GEO_SLOPES     = np.array([0, 0.02, 0.016, 0.004, 0.001, 0.0005, 0.0003333, 0.0002, 0], dtype=np.float64)
+
+# Time score is a step function of whole years off: up to TIME_TABLE[i][0]
+# years scores TIME_TABLE[i][1] and shows pattern TIME_TABLE[i][2].
+TIME_TABLE = [
+    (0,  5000, "OOO"),
+    (1,  4950, "OO%"),
+    (2,  4800, "OO%"),
+    (3,  4600, "OOX"),
+    (4,  4300, "OOX"),
+    (5,  3900, "O%X"),
+    (7,  3400, "O%X"),
+    (10, 2500, "OXX"),
+    (15, 2000, "OXX"),
+    (20, 1000, "%XX"),
+    (np.inf, 0, "XXX"),
+]
+TIME_BOUNDS = np.array([t[0] for t in TIME_TABLE[:-1]], dtype=np.float64)
+TIME_SCORES = np.array([t[1] for t in TIME_TABLE], dtype=np.float64)
+
+# Pattern -> (min, max) score. A pattern with min == max pins the score.
+GEO_PATTERN_RANGES = {
+    "OOO": (5000, 5000),
+    "OO%": (4750, 4999),
+    "OOX": (4500, 4749),
+    "O%X": (4250, 4499),
+    "OXX": (3500, 4249),
+    "%XX": (2500, 3499),
+    "XXX": (12,   2499),
+}
+TIME_PATTERN_RANGES = {
+    pattern: (
+        min(s for _, s, p in TIME_TABLE if p == pattern),
+        max(s for _, s, p in TIME_TABLE if p == pattern),
+    )
+    for _, _, pattern in TIME_TABLE
+}
+
+
+def _result(out, like):
+    """Return `out` as a scalar when the input was a scalar."""
+    return out[()] if np.ndim(like) == 0 else out
+
+
+def geo_score(dist_m):
+    """Geography score for a distance in metres, or an array of them.
+    NaN distances give NaN."""
+    d = np.asarray(dist_m, dtype=np.float64)
+    i = np.searchsorted(GEO_BOUNDS, d, side="left")
+    out = np.where(np.isnan(d), np.nan, GEO_INTERCEPTS[i] - GEO_SLOPES[i] * d)
+    return _result(out, dist_m)
+
+
+def time_score(years_off):
+    """Time score for a whole number of years off, or an array of them.
+    NaN gives NaN."""
+    y = np.abs(np.asarray(years_off, dtype=np.float64))
+    out = np.where(np.isnan(y), np.nan, TIME_SCORES[np.searchsorted(TIME_BOUNDS, y, side="left")])
+    return _result(out, years_off)
+
+
+def _pattern_range(patterns, ranges):
+    s = pd.Series(patterns, dtype=object)
+    lo = s.map({p: r[0] for p, r in ranges.items()}).to_numpy(dtype=np.float64)
+    hi = s.map({p: r[1] for p, r in ranges.items()}).to_numpy(dtype=np.float64)
+    return lo, hi
+
+
+def geo_pattern_range(patterns):
+    """(min, max) geography score arrays for an array of emoji patterns
+    (O/%/X form). Unknown or missing patterns give NaN."""
+    return _pattern_range(patterns, GEO_PATTERN_RANGES)
+
+
+def time_pattern_range(patterns):
+    """(min, max) time score arrays for an array of emoji patterns
+    (O/%/X form). Unknown or missing patterns give NaN."""
+    return _pattern_range(patterns, TIME_PATTERN_RANGES)
+
+
+def time_pattern(scores):
+    """Emoji pattern (O/%/X form) whose score range contains each time
+    score; NaN where none does."""
+    s = np.asarray(scores, dtype=np.float64)
+    out = np.full(s.shape, np.nan, dtype=object)
+    for pattern, (lo, hi) in TIME_PATTERN_RANGES.items():
+        out[(s >= lo) & (s <= hi)] = pattern
+    return out
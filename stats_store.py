@@ -0,0 +1,87 @@
+import os
+import numpy as np
+import pandas as pd
+
+try:
+    from pyarrow import feather
+except ImportError:  # pyarrow is optional; pages fall back to the CSV
+    feather = None
+
+STATS_CSV     = "Data/Timeguessr_Stats.csv"
+STATS_FEATHER = "Data/Timeguessr_Stats.feather"
+
+PLAYERS = ("Michael", "Sarah")
+
+# Column dtypes for the typed store. Per-round scores are float32 to halve the
+# store. That is exact for the whole-number time and community scores, but
+# geography (and so round) scores come from the distance formula and keep
+# only ~7 significant digits, off by up to ~0.0005. Consumers must upcast
+# them with `upcast_scores` before summing or comparing, and still expect
+# float32-derived totals to differ from the CSV's in the last digit where
+# they are truncated. Daily totals stay float64.
+CATEGORY_COLS = ["Country"] + [f"{p} {c}" for p in PLAYERS for c in ("Geography", "Time")]
+FLOAT32_COLS = ["Community Round Score"] + [
+    f"{p} {c}{suffix}"
+    for p in PLAYERS
+    for c in ("Round Score", "Time Score", "Geography Score")
+    for suffix in ([""] if c == "Round Score" else ["", " (Min)", " (Max)", " (Mean)"])
+]
+
+
+def coerce_stats_types(df):
+    """Return `df` with the canonical stats dtypes: datetime `Date`,
+    categorical patterns and countries, float32 per-round scores. Empty
+    strings become NaN, matching what a CSV round trip would give."""
+    df = df.copy()
+    if "Date" in df.columns:
+        df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    for c in df.columns:
+        if pd.api.types.is_string_dtype(df[c].dtype):
+            df[c] = df[c].where(df[c] != "")
+            if df[c].isna().all():
+                df[c] = df[c].astype(np.float64)
+    for c in FLOAT32_COLS:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype(np.float32)
+    for c in CATEGORY_COLS:
+        if c in df.columns:
+            df[c] = df[c].astype("category")
+    return df
+
+
+def upcast_scores(df):
+    """`df` with its float32 score columns as float64, for code that sums or
+    compares them; float32 sums drift over hundreds of days."""
+    return df.astype({c: np.float64 for c in FLOAT32_COLS if c in df.columns})
+
+
+def write_stats(df, csv_path=STATS_CSV, feather_path=STATS_FEATHER):
+    """Write the merged stats frame to `csv_path` and, when pyarrow is
+    available, a typed, uncompressed Feather (Arrow IPC) copy alongside it
+    that pages can memory-map. Both are written to temporary files and
+    swapped in with `os.replace`, so readers see either the old stats or the
+    new ones, never a partial file. The Feather file is written last so it
+    is never older than the CSV it mirrors; until it is swapped in, the old
+    one is older than the new CSV and `load_stats` reads the CSV."""
+    csv_tmp = csv_path + ".tmp"
+    df.to_csv(csv_tmp, index=False)
+    if feather is None:
+        os.replace(csv_tmp, csv_path)
+        return
+    tmp = feather_path + ".tmp"
+    feather.write_feather(coerce_stats_types(df), tmp, compression="uncompressed")
+    os.replace(csv_tmp, csv_path)
+    os.replace(tmp, feather_path)
+
+
+def load_stats(columns=None, csv_path=STATS_CSV, feather_path=STATS_FEATHER):
+    """Load the stats with canonical dtypes, optionally projecting to
+    `columns`. Reads the memory-mapped Feather store when it is at least as
+    new as the CSV, otherwise parses the CSV and coerces it."""
+    if feather is not None and os.path.exists(feather_path) and (
+        not os.path.exists(csv_path) or os.path.getmtime(feather_path) >= os.path.getmtime(csv_path)
+    ):
+        table = feather.read_table(feather_path, columns=columns, memory_map=True)
+        return table.to_pandas()
+    df = pd.read_csv(csv_path, usecols=columns)
+    return coerce_stats_types(df[columns] if columns is not None else df)
@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+
+import streamlit as st
+
+from pipeline import RAW_FILES, run_pipeline
+from warmup import quiet_sessionless_thread, start_warmup
+
+WATCH_INTERVAL = 1.0  # seconds between polls of the raw files
+WATCH_DEBOUNCE = 2.0  # seconds the raw files must stay unchanged before a rebuild
+
+
+class StatsWatcher:
+    """Polls `paths` from a daemon thread and calls `rebuild()` once they have
+    stayed unchanged for `debounce` seconds, then `on_rebuilt()`. What
+    `rebuild()` returns (the per-stage timings) is kept in `last_timings`. It also
+    rebuilds once on start, for edits made while the app was down.
+
+    Pages never wait on it. They keep reading the previous stats until the
+    rebuild's `write_stats` swaps in the new files, which changes
+    `stats_version()`."""
+
+    def __init__(self, paths, rebuild, on_rebuilt, interval=WATCH_INTERVAL, debounce=WATCH_DEBOUNCE):
+        self.paths = paths
+        self.rebuild = rebuild
+        self.on_rebuilt = on_rebuilt
+        self.interval = interval
+        self.debounce = debounce
+        self.rebuilding = False
+        self.last_seconds = None
+        self.last_timings = None
+        self.last_error = None
+        quiet_sessionless_thread("stats-watcher")
+        self._thread = threading.Thread(target=self._loop, name="stats-watcher", daemon=True)
+        self._thread.start()
+
+    def _snapshot(self):
+        stamps = {}
+        for path in self.paths:
+            try:
+                st_ = os.stat(path)
+                stamps[path] = (st_.st_size, st_.st_mtime_ns)
+            except OSError:
+                stamps[path] = None
+        return stamps
+
+    def _loop(self):
+        seen, pending, changed_at = self._snapshot(), True, float("-inf")
+        while True:
+            snapshot = self._snapshot()
+            if snapshot != seen:
+                seen, pending, changed_at = snapshot, True, time.monotonic()
+            if pending and time.monotonic() - changed_at >= self.debounce:
+                pending = False
+                self._rebuild()
+            time.sleep(self.interval)
+
+    def _rebuild(self):
+        self.rebuilding = True
+        start = time.perf_counter()
+        try:
+            self.last_timings = self.rebuild()
+            self.last_error = None
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+        finally:
+            self.last_seconds = time.perf_counter() - start
+            self.rebuilding = False
+        if self.last_error is None:
+            self.on_rebuilt()
+
+
+@st.cache_resource(show_spinner=False)
+def _stats_watcher():
+    return StatsWatcher(RAW_FILES, run_pipeline, start_warmup)
+
+
+def start_stats_watcher():
+    """Start (once per process) the background rebuild of the stats from the raw TXT files."""
+    return _stats_watcher()
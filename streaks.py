@@ -0,0 +1,95 @@
+import numpy as np
+
+STREAK_CHUNK_CELLS = 1 << 22
+
+
+def runs(mask):
+    """(starts, lengths) of every run of True in the 1-D boolean `mask`."""
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], np.asarray(mask, dtype=bool), [False])).astype(np.int8)))
+    return edges[::2], edges[1::2] - edges[::2]
+
+
+def longest_run(mask):
+    """(length, start, end) of the longest run of True in `mask`, the latest
+    one on ties. (0, 0, 0) when `mask` has no True."""
+    starts, lengths = runs(mask)
+    if not len(lengths):
+        return 0, 0, 0
+    i = len(lengths) - 1 - np.argmax(lengths[::-1])
+    return int(lengths[i]), int(starts[i]), int(starts[i] + lengths[i] - 1)
+
+
+def cumulative_mean(scores):
+    """Mean of `scores[:i + 1]` for every i."""
+    scores = np.asarray(scores, dtype=np.float64)
+    return np.cumsum(scores) / np.arange(1, len(scores) + 1)
+
+
+def threshold_streaks(scores, thresholds, above=True):
+    """Longest run of `scores >= t` (or `scores < t` when not `above`) for
+    every threshold t at once, as (lengths, starts, ends) arrays aligned with
+    `thresholds`. Ties go to the latest run and a threshold with no run gets
+    (0, 0, 0), as in `longest_run`.
+
+    Works on a thresholds x games boolean matrix: the length of the run
+    ending at each game is its index minus the index of the last miss before
+    it, so a row's maximum is its longest run and the last position holding
+    it is that run's end. Rows are processed in chunks of about
+    STREAK_CHUNK_CELLS cells to bound memory."""
+    scores = np.asarray(scores, dtype=np.float64)
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    n = len(scores)
+    lengths = np.zeros(len(thresholds), dtype=np.int64)
+    ends = np.zeros(len(thresholds), dtype=np.int64)
+    if n == 0:
+        return lengths, ends.copy(), ends
+    idx = np.arange(n, dtype=np.int32)
+    step = max(1, STREAK_CHUNK_CELLS // n)
+    for lo in range(0, len(thresholds), step):
+        t = thresholds[lo:lo + step, None]
+        hit = scores >= t if above else scores < t
+        run = idx - np.maximum.accumulate(np.where(hit, -1, idx), axis=1)
+        best = run.max(axis=1)
+        lengths[lo:lo + step] = best
+        ends[lo:lo + step] = np.where(best > 0, n - 1 - np.argmax(run[:, ::-1] == best[:, None], axis=1), 0)
+    starts = np.where(lengths > 0, ends - lengths + 1, 0)
+    return lengths, starts, ends
+
+
+def cumulative_avg_streak(scores, above=True):
+    """`longest_run` of scores at or above (or below) the mean of every score
+    up to and including them."""
+    scores = np.asarray(scores, dtype=np.float64)
+    avg = cumulative_mean(scores)
+    return longest_run(scores >= avg if above else scores < avg)
+
+
+def change_streak(scores, threshold, mode="change"):
+    """`longest_run` of day-to-day changes of at least `threshold` ("change")
+    or at most `threshold` ("stable"). The length counts changes; start and
+    end index `scores`, so a run of k changes spans k + 1 scores."""
+    scores = np.asarray(scores, dtype=np.float64)
+    if len(scores) < 2:
+        return 0, 0, 0
+    diff = np.abs(np.diff(scores))
+    length, start, end = longest_run(diff >= threshold if mode == "change" else diff <= threshold)
+    return (length, start, end + 1) if length else (0, 0, 0)
+
+
+def win_streaks(diff):
+    """Runs of consecutive wins in the margin series `diff` (Michael − Sarah).
+    Ties and missing margins neither extend nor break a run.
+
+    Returns (winner, length, start, end) arrays: `winner` is 1 for Michael
+    and -1 for Sarah, `start` the position of the run's first win and `end`
+    the position just before the next run starts (the last position for the
+    final run)."""
+    diff = np.asarray(diff, dtype=np.float64)
+    played = np.flatnonzero((diff > 0) | (diff < 0))
+    if not len(played):
+        return (np.array([], dtype=int),) * 4
+    winner = np.sign(diff[played])
+    first = np.flatnonzero(np.concatenate(([True], winner[1:] != winner[:-1])))
+    start = played[first]
+    end = np.append(start[1:] - 1, len(diff) - 1)
+    return winner[first].astype(int), np.diff(np.append(first, len(played))), start, end
@@ -0,0 +1,189 @@
+import ast
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from data_service import stats_version
+
+WARMUP_WORKERS = 2
+
+
+def _warm_news(ns):
+    all_evs, _ = ns["load_news_feed"](stats_version())
+    ns["news_feed_html"](all_evs, list(ns["FEED_CATEGORIES"]))
+
+
+def _warm_awards(ns):
+    df = ns["load_data"](stats_version())
+    for mode in ("fame", "shame"):
+        ns["load_awards"](df, mode)
+
+
+def _warm_electoral_college(ns):
+    data = ns["load_data"]()
+    timeline_data = ns["timeline_frame"](ns["filter_dates"](data, ns["date_range"](data)))
+    for score_mode in ("Total Score", "Geography Score", "Time Score"):
+        for is_tg in (False, True):
+            ns["calculate_ev_timeline"](timeline_data, ns["frame_hash"](timeline_data), score_mode, is_tg)
+
+
+def _warm_locations(ns):
+    """The default view: every date, Count metric, Countries, no split countries."""
+    data = ns["load_data"](stats_version())
+    gdf, _ = ns["load_map"]()
+    iso_gdf = ns["precompute_iso_merged"](gdf)
+    filtered = ns["filter_dates"](data, ns["date_range"](data))
+    splits = frozenset()
+    stats = ns["calculate_stats"](filtered, splits, "Countries", "Count", "Total Score")
+    stats = stats[stats["Total_Active"] > 0]
+    iso_tuple, subdivs_tuple = ns["active_map_keys"](ns["build_map_data"](filtered, splits, "Countries", "Count"), stats, splits)
+    ns["generate_dynamic_map_layer"](gdf, iso_gdf, iso_tuple, splits, subdivs_tuple, "Countries")
+    ns["get_background_layer"](gdf)
+
+
+# (label, page script, page functions the warm-up calls, function calling them on
+# the page's definitions), slowest first
+WARMUP_JOBS = [
+    ("News", "Pages/11_News.py", ("load_news_feed", "news_feed_html"), _warm_news),
+    ("Awards", "Pages/9_Awards.py", ("load_data", "load_awards"), _warm_awards),
+    ("Electoral College", "Pages/14_Electoral_College.py",
+     ("load_data", "date_range", "filter_dates", "timeline_frame", "frame_hash", "calculate_ev_timeline"),
+     _warm_electoral_college),
+    ("Locations", "Pages/6_Locations.py",
+     ("load_data", "load_map", "precompute_iso_merged", "date_range", "filter_dates", "calculate_stats",
+      "build_map_data", "active_map_keys", "generate_dynamic_map_layer", "get_background_layer"),
+     _warm_locations),
+]
+
+
+def _global_reads(node):
+    """Names `node` reads without binding them itself."""
+    bound, read = set(), set()
+    for n in ast.walk(node):
+        if isinstance(n, ast.Name):
+            (read if isinstance(n.ctx, ast.Load) else bound).add(n.id)
+        elif isinstance(n, ast.arg):
+            bound.add(n.arg)
+        elif isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and n is not node:
+            bound.add(n.name)
+        elif isinstance(n, (ast.Import, ast.ImportFrom)):
+            bound.update((a.asname or a.name).split(".")[0] for a in n.names)
+    return read - bound
+
+
+def page_definitions(path, names):
+    """The functions page script `path` defines, without running the page:
+    its imports, functions and classes, plus the module-level values that
+    `names` read directly or through other functions (constants,
+    converters). All other statements are skipped, so nothing is rendered.
+
+    They are defined in a `__main__` namespace from the same file, so their
+    `st.cache_*` keys match the ones a visitor's run of the page uses."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    kept = {n for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom, ast.FunctionDef, ast.ClassDef))}
+    bindings = {n.name: n for n in kept if isinstance(n, (ast.FunctionDef, ast.ClassDef))}
+    for n in tree.body:
+        if isinstance(n, (ast.Assign, ast.AnnAssign)):
+            for target in (n.targets if isinstance(n, ast.Assign) else [n.target]):
+                if isinstance(target, ast.Name):
+                    bindings.setdefault(target.id, n)
+    seen, pending = set(), set(names)
+    while pending:
+        n = bindings.get(pending.pop())
+        if n is not None and n not in seen:
+            seen.add(n)
+            kept.add(n)
+            pending |= _global_reads(n)
+    module = ast.Module(body=[n for n in tree.body if n in kept], type_ignores=[])
+    ns = {"__name__": "__main__", "__file__": path}
+    exec(compile(module, path, "exec"), ns)
+    return ns
+
+
+class _SessionlessThreadFilter(logging.Filter):
+    """Drops Streamlit's "missing ScriptRunContext" warnings from threads named
+    `prefix`*, which use Streamlit without a session on purpose."""
+
+    def __init__(self, prefix):
+        super().__init__()
+        self.prefix = prefix
+
+    def filter(self, record):
+        return not record.threadName.startswith(self.prefix)
+
+
+def quiet_sessionless_thread(prefix):
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(
+        _SessionlessThreadFilter(prefix))
+
+
+class Warmup:
+    """Runs the `jobs` in a background thread pool once per stats version, so
+    the cached functions behind each page's default view are filled before
+    anyone opens it. A job calls them from the page's `page_definitions`
+    with the page's default arguments."""
+
+    def __init__(self, jobs, workers):
+        self.jobs = jobs
+        self.version = None
+        self.status = {}
+        self.started = None
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="warmup")
+        quiet_sessionless_thread("warmup")
+
+    def start(self, version):
+        """Queue every job for `version`; a no-op if that version already ran."""
+        with self._lock:
+            if version == self.version:
+                return False
+            self.version = version
+            self.started = time.perf_counter()
+            self.status = {label: {"state": "queued", "seconds": None, "ended": None, "error": None}
+                           for label, *_ in self.jobs}
+            status = self.status
+        for job in self.jobs:
+            self._pool.submit(self._run, status[job[0]], *job[1:])
+        return True
+
+    def _run(self, entry, path, names, warm):
+        entry["state"] = "running"
+        start = time.perf_counter()
+        try:
+            warm(page_definitions(path, names))
+            state, error = "done", None
+        except Exception as e:
+            state, error = "failed", f"{type(e).__name__}: {e}"
+        entry["ended"] = time.perf_counter()
+        entry["seconds"] = entry["ended"] - start
+        entry["state"], entry["error"] = state, error
+
+    def progress(self):
+        """(jobs finished, jobs total, seconds the round has taken so far, {label: status})."""
+        with self._lock:
+            status = {label: dict(entry) for label, entry in self.status.items()}
+            started = self.started
+        finished = sum(entry["state"] in ("done", "failed") for entry in status.values())
+        if started is None:
+            return 0, 0, 0.0, status
+        ended = max(entry["ended"] for entry in status.values()) if finished == len(status) else time.perf_counter()
+        elapsed = ended - started
+        return finished, len(status), elapsed, status
+
+
+@st.cache_resource(show_spinner=False)
+def _warmup():
+    return Warmup(WARMUP_JOBS, WARMUP_WORKERS)
+
+
+def start_warmup():
+    """Warm the slow pages' default views for the current stats in the background."""
+    return _warmup().start(stats_version())
+
+
+def warmup_progress():
+    return _warmup().progress()